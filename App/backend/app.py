@@ -1,26 +1,92 @@
 import os
-import uuid
+import posixpath
+import re
 import bcrypt
 import jwt
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
+import click
 from pymongo import MongoClient
-from bson import ObjectId, json_util
-from werkzeug.utils import secure_filename
-from functools import wraps
+from bson import ObjectId
+from werkzeug.exceptions import NotFound
+from urllib.parse import urlencode
+from functools import partial, wraps
+from concurrent.futures import wait as wait_futures
 import smtplib
 from email.mime.text import MIMEText
 from datetime import datetime, timedelta, timezone
 import json
+from response_cache import ResponseCache
+from http_cache import CollectionVersions, make_etag, format_cache_control
+from pagination import keyset_page, CountCache, InvalidCursor
+from indexes import ensure_indexes, verify_query_plans
+from search_index import SearchIndex
+from certificate_index import CertificateIndex
+from counters import CounterAggregator
+from principal_cache import PrincipalCache
+from password_hashing import PasswordHasher, HasherSaturated, HasherTimeout
+from image_variants import VariantPipeline, manifest_path
+from chunked_uploads import ChunkedUploadStore, UploadError
+from blob_store import BlobStore
+from assets import AssetServer, precompress
+from compression import ResponseCompressor
+from serialization import FastJSONProvider
+from fieldsets import InvalidFields, parse_fields, parse_include, projection_for, select_fields
+from batch import BatchDispatcher, BatchError
+from fanout import FanOut
+from mongo_pool import PoolStats, client_options, read_preference
+from metrics import Registry, CommandMetrics
+from slow_queries import SlowQueryLog
+from profiling import RequestProfiler
+from memory_tracking import MemoryTracker, GROUPINGS
+import threading
+import atexit
+import time
+import tracemalloc
 
 
 # ========== INITIALIZATION ========== #
 app = Flask(__name__)
+# jsonify encodes ObjectId, datetime and Decimal128 directly, in one pass
+app.json = FastJSONProvider(app)
 CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"]}})
 
-# Database setup
-client = MongoClient("mongodb://localhost:27017/")
-db = client.vibecanvas
+# Prometheus metrics, exposed at /metrics
+metrics = Registry()
+
+# Database setup; pool size, timeouts and compressors come from MONGO_* variables
+mongo_pool_stats = PoolStats()
+# Commands slower than SLOW_QUERY_MS (negative disables) are explained and kept in db.slow_queries
+slow_query_log = SlowQueryLog(
+    threshold_ms=float(os.environ.get('SLOW_QUERY_MS', 100)),
+    explain_interval=float(os.environ.get('SLOW_QUERY_EXPLAIN_INTERVAL', 300))
+)
+# Admin-only per-request profiling: ?__profile=1 (or cprofile), or an X-Profile header
+request_profiler = RequestProfiler(
+    interval=float(os.environ.get('PROFILE_INTERVAL_MS', 1)) / 1000,
+    keep=int(os.environ.get('PROFILE_KEEP', 20))
+)
+mongo_options = client_options(os.environ)
+client = MongoClient(
+    os.environ.get('MONGO_URI', 'mongodb://localhost:27017/'),
+    event_listeners=[mongo_pool_stats, CommandMetrics(metrics), slow_query_log, request_profiler],
+    **mongo_options
+)
+db = client[os.environ.get('MONGO_DB', 'vibecanvas')]
+
+# Public GET routes may read from secondaries, e.g. MONGO_PUBLIC_READ_PREFERENCE=secondaryPreferred
+# with MONGO_PUBLIC_MAX_STALENESS=90 (seconds)
+public_read_preference = read_preference(
+    os.environ.get('MONGO_PUBLIC_READ_PREFERENCE', 'primary'),
+    int(os.environ['MONGO_PUBLIC_MAX_STALENESS']) if os.environ.get('MONGO_PUBLIC_MAX_STALENESS') else None
+)
+public_db = client.get_database(db.name, read_preference=public_read_preference) if public_read_preference else db
+
+if slow_query_log.threshold_ms >= 0:
+    try:
+        slow_query_log.bind(db, size=int(os.environ.get('SLOW_QUERY_LOG_BYTES', 16 * 1024 * 1024)))
+    except Exception as e:
+        print(f"Slow query log disabled: {str(e)}")
 
 # Collections
 collections = {
@@ -31,7 +97,8 @@ collections = {
     'certificates': db.certificates,
     'users': db.users,
     'settings': db.settings,
-    'messages': db.messages
+    'messages': db.messages,
+    'blog': db.blog
 }
 
 # ========== CONFIGURATION ========== #
@@ -41,9 +108,228 @@ ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'svg'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Uploads are stored by content hash under uploads/ab/cd/, with reference counts in MongoDB
+# Chunked upload sessions and partial blob writes; outside UPLOAD_FOLDER so /uploads/ never serves them,
+# but on the same filesystem so finished files are renamed into place
+UPLOAD_STAGING_FOLDER = os.environ.get('UPLOAD_STAGING_FOLDER', 'upload-staging')
+blob_store = BlobStore(UPLOAD_FOLDER, db.blobs, tmp_dir=os.path.join(UPLOAD_STAGING_FOLDER, 'blobs'))
+
+# Static upload serving; ASSET_OFFLOAD=x-accel|x-sendfile hands the bytes to the front web server
+asset_server = AssetServer(
+    os.path.abspath(UPLOAD_FOLDER),
+    mode=os.environ.get('ASSET_OFFLOAD') or None,
+    accel_prefix=os.environ.get('ASSET_ACCEL_PREFIX', '/_uploads/'),
+    policy={'public': True, 'max_age': int(os.environ.get('ASSET_MAX_AGE', 3600))}
+)
+
+# Hard cap on any request body; larger files go through the chunked upload API
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
+chunked_uploads = ChunkedUploadStore(
+    os.path.join(UPLOAD_STAGING_FOLDER, 'incoming'),
+    max_file_bytes=int(os.environ.get('MAX_UPLOAD_FILE_BYTES', 200 * 1024 * 1024)),
+    max_chunk_bytes=app.config['MAX_CONTENT_LENGTH']
+)
+
+# Public response cache
+app.config['RESPONSE_CACHE_ENABLED'] = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+app.config['RESPONSE_CACHE_MAX_BYTES'] = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+app.config['RESPONSE_CACHE_TTL'] = int(os.environ.get('RESPONSE_CACHE_TTL', 600))
+response_cache = ResponseCache(
+    max_bytes=app.config['RESPONSE_CACHE_MAX_BYTES'],
+    ttl=app.config['RESPONSE_CACHE_TTL'] or None
+)
+# Write counts are shared through MongoDB, so every worker notices writes made by the others
+collection_versions = CollectionVersions(
+    db.collection_versions,
+    check_interval=float(os.environ.get('SHARED_VERSION_CHECK_INTERVAL', 1))
+)
+
+# List pagination
+MAX_PER_PAGE = 100
+count_cache = CountCache(ttl=int(os.environ.get('COUNT_CACHE_TTL', 30)))
+
+# Blog full-text search, rebuilt from MongoDB after any worker writes posts, and at the latest
+# every BLOG_SEARCH_MAX_AGE seconds
+blog_search = SearchIndex(max_age=int(os.environ.get('BLOG_SEARCH_MAX_AGE', 600)) or None)
+blog_search_build_lock = threading.Lock()
+
+# Certificates admin listing, filtered and sorted from an in-memory bitmap index; rebuilt after any
+# worker writes certificates, and at the latest every CERTIFICATE_INDEX_MAX_AGE seconds
+certificate_index = CertificateIndex(max_age=int(os.environ.get('CERTIFICATE_INDEX_MAX_AGE', 600)) or None)
+certificate_index_build_lock = threading.Lock()
+
+# Blog view/like counters, buffered and written in one bulk_write per interval
+blog_counters = CounterAggregator(collections['blog'], interval=float(os.environ.get('BLOG_COUNTER_FLUSH_INTERVAL', 5)))
+blog_counters.start()
+atexit.register(blog_counters.stop)
+
+# Verified JWT principals, so repeat admin calls skip the users lookup
+principal_cache = PrincipalCache(ttl=int(os.environ.get('PRINCIPAL_CACHE_TTL', 60)))
+
+# Password hashing pool; changing BCRYPT_ROUNDS rehashes passwords on next login
+password_hasher = PasswordHasher(
+    rounds=int(os.environ.get('BCRYPT_ROUNDS', 12)),
+    workers=int(os.environ.get('BCRYPT_WORKERS', 2)),
+    max_queue=int(os.environ.get('BCRYPT_MAX_QUEUE', 8)),
+    timeout=float(os.environ.get('BCRYPT_TIMEOUT', 5))
+)
+
+# Responsive image variants, generated in a process pool after upload
+image_variants = VariantPipeline(workers=int(os.environ.get('IMAGE_WORKERS', 2)))
+
+# Profiling hooks come first: the before hook runs first and the after hook last,
+# so a profile covers the handler, compression and metrics
+app.json.observer = request_profiler.count_serialized
+
+@app.before_request
+def start_profile():
+    mode = RequestProfiler.requested_mode(request)
+    if mode is None:
+        return
+    user = request_principal()
+    if user is None or user.get('role') != 'admin':
+        return
+    g.profile = request_profiler.start(mode, request.method, request.full_path, request.endpoint)
+
+@app.after_request
+def finish_profile(response):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        request_profiler.finish(profile, response)
+        response.headers['X-Profile-Id'] = profile.id
+        response.headers.add('Server-Timing', f'total;dur={profile.duration_ms}')
+    return response
+
+@app.teardown_request
+def discard_profile(error=None):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        request_profiler.discard(profile)
+
+# Request metrics; registered before compression so the timing includes it
+http_requests = metrics.counter(
+    'http_requests_total', 'HTTP requests by endpoint, method and status', ('endpoint', 'method', 'status')
+)
+http_request_duration = metrics.histogram(
+    'http_request_duration_seconds', 'Time spent handling a request', ('endpoint', 'method')
+)
+upload_bytes = metrics.counter('upload_bytes_total', 'Bytes received through uploads', ('kind',))
+upload_duration = metrics.histogram('upload_duration_seconds', 'Time spent storing an upload', ('kind',))
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        # Unmatched URLs share one label so 404 scans cannot blow up the series count
+        endpoint = request.endpoint or 'unmatched'
+        http_request_duration.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+        http_requests.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
+
+# Per-request memory accounting (tracemalloc); MEMORY_TRACKING=true traces from startup.
+# Registered after the metrics hooks, so its after hook runs before them and after compression.
+app.config['MEMORY_TRACKING'] = os.environ.get('MEMORY_TRACKING', 'false').lower() == 'true'
+memory_tracker = MemoryTracker(
+    frames=int(os.environ.get('MEMORY_TRACKING_FRAMES', 1)),
+    keep=int(os.environ.get('MEMORY_SNAPSHOTS_KEEP', 10))
+)
+if app.config['MEMORY_TRACKING']:
+    memory_tracker.start()
+request_memory_peak = metrics.histogram(
+    'http_request_memory_peak_bytes', 'Peak traced memory above the request start', ('endpoint',),
+    buckets=tuple(64 * 1024 * 4 ** power for power in range(8))
+)
+request_memory_blocks = metrics.histogram(
+    'http_request_allocated_blocks', 'Net change in live allocated blocks over a request', ('endpoint',),
+    buckets=(0, 100, 1000, 10000, 100000, 1000000)
+)
+metrics.collector('process_traced_memory_bytes', 'Memory currently traced by tracemalloc', 'gauge', (),
+                  lambda: [({}, tracemalloc.get_traced_memory()[0])] if memory_tracker.tracing else [])
+
+@app.before_request
+def start_memory_accounting():
+    if app.config['MEMORY_TRACKING'] and memory_tracker.tracing:
+        g.memory_mark = memory_tracker.begin()
+
+@app.after_request
+def record_memory_usage(response):
+    mark = g.pop('memory_mark', None)
+    usage = memory_tracker.end(mark) if mark is not None else None
+    if usage is not None:
+        if usage['concurrent']:
+            # Other requests' allocations are mixed in; report them flagged, keep them out of the histograms
+            response.headers['X-Memory-Usage'] = (f"peak={usage['peak']}; net={usage['net']}; "
+                                                  f"blocks={usage['blocks']}; concurrent=true")
+        else:
+            endpoint = request.endpoint or 'unmatched'
+            request_memory_peak.observe(usage['peak'], endpoint=endpoint)
+            request_memory_blocks.observe(usage['blocks'], endpoint=endpoint)
+            response.headers['X-Memory-Usage'] = f"peak={usage['peak']}; net={usage['net']}; blocks={usage['blocks']}"
+    return response
+
+@app.teardown_request
+def finish_memory_accounting(error=None):
+    # A request that never reached the after hook must still release the tracked slot
+    mark = g.pop('memory_mark', None)
+    if mark is not None:
+        memory_tracker.end(mark)
+
+# Response compression (gzip, plus br/zstd when those packages are installed)
+response_compressor = ResponseCompressor(
+    min_size=int(os.environ.get('COMPRESSION_MIN_SIZE', 1024)),
+    levels={
+        'gzip': int(os.environ.get('COMPRESSION_LEVEL_GZIP', 6)),
+        'br': int(os.environ.get('COMPRESSION_LEVEL_BR', 4)),
+        'zstd': int(os.environ.get('COMPRESSION_LEVEL_ZSTD', 3))
+    },
+    enabled=os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+)
+
+@app.after_request
+def compress_response(response):
+    return response_compressor.after_request(response, request)
+
+# /api/public/batch runs its parts concurrently on this pool
+batch_dispatcher = BatchDispatcher(
+    app,
+    workers=int(os.environ.get('BATCH_WORKERS', 4)),
+    max_requests=int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+)
+
+# public_portfolio reads its sections concurrently and returns what finished by the deadline.
+# The pool holds six section reads for each of PORTFOLIO_CONCURRENCY simultaneous requests;
+# beyond that, sections run inline in the request thread rather than queue for a worker.
+portfolio_fanout = FanOut(workers=int(os.environ.get(
+    'PORTFOLIO_WORKERS', 6 * int(os.environ.get('PORTFOLIO_CONCURRENCY', 4))
+)))
+app.config['PORTFOLIO_DEADLINE'] = float(os.environ.get('PORTFOLIO_DEADLINE', 2.0))
+# Seconds a partial (deadline-cut) response may be reused; 0 sends it with no-store instead
+app.config['PARTIAL_RESPONSE_TTL'] = int(os.environ.get('PARTIAL_RESPONSE_TTL', 5))
+
+# Reads of a collection written by this process within this many seconds stay on the primary
+app.config['PRIMARY_READS_AFTER_WRITE'] = float(os.environ.get('PRIMARY_READS_AFTER_WRITE', 5))
+
+# Cache-Control policy for public responses, keyed by endpoint name
+app.config['CACHE_CONTROL'] = {
+    'default': {'public': True, 'max_age': 60, 's_maxage': 300, 'stale_while_revalidate': 600},
+    'public_portfolio': {'public': True, 'max_age': 300, 's_maxage': 900, 'stale_while_revalidate': 3600},
+    'get_contact_info': {'public': True, 'max_age': 3600, 's_maxage': 86400, 'stale_while_revalidate': 86400}
+}
+
+# Create indexes for every collection (idempotent)
+if os.environ.get('ENSURE_INDEXES_ON_STARTUP', 'true').lower() == 'true':
+    _, index_errors = ensure_indexes(collections)
+    for error in index_errors:
+        print(f"Index creation failed: {error}")
+
 # Initialize default admin
 if collections['users'].count_documents({'role': 'admin'}) == 0:
-    hashed_pw = bcrypt.hashpw('Admin@1234'.encode('utf-8'), bcrypt.gensalt())
+    hashed_pw = bcrypt.hashpw('Admin@1234'.encode('utf-8'), bcrypt.gensalt(rounds=password_hasher.rounds))
     collections['users'].insert_one({
         'username': 'admin',
         'email': 'admin@vibecanvas.com',
@@ -79,6 +365,29 @@ def generate_token(user_id):
     }, SECRET_KEY, algorithm='HS256')
 
 
+def load_principal(token):
+    """User document for a bearer token, or None; raises the jwt errors for a bad token"""
+    data = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
+    signature = token.rsplit('.', 1)[-1]
+    current_user = principal_cache.get(data['user_id'], signature)
+    if current_user is None:
+        current_user = collections['users'].find_one({'_id': ObjectId(data['user_id'])})
+        if current_user:
+            principal_cache.set(data['user_id'], signature, current_user, expires_at=data.get('exp'))
+    return current_user
+
+
+def request_principal():
+    """User behind the request's bearer token, or None when it is missing or invalid"""
+    parts = request.headers.get('Authorization', '').split(' ')
+    if len(parts) != 2 or not parts[1]:
+        return None
+    try:
+        return load_principal(parts[1])
+    except Exception:
+        return None
+
+
 def token_required(roles=None):
     def decorator(f):
         @wraps(f)
@@ -91,8 +400,7 @@ def token_required(roles=None):
                 return jsonify({'message': 'Token is missing!'}), 401
                 
             try:
-                data = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-                current_user = collections['users'].find_one({'_id': ObjectId(data['user_id'])})
+                current_user = load_principal(token)
                 
                 if not current_user:
                     return jsonify({'message': 'User not found!'}), 404
@@ -109,14 +417,401 @@ def token_required(roles=None):
         return decorated
     return decorator
 
+# ========== RESPONSE CACHE ========== #
+def make_cache_key():
+    """Route path plus the query string with parameters in a stable order"""
+    # Profiling does not change the body, so a profiled request shares the entry
+    # and its profile shows the cache lookup (or hit) an ordinary request makes
+    args = sorted((k, v) for k, v in request.args.items(multi=True) if k != RequestProfiler.QUERY_PARAM)
+    query = '&'.join(f'{k}={v}' for k, v in args)
+    return f'{request.path}?{query}'
+
+
+def apply_validators(response, etag, collection_names, cache_control=None):
+    """Attach ETag, Last-Modified and Cache-Control, answering 304 when the client copy is current"""
+    if cache_control is None:
+        policies = app.config['CACHE_CONTROL']
+        cache_control = format_cache_control(policies.get(request.endpoint, policies['default']))
+    response.set_etag(etag)
+    response.last_modified = collection_versions.shared_last_modified(*collection_names)
+    response.headers['Cache-Control'] = cache_control
+    return response.make_conditional(request)
+
+
+def attach_cache_entry(response, key, entry):
+    """Let the compression hook reuse and store compressed copies of a cached body"""
+    response.encoded_variants = entry.encoded
+    response.attach_encoding = partial(response_cache.attach_encoding, key, entry=entry)
+    return response
+
+
+def cached_response(*collection_names):
+    """Serve a GET route from the response cache, tagged by the collections it reads"""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if request.method != 'GET':
+                return f(*args, **kwargs)
+
+            use_cache = app.config['RESPONSE_CACHE_ENABLED']
+            key = make_cache_key()
+            versions = None
+            if use_cache:
+                # Read before the body is built, so a write racing this request leaves a stale-marked entry
+                versions = {name: collection_versions.shared_version(name) for name in collection_names}
+            entry = response_cache.get(key, versions) if use_cache else None
+            if entry is not None:
+                response = app.response_class(entry.body, status=entry.status, mimetype=entry.mimetype)
+                attach_cache_entry(response, key, entry)
+                return apply_validators(response, entry.etag, collection_names, entry.cache_control)
+
+            response = app.make_response(f(*args, **kwargs))
+            if response.status_code != 200 or response.direct_passthrough:
+                return response
+
+            ttl, cache_control = None, None
+            if g.get('partial_response'):
+                # Degraded output absorbs a burst while reads are slow, then gives way to complete data
+                ttl = app.config['PARTIAL_RESPONSE_TTL']
+                if not ttl:
+                    response.headers['Cache-Control'] = 'no-store'
+                    return response
+                cache_control = format_cache_control({'public': True, 'max_age': ttl})
+
+            body = response.get_data()
+            etag = make_etag(body)
+            if use_cache:
+                entry = response_cache.set(key, body, response.status_code, response.mimetype, collection_names,
+                                           etag=etag, ttl=ttl, cache_control=cache_control, versions=versions)
+                if entry is not None:
+                    attach_cache_entry(response, key, entry)
+            return apply_validators(response, etag, collection_names, cache_control)
+        return decorated
+    return decorator
+
+
+def invalidates_cache(*collection_names):
+    """Drop cached responses and bump the version of these collections after a write"""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            try:
+                return f(*args, **kwargs)
+            finally:
+                if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+                    collection_versions.bump(*collection_names)
+                    response_cache.invalidate(*collection_names)
+                    for name in collection_names:
+                        count_cache.invalidate(name)
+        return decorated
+    return decorator
+
+
+def public_collection(name):
+    """Collection handle for public reads: secondaries when configured, the primary right after a write"""
+    if public_db is db:
+        return collections[name]
+    window = timedelta(seconds=app.config['PRIMARY_READS_AFTER_WRITE'])
+    if datetime.now(timezone.utc) - collection_versions.last_modified(name) < window:
+        # A lagging secondary would put the pre-write version back into the response cache
+        return collections[name]
+    return public_db[name]
+
+
+@app.route('/api/admin/cache/stats', methods=['GET'])
+@token_required(roles=['admin'])
+def cache_stats(current_user):
+    return jsonify({
+        'responses': response_cache.stats(),
+        'versions': collection_versions.snapshot(),
+        'blog_counters': blog_counters.stats(),
+        'principals': principal_cache.stats(),
+        'uploads': blob_store.stats(),
+        'compression': response_compressor.stats()
+    })
+
+
+@app.route('/api/admin/db/pool', methods=['GET'])
+@token_required(roles=['admin'])
+def db_pool_stats(current_user):
+    return jsonify({
+        'options': mongo_options,
+        'public_read_preference': public_read_preference.document if public_read_preference else {'mode': 'primary'},
+        'pools': mongo_pool_stats.snapshot()
+    })
+
+
+@app.route('/api/admin/profiles', methods=['GET'])
+@token_required(roles=['admin'])
+def list_profiles(current_user):
+    return jsonify({'profiles': request_profiler.list()})
+
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+@token_required(roles=['admin'])
+def get_profile(current_user, profile_id):
+    """One stored profile; ?format=collapsed returns folded stacks for flame graph tools"""
+    profile = request_profiler.get(profile_id)
+    if profile is None:
+        return jsonify({'message': 'Profile not found'}), 404
+    if request.args.get('format') == 'collapsed':
+        if profile.mode != 'sample':
+            return jsonify({'message': 'Collapsed stacks are only recorded in sample mode'}), 400
+        return app.response_class(profile.collapsed(), content_type='text/plain; charset=utf-8')
+    result = profile.summary()
+    if profile.mode == 'sample':
+        result['call_tree'] = profile.call_tree()
+    else:
+        result['functions'] = profile.functions
+    return jsonify(result)
+
+
+@app.route('/api/admin/memory', methods=['GET'])
+@token_required(roles=['admin'])
+def memory_status(current_user):
+    current, peak = tracemalloc.get_traced_memory()
+    return jsonify({
+        'tracing': memory_tracker.tracing,
+        'per_request': app.config['MEMORY_TRACKING'],
+        'untracked_requests': memory_tracker.untracked,
+        'traced_bytes': current,
+        'peak_bytes': peak,
+        'snapshots': memory_tracker.list()
+    })
+
+
+def memory_report_args():
+    group_by = request.args.get('group_by', 'lineno')
+    if group_by not in GROUPINGS:
+        raise ValueError(f"group_by must be one of: {', '.join(GROUPINGS)}")
+    return group_by, min(max(int(request.args.get('limit', 20)), 1), 200)
+
+
+@app.route('/api/admin/memory/snapshots', methods=['POST'])
+@token_required(roles=['admin'])
+def take_memory_snapshot(current_user):
+    """Take a tracemalloc snapshot; the first one also starts tracing, so it sees nothing older"""
+    try:
+        group_by, limit = memory_report_args()
+        label = (request.get_json(silent=True) or {}).get('label')
+        entry = memory_tracker.take(label)
+        return jsonify({**MemoryTracker.describe(entry), 'top': memory_tracker.top(entry, group_by, limit)}), 201
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+
+@app.route('/api/admin/memory/snapshots/<snapshot_id>', methods=['GET'])
+@token_required(roles=['admin'])
+def get_memory_snapshot(current_user, snapshot_id):
+    try:
+        group_by, limit = memory_report_args()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    entry = memory_tracker.get(snapshot_id)
+    if entry is None:
+        return jsonify({'message': 'Snapshot not found'}), 404
+    return jsonify({**MemoryTracker.describe(entry), 'top': memory_tracker.top(entry, group_by, limit)})
+
+
+@app.route('/api/admin/memory/diff', methods=['GET'])
+@token_required(roles=['admin'])
+def diff_memory_snapshots(current_user):
+    """Growth from snapshot ?from= to ?to=, or to a fresh snapshot when ?to= is omitted"""
+    try:
+        group_by, limit = memory_report_args()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    before = memory_tracker.get(request.args.get('from', ''))
+    if before is None:
+        return jsonify({'message': 'Snapshot not found: from'}), 404
+    if request.args.get('to'):
+        after = memory_tracker.get(request.args['to'])
+        if after is None:
+            return jsonify({'message': 'Snapshot not found: to'}), 404
+    else:
+        after = memory_tracker.take('diff')
+    return jsonify({
+        'from': MemoryTracker.describe(before),
+        'to': MemoryTracker.describe(after),
+        'growth': memory_tracker.diff(before, after, group_by, limit)
+    })
+
+
+@app.route('/api/admin/memory/snapshots', methods=['DELETE'])
+@token_required(roles=['admin'])
+def clear_memory_snapshots(current_user):
+    """Drop every snapshot and stop tracing, unless per-request accounting needs it"""
+    if app.config['MEMORY_TRACKING']:
+        memory_tracker.stop()
+        memory_tracker.start()
+    else:
+        memory_tracker.stop()
+    return jsonify({'message': 'Memory snapshots cleared'})
+
+
+@app.route('/api/admin/slow-queries', methods=['GET'])
+@token_required(roles=['admin'])
+def slow_queries(current_user):
+    """Recorded slow query shapes, worst total time first"""
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+        hours = float(request.args.get('hours', 24))
+    except ValueError:
+        return jsonify({'message': 'limit and hours must be numbers'}), 400
+    if slow_query_log.collection is None:
+        return jsonify({'recorder': slow_query_log.stats(), 'shapes': []})
+
+    try:
+        log = slow_query_log.collection
+        shapes = list(log.aggregate([
+            {'$match': {'ts': {'$gte': datetime.now(timezone.utc) - timedelta(hours=hours)}}},
+            {'$sort': {'ts': -1}},
+            {'$group': {
+                '_id': '$shape_id',
+                'shape': {'$first': '$shape'},
+                'collection': {'$first': '$collection'},
+                'command_name': {'$first': '$command_name'},
+                'count': {'$sum': 1},
+                'total_ms': {'$sum': '$duration_ms'},
+                'avg_ms': {'$avg': '$duration_ms'},
+                'max_ms': {'$max': '$duration_ms'},
+                'routes': {'$addToSet': '$route'},
+                'last_seen': {'$first': '$ts'},
+                'example': {'$first': '$command'}
+            }},
+            {'$sort': {'total_ms': -1}},
+            {'$limit': limit}
+        ]))
+        for shape in shapes:
+            shape['shape_id'] = shape.pop('_id')
+            # Only some samples carry a plan (one explain per shape per interval)
+            sample = log.find_one({'shape_id': shape['shape_id'], 'explain': {'$ne': None}},
+                                  {'explain': 1}, sort=[('ts', -1)])
+            shape['explain'] = sample['explain'] if sample else None
+        return jsonify({'recorder': slow_query_log.stats(), 'shapes': shapes})
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+
+def cache_metric_values(field):
+    return [
+        ({'cache': 'responses'}, response_cache.stats()[field]),
+        ({'cache': 'principals'}, principal_cache.stats()[field])
+    ]
+
+metrics.collector('cache_hits_total', 'Cache lookups that hit', 'counter', ('cache',),
+                  lambda: cache_metric_values('hits'))
+metrics.collector('cache_misses_total', 'Cache lookups that missed', 'counter', ('cache',),
+                  lambda: cache_metric_values('misses'))
+metrics.collector('cache_hit_ratio', 'Share of cache lookups that hit since start', 'gauge', ('cache',),
+                  lambda: cache_metric_values('hit_ratio'))
+metrics.collector('response_cache_bytes', 'Bytes held by the response cache', 'gauge', (),
+                  lambda: [({}, response_cache.stats()['bytes'])])
+metrics.collector('mongodb_pool_connections', 'Open MongoDB connections per server and state', 'gauge',
+                  ('address', 'state'),
+                  lambda: [({'address': address, 'state': state}, pool[state])
+                           for address, pool in mongo_pool_stats.snapshot().items()
+                           for state in ('in_use', 'idle')])
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus scrape endpoint; set METRICS_TOKEN to require a bearer token"""
+    token = app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'message': 'Unauthorized'}), 401
+    return app.response_class(metrics.render(), content_type=Registry.CONTENT_TYPE)
+
+
+@app.route('/api/admin/cache', methods=['DELETE'])
+@token_required(roles=['admin'])
+def clear_cache(current_user):
+    response_cache.clear()
+    principal_cache.clear()
+    return jsonify({'message': 'Cache cleared'})
+
+# ========== PAGINATION ========== #
+def page_link(**params):
+    """Current URL with the paging parameters replaced"""
+    args = request.args.to_dict(flat=False)
+    for name in ('cursor', 'page'):
+        args.pop(name, None)
+    args.update(params)
+    return f'{request.path}?{urlencode(args, doseq=True)}'
+
+
+def paginate(collection, query, sort_field, sort_direction=-1, projection=None):
+    """Page through a collection with ?cursor= tokens built on (sort_field, _id).
+
+    Older clients that still send ?page= get skip/limit with a cached total.
+    Totals are only counted on request (?include_total=true); an unfiltered
+    listing otherwise reports the collection's estimated size.
+    Returns (docs, meta) where meta is merged into the response envelope.
+    """
+    per_page = min(max(int(request.args.get('per_page', 10)), 1), MAX_PER_PAGE)
+    meta = {'per_page': per_page}
+
+    if 'page' in request.args and 'cursor' not in request.args:
+        page = max(int(request.args.get('page', 1)), 1)
+        total = count_cache.count(collection, query)
+        sort = [('_id', sort_direction)] if sort_field == '_id' else [(sort_field, sort_direction), ('_id', sort_direction)]
+        docs = list(collection.find(query, projection)
+                    .sort(sort)
+                    .skip((page - 1) * per_page)
+                    .limit(per_page))
+        meta.update({
+            'total': total,
+            'page': page,
+            'total_pages': (total + per_page - 1) // per_page
+        })
+        return docs, meta
+
+    docs, next_cursor, prev_cursor = keyset_page(
+        collection, query, sort_field, sort_direction, per_page,
+        cursor=request.args.get('cursor'), projection=projection
+    )
+    meta.update({
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+        'links': {
+            'next': page_link(cursor=next_cursor) if next_cursor else None,
+            'prev': page_link(cursor=prev_cursor) if prev_cursor else None
+        }
+    })
+    if request.args.get('include_total', 'false').lower() == 'true':
+        meta['total'] = count_cache.count(collection, query)
+    elif not query:
+        meta['estimated_total'] = collection.estimated_document_count()
+    return docs, meta
+
+def invalidate_principal(user_id):
+    """Call after changing a user's role or password so cached tokens are re-checked"""
+    principal_cache.invalidate_user(user_id)
+
 # In your app.py, update the login route:
 @app.route('/api/login', methods=['POST'])
 def login():
     data = request.json
     user = collections['users'].find_one({'email': data.get('email'), 'role': 'admin'})
     
-    if not user or not bcrypt.checkpw(data.get('password').encode('utf-8'), user['password'].encode('utf-8')):
-        return jsonify({'message': 'Invalid credentials or not an admin'}), 401
+    try:
+        if not user or not password_hasher.verify(data.get('password'), user['password']):
+            return jsonify({'message': 'Invalid credentials or not an admin'}), 401
+    except HasherSaturated:
+        return jsonify({'message': 'Too many login attempts, try again shortly'}), 429, {'Retry-After': '1'}
+    except HasherTimeout:
+        return jsonify({'message': 'Login is temporarily unavailable'}), 503, {'Retry-After': '5'}
+    
+    # Upgrade the stored hash when the configured cost factor changed
+    if password_hasher.needs_rehash(user['password']):
+        try:
+            new_hash = password_hasher.hash(data.get('password'))
+            collections['users'].update_one({'_id': user['_id']}, {'$set': {'password': new_hash}})
+            invalidate_principal(user['_id'])
+        except (HasherSaturated, HasherTimeout):
+            pass  # Try again on the next login
         
     token = generate_token(user['_id'])
     return jsonify({
@@ -133,15 +828,63 @@ def login():
 
 
 # ========== BLOG ROUTES ========== #
+def unique_slug(title, exclude_id=None):
+    """Slug from a post title, suffixed until no other post uses it"""
+    slug = title.lower().replace(' ', '-')
+    query = {'slug': slug}
+    if exclude_id is not None:
+        query['_id'] = {'$ne': exclude_id}
+    counter = 1
+    while collections['blog'].find_one(query):
+        slug = f"{slug}-{counter}"
+        query['slug'] = slug
+        counter += 1
+    return slug
+
+def get_blog_search_index():
+    """The blog search index, rebuilt from MongoDB when any worker has written posts since it was built"""
+    version = collection_versions.shared_version('blog')
+    if blog_search.is_stale(version):
+        with blog_search_build_lock:
+            if blog_search.is_stale(version):
+                blog_search.rebuild(collections['blog'].find(
+                    {}, {'title': 1, 'content': 1, 'categories': 1, 'featured': 1}
+                ), version)
+    return blog_search
+
+
+def search_blog_posts(search, category, featured, projection=None):
+    """Rank posts with the BM25 index and return one page of them with highlighted snippets"""
+    page = max(int(request.args.get('page', 1)), 1)
+    per_page = min(max(int(request.args.get('per_page', 10)), 1), MAX_PER_PAGE)
+
+    index = get_blog_search_index()
+    ranked = index.search(search, category=category, featured=featured)
+    page_hits = ranked[(page - 1) * per_page:page * per_page]
+
+    found = collections['blog'].find({'_id': {'$in': [ObjectId(doc_id) for doc_id, _ in page_hits]}}, projection)
+    posts_by_id = {str(post['_id']): post for post in found}
+    posts = []
+    for doc_id, score in page_hits:
+        post = posts_by_id.get(doc_id)
+        if post:
+            post['score'] = round(score, 4)
+            post['highlight'] = index.snippet(doc_id, search)
+            posts.append(post)
+
+    total = len(ranked)
+    return posts, {
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'total_pages': (total + per_page - 1) // per_page
+    }
+
 
 # Get all blog posts (public)
 @app.route('/api/blog/posts', methods=['GET'])
 def get_blog_posts():
     try:
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
-        skip = (page - 1) * per_page
-        
         # Get optional filters
         category = request.args.get('category')
         search = request.args.get('search')
@@ -150,27 +893,22 @@ def get_blog_posts():
         query = {}
         if category and category != 'all':
             query['categories'] = category
-        if search:
-            query['$or'] = [
-                {'title': {'$regex': search, '$options': 'i'}},
-                {'content': {'$regex': search, '$options': 'i'}}
-            ]
         if featured:
             query['featured'] = featured.lower() == 'true'
         
-        total = collections['blog'].count_documents(query)
-        posts = list(collections['blog'].find(query)
-                    .sort('createdAt', -1)
-                    .skip(skip)
-                    .limit(per_page))
+        fields = parse_fields(request.args.get('fields'), 'blog')
+        projection = projection_for('blog', fields, extra=('createdAt',))
+        if search and search.strip():
+            posts, meta = search_blog_posts(search, query.get('categories'), query.get('featured'), projection)
+        else:
+            posts, meta = paginate(public_collection('blog'), query, 'createdAt', projection=projection)
         
         return jsonify({
-            'data': json_util.dumps(posts),
-            'total': total,
-            'page': page,
-            'per_page': per_page,
-            'total_pages': (total + per_page - 1) // per_page
+            'data': [select_fields(post, fields) for post in posts],
+            **meta
         })
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
@@ -178,7 +916,7 @@ def get_blog_posts():
 @app.route('/api/blog/categories', methods=['GET'])
 def get_blog_categories():
     try:
-        categories = collections['blog'].distinct('categories')
+        categories = public_collection('blog').distinct('categories')
         return jsonify(categories or ['technology', 'design', 'business'])
     except Exception as e:
         return jsonify(['technology', 'design', 'business']), 200
@@ -187,17 +925,14 @@ def get_blog_categories():
 @app.route('/api/blog/posts/<id>', methods=['GET'])
 def get_blog_post(id):
     try:
-        post = collections['blog'].find_one({'_id': ObjectId(id)})
+        post = public_collection('blog').find_one({'_id': ObjectId(id)})
         if not post:
             return jsonify({'message': 'Post not found'}), 404
         
-        # Increment view count
-        collections['blog'].update_one(
-            {'_id': ObjectId(id)},
-            {'$inc': {'views': 1}}
-        )
+        # Increment view count (written behind)
+        blog_counters.increment(post['_id'], 'views')
         
-        return json_util.dumps(post)
+        return jsonify(blog_counters.apply_pending(post))
     except:
         return jsonify({'message': 'Invalid ID format'}), 400
 
@@ -205,17 +940,14 @@ def get_blog_post(id):
 @app.route('/api/blog/posts/slug/<slug>', methods=['GET'])
 def get_blog_post_by_slug(slug):
     try:
-        post = collections['blog'].find_one({'slug': slug})
+        post = public_collection('blog').find_one({'slug': slug})
         if not post:
             return jsonify({'message': 'Post not found'}), 404
             
-        # Increment view count
-        collections['blog'].update_one(
-            {'slug': slug},
-            {'$inc': {'views': 1}}
-        )
+        # Increment view count (written behind)
+        blog_counters.increment(post['_id'], 'views')
         
-        return json_util.dumps(post)
+        return jsonify(blog_counters.apply_pending(post))
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
@@ -223,13 +955,14 @@ def get_blog_post_by_slug(slug):
 @app.route('/api/blog/posts/<id>/like', methods=['POST'])
 def like_blog_post(id):
     try:
-        result = collections['blog'].update_one(
-            {'_id': ObjectId(id)},
-            {'$inc': {'likes': 1}}
-        )
-        if result.modified_count == 0:
+        post = collections['blog'].find_one({'_id': ObjectId(id)}, {'_id': 1, 'likes': 1})
+        if not post:
             return jsonify({'message': 'Post not found'}), 404
-        return jsonify({'message': 'Post liked successfully'})
+        blog_counters.increment(post['_id'], 'likes')
+        return jsonify({
+            'message': 'Post liked successfully',
+            'likes': blog_counters.apply_pending(post).get('likes', 0)
+        })
     except:
         return jsonify({'message': 'Invalid ID format'}), 400
 
@@ -239,13 +972,16 @@ def like_blog_post(id):
 def admin_get_blog_posts(current_user):
     try:
         posts = list(collections['blog'].find({}).sort('createdAt', -1))
-        return json_util.dumps(posts)
+        for post in posts:
+            blog_counters.apply_pending(post)
+        return jsonify(posts)
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
 # Admin - Create new post
 @app.route('/api/admin/blog/posts', methods=['POST'])
 @token_required(roles=['admin'])
+@invalidates_cache('blog')
 def admin_create_blog_post(current_user):
     data = request.json
     required_fields = ['title', 'content']
@@ -256,13 +992,7 @@ def admin_create_blog_post(current_user):
     try:
         # Generate slug from title if not provided
         if 'slug' not in data:
-            slug = data['title'].lower().replace(' ', '-')
-            # Ensure slug is unique
-            counter = 1
-            while collections['blog'].find_one({'slug': slug}):
-                slug = f"{slug}-{counter}"
-                counter += 1
-            data['slug'] = slug
+            data['slug'] = unique_slug(data['title'])
         
         # Set default values if not provided
         if 'excerpt' not in data:
@@ -287,6 +1017,7 @@ def admin_create_blog_post(current_user):
         data['likes'] = 0
         
         result = collections['blog'].insert_one(data)
+        blog_search.add(data)
         return jsonify({
             'id': str(result.inserted_id),
             'message': 'Blog post created successfully'
@@ -297,6 +1028,7 @@ def admin_create_blog_post(current_user):
 # Admin - Update post
 @app.route('/api/admin/blog/posts/<id>', methods=['PUT'])
 @token_required(roles=['admin'])
+@invalidates_cache('blog')
 def admin_update_blog_post(current_user, id):
     try:
         data = request.json
@@ -322,14 +1054,9 @@ def admin_update_blog_post(current_user, id):
         if 'title' in data:
             update_data['title'] = data['title']
             if 'slug' not in data:  # Only update slug if title changed and slug not explicitly provided
-                slug = data['title'].lower().replace(' ', '-')
                 # Ensure slug is unique
-                if slug != existing_post.get('slug'):
-                    counter = 1
-                    while collections['blog'].find_one({'slug': slug, '_id': {'$ne': obj_id}}):
-                        slug = f"{slug}-{counter}"
-                        counter += 1
-                    update_data['slug'] = slug
+                if data['title'].lower().replace(' ', '-') != existing_post.get('slug'):
+                    update_data['slug'] = unique_slug(data['title'], exclude_id=obj_id)
         
         if 'content' in data:
             update_data['content'] = data['content']
@@ -369,6 +1096,7 @@ def admin_update_blog_post(current_user, id):
         if result.modified_count == 0:
             return jsonify({'message': 'No changes made'}), 200
             
+        blog_search.add(collections['blog'].find_one({'_id': obj_id}))
         return jsonify({'message': 'Post updated successfully'})
 
     except Exception as e:
@@ -377,15 +1105,31 @@ def admin_update_blog_post(current_user, id):
 # Admin - Delete post
 @app.route('/api/admin/blog/posts/<id>', methods=['DELETE'])
 @token_required(roles=['admin'])
+@invalidates_cache('blog')
 def admin_delete_blog_post(current_user, id):
     try:
         result = collections['blog'].delete_one({'_id': ObjectId(id)})
         if result.deleted_count == 0:
             return jsonify({'message': 'Post not found'}), 404
+        blog_search.remove(id)
         return jsonify({'message': 'Post deleted successfully'})
     except:
         return jsonify({'message': 'Invalid ID format'}), 400
 
+# Admin - Rebuild the blog search index from scratch
+@app.route('/api/admin/blog/search/rebuild', methods=['POST'])
+@token_required(roles=['admin'])
+def admin_rebuild_blog_search(current_user):
+    try:
+        version = collection_versions.shared_version('blog')
+        with blog_search_build_lock:
+            blog_search.rebuild(collections['blog'].find(
+                {}, {'title': 1, 'content': 1, 'categories': 1, 'featured': 1}
+            ), version)
+        return jsonify({'message': 'Search index rebuilt', **blog_search.stats()})
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
 # Admin - Upload blog images
 @app.route('/api/admin/blog/upload', methods=['POST'])
 @token_required(roles=['admin'])
@@ -402,12 +1146,8 @@ def admin_upload_blog_image(current_user):
         return jsonify({'message': 'File type not allowed'}), 400
         
     try:
-        filename = secure_filename(f"blog_{uuid.uuid4().hex}.{file.filename.rsplit('.', 1)[1].lower()}")
-        filepath = os.path.join(UPLOAD_FOLDER, 'blog', filename)
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        file.save(filepath)
         return jsonify({
-            'url': f'/uploads/blog/{filename}',
+            'url': store_upload(file, 'blog'),
             'message': 'File uploaded successfully'
         })
     except Exception as e:
@@ -416,11 +1156,12 @@ def admin_upload_blog_image(current_user):
 # =============== SKILLS ROUTES ================
 @app.route('/api/skills', methods=['GET', 'POST'])
 @token_required(roles=['admin'])
+@invalidates_cache('skills')
 def skills(current_user):
     if request.method == 'GET':
         try:
             skills = list(db.skills.find({}).sort('name', 1))
-            return json_util.dumps(skills)
+            return jsonify(skills)
         except Exception as e:
             return jsonify({'message': str(e)}), 500
 
@@ -451,13 +1192,7 @@ def skills(current_user):
             if 'image' in request.files:
                 file = request.files['image']
                 if file and allowed_file(file.filename):
-                    filename = secure_filename(f"{uuid.uuid4().hex}.{file.filename.rsplit('.', 1)[1].lower()}")
-                    filepath = os.path.join(UPLOAD_FOLDER, filename)
-                    file.save(filepath)
-                    print(f"File saved to: {filepath}")  # Debug logging
-                    if os.path.exists(filepath):
-                        print("File exists after saving")  # Verify
-                    project_data['image_url'] = f'/uploads/{filename}'
+                    skill_data['imageUrl'] = store_upload(file, 'skills')
 
             result = db.skills.insert_one(skill_data)
             return jsonify({
@@ -471,6 +1206,7 @@ def skills(current_user):
 
 @app.route('/api/skills/<id>', methods=['GET', 'PUT', 'DELETE'])
 @token_required(roles=['admin'])
+@invalidates_cache('skills')
 def skill(current_user, id):
     try:
         if not ObjectId.is_valid(id):
@@ -482,7 +1218,7 @@ def skill(current_user, id):
             skill = db.skills.find_one({'_id': obj_id})
             if not skill:
                 return jsonify({'message': 'Skill not found'}), 404
-            return json_util.dumps(skill)
+            return jsonify(skill)
             
         elif request.method == 'PUT':
             # Handle both JSON and form data
@@ -508,18 +1244,11 @@ def skill(current_user, id):
             if 'image' in request.files:
                 file = request.files['image']
                 if file and allowed_file(file.filename):
-                    # Delete old image if exists
+                    # Store the new image, then drop this skill's reference to the old one
                     old_skill = db.skills.find_one({'_id': obj_id})
-                    if old_skill and 'imageUrl' in old_skill:
-                        old_filename = old_skill['imageUrl'].split('/')[-1]
-                        old_path = os.path.join(UPLOAD_FOLDER, old_filename)
-                        if os.path.exists(old_path):
-                            os.remove(old_path)
-                    
-                    # Save new image
-                    filename = secure_filename(f"{uuid.uuid4().hex}.{file.filename.rsplit('.', 1)[1].lower()}")
-                    file.save(os.path.join(UPLOAD_FOLDER, filename))
-                    update_data['imageUrl'] = f'/uploads/{filename}'
+                    update_data['imageUrl'] = store_upload(file, 'skills')
+                    if old_skill:
+                        release_upload(old_skill.get('imageUrl'))
 
             result = db.skills.update_one(
                 {'_id': obj_id},
@@ -537,12 +1266,8 @@ def skill(current_user, id):
             if not skill:
                 return jsonify({'message': 'Skill not found'}), 404
                 
-            # Delete associated image if exists
-            if 'imageUrl' in skill:
-                filename = skill['imageUrl'].split('/')[-1]
-                filepath = os.path.join(UPLOAD_FOLDER, filename)
-                if os.path.exists(filepath):
-                    os.remove(filepath)
+            # Release the associated image; it is deleted once nothing else uses it
+            release_upload(skill.get('imageUrl'))
             
             # Delete the skill
             result = db.skills.delete_one({'_id': obj_id})
@@ -564,15 +1289,7 @@ from datetime import datetime, timezone
 def get_projects(current_user):
     """Get paginated list of projects (admin only)"""
     try:
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
-        skip = (page - 1) * per_page
-        
-        total = collections['projects'].count_documents({})
-        projects = list(collections['projects'].find({})
-                      .sort('created_at', -1)
-                      .skip(skip)
-                      .limit(per_page))
+        projects, meta = paginate(collections['projects'], {}, 'created_at')
         
         # Convert ObjectId to string for each project
         for project in projects:
@@ -582,16 +1299,16 @@ def get_projects(current_user):
         
         return jsonify({
             'data': projects,  # Direct array
-            'total': total,
-            'page': page,
-            'per_page': per_page,
-            'total_pages': (total + per_page - 1) // per_page
+            **meta
         })
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Error fetching projects: {str(e)}'}), 500
 
 @app.route('/api/projects', methods=['POST'])
 @token_required(roles=['admin'])
+@invalidates_cache('projects')
 def create_project(current_user):
     """Create a new project"""
     try:
@@ -620,9 +1337,7 @@ def create_project(current_user):
         if 'image' in request.files:
             file = request.files['image']
             if file and allowed_file(file.filename):
-                filename = secure_filename(f"project_{uuid.uuid4().hex}.{file.filename.rsplit('.', 1)[1].lower()}")
-                file.save(os.path.join(UPLOAD_FOLDER, filename))
-                project_data['image_url'] = f'/uploads/{filename}'
+                project_data['image_url'] = store_upload(file, 'projects')
         
         result = collections['projects'].insert_one(project_data)
         
@@ -650,13 +1365,14 @@ def get_project(current_user, id):
         if not project:
             return jsonify({'message': 'Project not found'}), 404
             
-        return json_util.dumps(project)
+        return jsonify(project)
         
     except Exception as e:
         return jsonify({'message': f'Error fetching project: {str(e)}'}), 500
 
 @app.route('/api/projects/<id>', methods=['PUT'])
 @token_required(roles=['admin'])
+@invalidates_cache('projects')
 def update_project(current_user, id):
     """Update an existing project"""
     try:
@@ -686,17 +1402,9 @@ def update_project(current_user, id):
         if 'image' in request.files:
             file = request.files['image']
             if file and allowed_file(file.filename):
-                # Delete old image if exists
-                if 'image_url' in existing_project:
-                    old_filename = existing_project['image_url'].split('/')[-1]
-                    old_path = os.path.join(UPLOAD_FOLDER, old_filename)
-                    if os.path.exists(old_path):
-                        os.remove(old_path)
-                
-                # Save new image
-                filename = secure_filename(f"project_{uuid.uuid4().hex}.{file.filename.rsplit('.', 1)[1].lower()}")
-                file.save(os.path.join(UPLOAD_FOLDER, filename))
-                update_data['image_url'] = f'/uploads/{filename}'
+                # Store the new image, then drop this record's reference to the old one
+                update_data['image_url'] = store_upload(file, 'projects')
+                release_upload(existing_project.get('image_url'))
 
         result = collections['projects'].update_one(
             {'_id': obj_id},
@@ -716,6 +1424,7 @@ def update_project(current_user, id):
 
 @app.route('/api/projects/<id>', methods=['DELETE'])
 @token_required(roles=['admin'])
+@invalidates_cache('projects')
 def delete_project(current_user, id):
     """Delete a project"""
     try:
@@ -730,12 +1439,8 @@ def delete_project(current_user, id):
         if not project:
             return jsonify({'message': 'Project not found'}), 404
             
-        # Delete associated image if exists
-        if 'image_url' in project:
-            filename = project['image_url'].split('/')[-1]
-            filepath = os.path.join(UPLOAD_FOLDER, filename)
-            if os.path.exists(filepath):
-                os.remove(filepath)
+        # Release the associated image; it is deleted once nothing else uses it
+        release_upload(project.get('image_url'))
         
         # Delete the project
         result = collections['projects'].delete_one({'_id': obj_id})
@@ -750,30 +1455,42 @@ def delete_project(current_user, id):
 
 # Public route for projects
 @app.route('/api/public/projects', methods=['GET'])
+@cached_response('projects')
 def get_public_projects():
-    """Get public projects (no auth required)"""
+    """Get public projects (no auth required), paginated when ?cursor= or ?per_page= is given"""
     try:
-        projects = list(collections['projects'].find(
-            {'status': 'active'},
-            {
-                '_id': 1,
-                'title': 1,
-                'description': 1,
-                'link': 1,
-                'technologies': 1,
-                'image_url': 1,
-                'created_at': 1,
-                'featured': 1
-            }
-        ).sort('created_at', -1))
+        query = {'status': 'active'}
+        projection = {
+            '_id': 1,
+            'title': 1,
+            'description': 1,
+            'link': 1,
+            'technologies': 1,
+            'image_url': 1,
+            'created_at': 1,
+            'featured': 1
+        }
+        fields = parse_fields(request.args.get('fields'), 'projects')
+        projection = projection_for('projects', fields, default=projection, extra=('created_at',))
+        meta = None
+        if 'cursor' in request.args or 'per_page' in request.args:
+            projects, meta = paginate(public_collection('projects'), query, 'created_at', projection=projection)
+        else:
+            projects = list(public_collection('projects').find(query, projection).sort('created_at', -1))
         
         # Convert image URLs to full URLs
         for project in projects:
             project['_id'] = str(project['_id'])
             if project.get('image_url'):
+                add_srcset(project, 'image_url', base='http://localhost:5000')
                 project['image_url'] = f'http://localhost:5000{project["image_url"]}'
+        projects = [select_fields(project, fields) for project in projects]
         
-        return json_util.dumps(projects)
+        if meta is not None:
+            return jsonify({'data': projects, **meta})
+        return jsonify(projects)
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Error fetching public projects: {str(e)}'}), 500
     
@@ -783,28 +1500,20 @@ def get_public_projects():
 def get_educations():
     """Get paginated list of educations"""
     try:
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
-        skip = (page - 1) * per_page
-        
-        total = collections['education'].count_documents({})
-        educations = list(collections['education'].find({})
-                      .sort('start_date', -1)
-                      .skip(skip)
-                      .limit(per_page))
+        educations, meta = paginate(collections['education'], {}, 'start_date')
         
         return jsonify({
-            'data': json_util.dumps(educations),
-            'total': total,
-            'page': page,
-            'per_page': per_page,
-            'total_pages': (total + per_page - 1) // per_page
+            'data': educations,
+            **meta
         })
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Error fetching educations: {str(e)}'}), 500
 
 @app.route('/api/education', methods=['POST'])
 @token_required(roles=['admin'])
+@invalidates_cache('education')
 def create_education(current_user):
     """Create a new education"""
     try:
@@ -834,9 +1543,7 @@ def create_education(current_user):
         if 'image' in request.files:
             file = request.files['image']
             if file and allowed_file(file.filename):
-                filename = secure_filename(f"edu_{uuid.uuid4().hex}.{file.filename.rsplit('.', 1)[1].lower()}")
-                file.save(os.path.join(UPLOAD_FOLDER, filename))
-                education_data['image_url'] = f'/uploads/{filename}'
+                education_data['image_url'] = store_upload(file, 'education')
         
         result = collections['education'].insert_one(education_data)
         
@@ -863,13 +1570,14 @@ def get_education(id):
         if not education:
             return jsonify({'message': 'Education not found'}), 404
             
-        return json_util.dumps(education)
+        return jsonify(education)
         
     except Exception as e:
         return jsonify({'message': f'Error fetching education: {str(e)}'}), 500
 
 @app.route('/api/education/<id>', methods=['PUT'])
 @token_required(roles=['admin'])
+@invalidates_cache('education')
 def update_education(current_user, id):
     """Update an existing education"""
     try:
@@ -903,17 +1611,9 @@ def update_education(current_user, id):
         if 'image' in request.files:
             file = request.files['image']
             if file and allowed_file(file.filename):
-                # Delete old image if exists
-                if 'image_url' in existing_edu:
-                    old_filename = existing_edu['image_url'].split('/')[-1]
-                    old_path = os.path.join(UPLOAD_FOLDER, old_filename)
-                    if os.path.exists(old_path):
-                        os.remove(old_path)
-                
-                # Save new image
-                filename = secure_filename(f"edu_{uuid.uuid4().hex}.{file.filename.rsplit('.', 1)[1].lower()}")
-                file.save(os.path.join(UPLOAD_FOLDER, filename))
-                update_data['image_url'] = f'/uploads/{filename}'
+                # Store the new image, then drop this record's reference to the old one
+                update_data['image_url'] = store_upload(file, 'education')
+                release_upload(existing_edu.get('image_url'))
 
         result = collections['education'].update_one(
             {'_id': obj_id},
@@ -933,6 +1633,7 @@ def update_education(current_user, id):
 
 @app.route('/api/education/<id>', methods=['DELETE'])
 @token_required(roles=['admin'])
+@invalidates_cache('education')
 def delete_education(current_user, id):
     """Delete an education"""
     try:
@@ -947,12 +1648,8 @@ def delete_education(current_user, id):
         if not education:
             return jsonify({'message': 'Education not found'}), 404
             
-        # Delete associated image if exists
-        if 'image_url' in education:
-            filename = education['image_url'].split('/')[-1]
-            filepath = os.path.join(UPLOAD_FOLDER, filename)
-            if os.path.exists(filepath):
-                os.remove(filepath)
+        # Release the associated image; it is deleted once nothing else uses it
+        release_upload(education.get('image_url'))
         
         # Delete the education
         result = collections['education'].delete_one({'_id': obj_id})
@@ -967,6 +1664,7 @@ def delete_education(current_user, id):
 
 # Public route for educations
 @app.route('/api/public/education', methods=['GET'])
+@cached_response('education')
 def get_public_educations():
     """Get public educations (no auth required)"""
     try:
@@ -976,9 +1674,10 @@ def get_public_educations():
         if featured is not None:
             query['featured'] = featured.lower() == 'true'
             
-        educations = list(collections['education'].find(
+        fields = parse_fields(request.args.get('fields'), 'education')
+        educations = list(public_collection('education').find(
             query,
-            {
+            projection_for('education', fields, default={
                 '_id': 1,
                 'degree': 1,
                 'institution': 1,
@@ -989,14 +1688,19 @@ def get_public_educations():
                 'image_url': 1,
                 'created_at': 1,
                 'featured': 1
-            }
+            })
         ).sort('start_date', -1))
+        for education in educations:
+            add_srcset(education, 'image_url')
         
-        return json_util.dumps(educations)
+        return jsonify([select_fields(education, fields) for education in educations])
+    except InvalidFields as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Error fetching public educations: {str(e)}'}), 500
     
 @app.route('/api/public/education/<id>', methods=['GET'])
+@cached_response('education')
 def get_public_education(id):
     """Get public education details (no auth required)"""
     try:
@@ -1004,15 +1708,19 @@ def get_public_education(id):
             return jsonify({'message': 'Invalid education ID format'}), 400
             
         obj_id = ObjectId(id)
-        education = collections['education'].find_one({'_id': obj_id})
+        fields = parse_fields(request.args.get('fields'), 'education')
+        education = public_collection('education').find_one({'_id': obj_id}, projection_for('education', fields))
         
         if not education:
             return jsonify({'message': 'Education not found'}), 404
             
         # Convert ObjectId to string
         education['_id'] = str(education['_id'])
-        return json_util.dumps(education)
+        add_srcset(education, 'image_url')
+        return jsonify(select_fields(education, fields))
         
+    except InvalidFields as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Error fetching education: {str(e)}'}), 500
 
@@ -1022,15 +1730,7 @@ def get_public_education(id):
 def get_experiences(current_user):
     """Get paginated list of experiences (admin only)"""
     try:
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
-        skip = (page - 1) * per_page
-        
-        total = collections['experience'].count_documents({})
-        experiences = list(collections['experience'].find({})
-                          .sort('created_at', -1)
-                          .skip(skip)
-                          .limit(per_page))
+        experiences, meta = paginate(collections['experience'], {}, 'created_at')
         
         # Convert ObjectId to string for each experience
         for exp in experiences:
@@ -1040,16 +1740,16 @@ def get_experiences(current_user):
         
         return jsonify({
             'data': experiences,
-            'total': total,
-            'page': page,
-            'per_page': per_page,
-            'total_pages': (total + per_page - 1) // per_page
+            **meta
         })
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Error fetching experiences: {str(e)}'}), 500
 
 @app.route('/api/experience', methods=['POST'])
 @token_required(roles=['admin'])
+@invalidates_cache('experience')
 def create_experience(current_user):
     """Create a new experience"""
     try:
@@ -1081,9 +1781,7 @@ def create_experience(current_user):
         if 'image' in request.files:
             file = request.files['image']
             if file and allowed_file(file.filename):
-                filename = secure_filename(f"exp_{uuid.uuid4().hex}.{file.filename.rsplit('.', 1)[1].lower()}")
-                file.save(os.path.join(UPLOAD_FOLDER, filename))
-                experience_data['image_url'] = f'/uploads/{filename}'
+                experience_data['image_url'] = store_upload(file, 'experience')
         
         result = collections['experience'].insert_one(experience_data)
         
@@ -1111,13 +1809,14 @@ def get_experience(current_user, id):
         if not experience:
             return jsonify({'message': 'Experience not found'}), 404
             
-        return json_util.dumps(experience)
+        return jsonify(experience)
         
     except Exception as e:
         return jsonify({'message': f'Error fetching experience: {str(e)}'}), 500
 
 @app.route('/api/experience/<id>', methods=['PUT'])
 @token_required(roles=['admin'])
+@invalidates_cache('experience')
 def update_experience(current_user, id):
     """Update an existing experience"""
     try:
@@ -1150,17 +1849,9 @@ def update_experience(current_user, id):
         if 'image' in request.files:
             file = request.files['image']
             if file and allowed_file(file.filename):
-                # Delete old image if exists
-                if 'image_url' in existing_exp:
-                    old_filename = existing_exp['image_url'].split('/')[-1]
-                    old_path = os.path.join(UPLOAD_FOLDER, old_filename)
-                    if os.path.exists(old_path):
-                        os.remove(old_path)
-                
-                # Save new image
-                filename = secure_filename(f"exp_{uuid.uuid4().hex}.{file.filename.rsplit('.', 1)[1].lower()}")
-                file.save(os.path.join(UPLOAD_FOLDER, filename))
-                update_data['image_url'] = f'/uploads/{filename}'
+                # Store the new image, then drop this record's reference to the old one
+                update_data['image_url'] = store_upload(file, 'experience')
+                release_upload(existing_exp.get('image_url'))
 
         result = collections['experience'].update_one(
             {'_id': obj_id},
@@ -1180,6 +1871,7 @@ def update_experience(current_user, id):
 
 @app.route('/api/experience/<id>', methods=['DELETE'])
 @token_required(roles=['admin'])
+@invalidates_cache('experience')
 def delete_experience(current_user, id):
     """Delete an experience"""
     try:
@@ -1194,12 +1886,8 @@ def delete_experience(current_user, id):
         if not experience:
             return jsonify({'message': 'Experience not found'}), 404
             
-        # Delete associated image if exists
-        if 'image_url' in experience:
-            filename = experience['image_url'].split('/')[-1]
-            filepath = os.path.join(UPLOAD_FOLDER, filename)
-            if os.path.exists(filepath):
-                os.remove(filepath)
+        # Release the associated image; it is deleted once nothing else uses it
+        release_upload(experience.get('image_url'))
         
         # Delete the experience
         result = collections['experience'].delete_one({'_id': obj_id})
@@ -1214,6 +1902,7 @@ def delete_experience(current_user, id):
 
 # Public route for experiences
 @app.route('/api/public/experience', methods=['GET'])
+@cached_response('experience')
 def get_public_experiences():
     """Get public experiences (no auth required)"""
     try:
@@ -1223,9 +1912,10 @@ def get_public_experiences():
         if featured is not None:
             query['featured'] = featured.lower() == 'true'
             
-        experiences = list(collections['experience'].find(
+        fields = parse_fields(request.args.get('fields'), 'experience')
+        experiences = list(public_collection('experience').find(
             query,
-            {
+            projection_for('experience', fields, default={
                 '_id': 1,
                 'position': 1,
                 'company': 1,
@@ -1236,14 +1926,19 @@ def get_public_experiences():
                 'image_url': 1,
                 'created_at': 1,
                 'featured': 1
-            }
+            })
         ).sort('created_at', -1))
+        for experience in experiences:
+            add_srcset(experience, 'image_url')
         
-        return json_util.dumps(experiences)
+        return jsonify([select_fields(experience, fields) for experience in experiences])
+    except InvalidFields as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Error fetching public experiences: {str(e)}'}), 500
     
 @app.route('/api/public/experience/<id>', methods=['GET'])
+@cached_response('experience')
 def get_public_experience(id):
     """Get public experience details (no auth required)"""
     try:
@@ -1251,15 +1946,19 @@ def get_public_experience(id):
             return jsonify({'message': 'Invalid experience ID format'}), 400
             
         obj_id = ObjectId(id)
-        experience = collections['experience'].find_one({'_id': obj_id})
+        fields = parse_fields(request.args.get('fields'), 'experience')
+        experience = public_collection('experience').find_one({'_id': obj_id}, projection_for('experience', fields))
         
         if not experience:
             return jsonify({'message': 'Experience not found'}), 404
             
         # Convert ObjectId to string
         experience['_id'] = str(experience['_id'])
-        return json_util.dumps(experience)
+        add_srcset(experience, 'image_url')
+        return jsonify(select_fields(experience, fields))
         
+    except InvalidFields as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Error fetching experience: {str(e)}'}), 500
 
@@ -1268,14 +1967,102 @@ def get_public_experience(id):
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def upload_path(url):
+    """Disk path of a /uploads/... URL"""
+    name = url.split('/uploads/', 1)[-1]
+    if name.startswith('certificates/'):
+        name = name[len('certificates/'):]  # Served from the main upload folder
+    return os.path.join(UPLOAD_FOLDER, name)
+
+def store_upload(file, *collection_names):
+    """Store an uploaded file by content, returning its /uploads/ URL"""
+    return store_upload_path(file, file.filename, *collection_names)
+
+def store_upload_path(source, filename, *collection_names):
+    """Store a file object or path under its content hash; identical bytes are written once"""
+    started = time.perf_counter()
+    name, created = blob_store.put(source, filename.rsplit('.', 1)[1])
+    kind = next((c for c in collection_names if c), 'generic')
+    upload_duration.observe(time.perf_counter() - started, kind=kind)
+    upload_bytes.inc(os.path.getsize(blob_store.path(name)), kind=kind)
+    if created:
+        precompress(blob_store.path(name))
+        queue_image_variants(blob_store.path(name), *[c for c in collection_names if c])
+    return f'/uploads/{name}'
+
+def release_upload(url):
+    """Drop one reference to an upload; the blob is deleted when nothing points at it any more"""
+    if not url or '/uploads/' not in url:
+        return
+    name = url.split('/uploads/', 1)[1]
+    if blob_store.is_blob(name):
+        blob_store.release(name)
+        return
+    # Pre-migration flat files are owned by a single record
+    filepath = upload_path(url)
+    if os.path.exists(filepath):
+        try:
+            os.remove(filepath)
+        except OSError:
+            pass
+
+def queue_image_variants(filepath, *collection_names):
+    """Build responsive variants in the background, refreshing cached responses once they exist"""
+    def refresh(manifest):
+        if collection_names:
+            collection_versions.bump(*collection_names)
+            response_cache.invalidate(*collection_names)
+    image_variants.enqueue(filepath, refresh)
+
+def add_srcset(doc, field, base=''):
+    """Add a srcset for doc[field] when variants of that upload exist"""
+    url = doc.get(field)
+    if not url or '/uploads/' not in url:
+        return doc
+    srcset = image_variants.srcset(upload_path(url), base + url)
+    if srcset:
+        doc['imageSrcset' if field == 'imageUrl' else 'image_srcset'] = srcset
+    return doc
+
 def ensure_upload_dir():
     """Create upload directory if it doesn't exist"""
     if not os.path.exists(UPLOAD_FOLDER):
         os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 # ===== CERTIFICATES ROUTES =====
+def get_certificate_index():
+    """The certificate index, reloaded from MongoDB when any worker has written certificates since it was built"""
+    version = collection_versions.shared_version('certificates')
+    if certificate_index.is_stale(version):
+        with certificate_index_build_lock:
+            if certificate_index.is_stale(version):
+                certificate_index.rebuild(collections['certificates'].find({}), version)
+    return certificate_index
+
+
+def add_expiry_fields(certificate):
+    """Set isExpiringSoon (within 30 days) and daysUntilExpiry; expiryDate may be a datetime or an ISO string"""
+    if certificate.get('expiryDate'):
+        expiry_date = certificate['expiryDate']
+        if isinstance(expiry_date, str):
+            try:
+                expiry_date = datetime.fromisoformat(expiry_date.replace('Z', '+00:00'))
+            except:
+                expiry_date = datetime.strptime(expiry_date[:10], '%Y-%m-%d')
+            if expiry_date.tzinfo is not None:
+                # "...Z" strings parse as aware datetimes; compare in local time like datetime.now()
+                expiry_date = expiry_date.astimezone().replace(tzinfo=None)
+        days_until_expiry = (expiry_date - datetime.now()).days
+        certificate['isExpiringSoon'] = 0 < days_until_expiry <= 30
+        certificate['daysUntilExpiry'] = days_until_expiry
+    else:
+        certificate['isExpiringSoon'] = False
+        certificate['daysUntilExpiry'] = None
+    return certificate
+
 @app.route('/api/certificates', methods=['GET', 'POST'])
 @token_required(roles=['admin'])
+@invalidates_cache('certificates')
 def certificates(current_user):
     if request.method == 'GET':
         try:
@@ -1288,51 +2075,34 @@ def certificates(current_user):
             sort_by = request.args.get('sort', 'issueDate')
             sort_order = request.args.get('order', 'desc')
             
-            # Build query
-            query = {}
+            with_facets = request.args.get('facets', 'false').lower() == 'true'
+            
+            # Build facet filters
+            filters = {}
             if category and category != 'all':
-                query['category'] = category
+                filters['category'] = category
             if status and status != 'all':
-                query['status'] = status
+                filters['status'] = status
             if level and level != 'all':
-                query['level'] = level
+                filters['level'] = level
             if priority and priority != 'all':
-                query['priority'] = priority
-            if search:
-                query['$or'] = [
-                    {'name': {'$regex': search, '$options': 'i'}},
-                    {'issuer': {'$regex': search, '$options': 'i'}},
-                    {'description': {'$regex': search, '$options': 'i'}},
-                    {'skills': {'$elemMatch': {'$regex': search, '$options': 'i'}}}
-                ]
-            
-            # Set sort direction
-            sort_direction = -1 if sort_order == 'desc' else 1
+                filters['priority'] = priority
             
-            # Execute query
-            certificates = list(collections['certificates'].find(query).sort(sort_by, sort_direction))
+            # Case-insensitive substring search over name, issuer, description and skills
+            certificates, facets = get_certificate_index().query(
+                filters, search, sort_by, descending=sort_order == 'desc', with_facets=with_facets
+            )
             
             # Add computed fields
             for cert in certificates:
-                # Check if expiring soon (within 30 days)
-                if cert.get('expiryDate'):
-                    expiry_date = cert['expiryDate']
-                    if isinstance(expiry_date, str):
-                        try:
-                            expiry_date = datetime.fromisoformat(expiry_date.replace('Z', '+00:00'))
-                        except:
-                            expiry_date = datetime.strptime(expiry_date[:10], '%Y-%m-%d')
-                    days_until_expiry = (expiry_date - datetime.now()).days
-                    cert['isExpiringSoon'] = 0 < days_until_expiry <= 30
-                    cert['daysUntilExpiry'] = days_until_expiry
-                else:
-                    cert['isExpiringSoon'] = False
-                    cert['daysUntilExpiry'] = None
+                add_expiry_fields(cert)
                 
                 # Add skill count
                 cert['skillCount'] = len(cert.get('skills', []))
             
-            return json_util.dumps(certificates), 200
+            if with_facets:
+                return jsonify({'data': certificates, 'facets': facets}), 200
+            return jsonify(certificates), 200
             
         except Exception as e:
             print(f"Error fetching certificates: {str(e)}")
@@ -1387,14 +2157,7 @@ def certificates(current_user):
             if 'image' in request.files:
                 file = request.files['image']
                 if file and file.filename != '' and allowed_file(file.filename):
-                    filename = secure_filename(file.filename)
-                    # Add timestamp to avoid conflicts
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-                    filename = timestamp + filename
-                    filepath = os.path.join(UPLOAD_FOLDER, filename)
-                    file.save(filepath)
-                    # FIXED: Consistent field name and path
-                    data['imageUrl'] = f'/uploads/{filename}'
+                    data['imageUrl'] = store_upload(file, 'certificates')
             
             # Add metadata
             data['created_by'] = str(current_user['_id'])
@@ -1403,6 +2166,7 @@ def certificates(current_user):
             
             # Insert certificate
             result = collections['certificates'].insert_one(data)
+            certificate_index.add(data)
             
             return jsonify({
                 'message': 'Certificate added successfully',
@@ -1415,6 +2179,7 @@ def certificates(current_user):
 
 @app.route('/api/certificates/<id>', methods=['GET', 'PUT', 'DELETE'])
 @token_required(roles=['admin'])
+@invalidates_cache('certificates')
 def certificate(current_user, id):
     try:
         certificate_id = ObjectId(id)
@@ -1428,21 +2193,9 @@ def certificate(current_user, id):
                 return jsonify({'message': 'Certificate not found'}), 404
             
             # Add computed fields
-            if certificate.get('expiryDate'):
-                expiry_date = certificate['expiryDate']
-                if isinstance(expiry_date, str):
-                    try:
-                        expiry_date = datetime.fromisoformat(expiry_date.replace('Z', '+00:00'))
-                    except:
-                        expiry_date = datetime.strptime(expiry_date[:10], '%Y-%m-%d')
-                days_until_expiry = (expiry_date - datetime.now()).days
-                certificate['isExpiringSoon'] = 0 < days_until_expiry <= 30
-                certificate['daysUntilExpiry'] = days_until_expiry
-            else:
-                certificate['isExpiringSoon'] = False
-                certificate['daysUntilExpiry'] = None
+            add_expiry_fields(certificate)
             
-            return json_util.dumps(certificate), 200
+            return jsonify(certificate), 200
             
         except Exception as e:
             print(f"Error fetching certificate: {str(e)}")
@@ -1497,23 +2250,11 @@ def certificate(current_user, id):
             if 'image' in request.files:
                 file = request.files['image']
                 if file and file.filename != '' and allowed_file(file.filename):
-                    # Delete old image if exists
+                    # Store the new image, then drop this certificate's reference to the old one
                     old_cert = collections['certificates'].find_one({'_id': certificate_id})
-                    if old_cert and old_cert.get('imageUrl'):
-                        old_filepath = old_cert['imageUrl'].replace('/uploads/', 'uploads/')
-                        if os.path.exists(old_filepath):
-                            try:
-                                os.remove(old_filepath)
-                            except:
-                                pass  # Continue even if file deletion fails
-                    
-                    # Save new image
-                    filename = secure_filename(file.filename)
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-                    filename = timestamp + filename
-                    filepath = os.path.join(UPLOAD_FOLDER, filename)
-                    file.save(filepath)
-                    data['imageUrl'] = f'/uploads/certificates/{filename}'
+                    data['imageUrl'] = store_upload(file, 'certificates')
+                    if old_cert:
+                        release_upload(old_cert.get('imageUrl'))
             
             # Add update metadata
             data['updated_at'] = datetime.utcnow()
@@ -1528,6 +2269,7 @@ def certificate(current_user, id):
             if result.matched_count == 0:
                 return jsonify({'message': 'Certificate not found'}), 404
             
+            certificate_index.add(collections['certificates'].find_one({'_id': certificate_id}))
             return jsonify({'message': 'Certificate updated successfully'}), 200
             
         except Exception as e:
@@ -1541,14 +2283,8 @@ def certificate(current_user, id):
             if not certificate:
                 return jsonify({'message': 'Certificate not found'}), 404
             
-            # Delete associated image file
-            if certificate.get('imageUrl'):
-                filepath = certificate['imageUrl'].replace('/uploads/', 'uploads/')
-                if os.path.exists(filepath):
-                    try:
-                        os.remove(filepath)
-                    except:
-                        pass  # Continue even if file deletion fails
+            # Release the associated image; it is deleted once nothing else uses it
+            release_upload(certificate.get('imageUrl'))
             
             # Delete certificate
             result = collections['certificates'].delete_one({'_id': certificate_id})
@@ -1556,21 +2292,13 @@ def certificate(current_user, id):
             if result.deleted_count == 0:
                 return jsonify({'message': 'Certificate not found'}), 404
             
+            certificate_index.remove(certificate_id)
             return jsonify({'message': 'Certificate deleted successfully'}), 200
             
         except Exception as e:
             print(f"Error deleting certificate: {str(e)}")
             return jsonify({'message': f'Failed to delete certificate: {str(e)}'}), 500
 
-# ===== SERVE UPLOADED FILES =====
-@app.route('/uploads/certificates/<filename>')
-def uploaded_certificate(filename):
-    """Serve uploaded certificate images"""
-    try:
-        return send_from_directory(UPLOAD_FOLDER, filename)
-    except Exception as e:
-        return jsonify({'message': 'File not found'}), 404
-
 # ===== CERTIFICATE STATISTICS =====
 @app.route('/api/certificates/stats', methods=['GET'])
 @token_required(roles=['admin'])
@@ -1583,10 +2311,10 @@ def certificate_stats(current_user):
         pending = collections['certificates'].count_documents({'status': 'Pending'})
         
         # Calculate expiring soon (within 30 days)
-        thirty_days_from_now = datetime.datetime.now() + datetime.timedelta(days=30)
+        thirty_days_from_now = datetime.now() + timedelta(days=30)
         expiring_soon = collections['certificates'].count_documents({
             'expiryDate': {
-                '$gte': datetime.datetime.now(),
+                '$gte': datetime.now(),
                 '$lte': thirty_days_from_now
             },
             'status': 'Active'
@@ -1629,12 +2357,14 @@ def certificate_stats(current_user):
         return jsonify({'message': f'Failed to get statistics: {str(e)}'}), 500 
 
 @app.route('/api/public/certificates/<id>', methods=['GET'])
+@cached_response('certificates')
 def get_public_certificate(id):
     try:
         if not ObjectId.is_valid(id):
             return jsonify({'message': 'Invalid certificate ID format'}), 400
         certificate_id = ObjectId(id)
-        certificate = collections['certificates'].find_one({'_id': certificate_id})
+        fields = parse_fields(request.args.get('fields'), 'certificates')
+        certificate = public_collection('certificates').find_one({'_id': certificate_id}, projection_for('certificates', fields))
         if not certificate:
             return jsonify({'message': 'Certificate not found'}), 404
 
@@ -1642,22 +2372,13 @@ def get_public_certificate(id):
         certificate['_id'] = str(certificate['_id'])
 
         # إضافة حقول محسوبة مثل isExpiringSoon كما في الـ route الخاص بالadmin
-        if certificate.get('expiryDate'):
-            expiry_date = certificate['expiryDate']
-            if isinstance(expiry_date, str):
-                try:
-                    expiry_date = datetime.fromisoformat(expiry_date.replace('Z', '+00:00'))
-                except:
-                    expiry_date = datetime.strptime(expiry_date[:10], '%Y-%m-%d')
-            days_until_expiry = (expiry_date - datetime.now()).days
-            certificate['isExpiringSoon'] = 0 < days_until_expiry <= 30
-            certificate['daysUntilExpiry'] = days_until_expiry
-        else:
-            certificate['isExpiringSoon'] = False
-            certificate['daysUntilExpiry'] = None
+        add_expiry_fields(certificate)
 
-        return json_util.dumps(certificate), 200
+        add_srcset(certificate, 'imageUrl')
+        return jsonify(select_fields(certificate, fields)), 200
 
+    except InvalidFields as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Error fetching certificate: {str(e)}'}), 500
 
@@ -1666,9 +2387,11 @@ def get_public_certificate(id):
 
 # ===== PUBLIC SKILLS =====
 @app.route('/api/public/skills', methods=['GET'])
+@cached_response('skills')
 def get_public_skills():
     try:
-        skills = list(collections['skills'].find({}, {
+        fields = parse_fields(request.args.get('fields'), 'skills')
+        skills = list(public_collection('skills').find({}, projection_for('skills', fields, default={
             '_id': 1,
             'name': 1,
             'level': 1,
@@ -1677,17 +2400,22 @@ def get_public_skills():
             'description': 1,
             'years': 1,
             'imageUrl': 1  # Changed from image_url to imageUrl
-        }))
-        return json_util.dumps(skills)
+        })))
+        for skill in skills:
+            add_srcset(skill, 'imageUrl')
+        return jsonify([select_fields(skill, fields) for skill in skills])
+    except InvalidFields as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
 # ===== PUBLIC CERTIFICATES =====
 @app.route('/api/public/certificates', methods=['GET'])
+@cached_response('certificates')
 def get_public_certificates():
     try:
         # Get all certificates with all fields needed for display
-        certificates = list(collections['certificates'].find({}, {
+        projection = {
             '_id': 1,
             'name': 1,
             'issuer': 1,
@@ -1705,7 +2433,14 @@ def get_public_certificates():
             'imageUrl': 1,  # FIXED: Consistent field name
             'image_url': 1, # Also include alternative field name for backward compatibility
             'image': 1      # Also include for backward compatibility
-        }))
+        }
+        fields = parse_fields(request.args.get('fields'), 'certificates')
+        projection = projection_for('certificates', fields, default=projection)
+        meta = None
+        if 'cursor' in request.args or 'per_page' in request.args:
+            certificates, meta = paginate(public_collection('certificates'), {}, '_id', projection=projection)
+        else:
+            certificates = list(public_collection('certificates').find({}, projection))
         
         # Process certificates to ensure consistent field names
         for cert in certificates:
@@ -1715,8 +2450,15 @@ def get_public_certificates():
                     cert['imageUrl'] = cert['image_url']
                 elif cert.get('image'):
                     cert['imageUrl'] = cert['image']
-        
-        return json_util.dumps(certificates)
+            add_srcset(cert, 'imageUrl')
+            add_expiry_fields(cert)
+        certificates = [select_fields(cert, fields) for cert in certificates]
+        
+        if meta is not None:
+            return jsonify({'data': certificates, **meta})
+        return jsonify(certificates)
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         print(f"Error fetching public certificates: {str(e)}")
         return jsonify({'message': str(e)}), 500
@@ -1727,6 +2469,7 @@ def get_public_certificates():
 
 # Add this to your app.py in the PUBLIC section
 @app.route('/api/public/projects/<id>', methods=['GET'])
+@cached_response('projects')
 def get_public_project(id):
     """Get public project details (no auth required)"""
     try:
@@ -1734,7 +2477,8 @@ def get_public_project(id):
             return jsonify({'message': 'Invalid project ID format'}), 400
             
         obj_id = ObjectId(id)
-        project = collections['projects'].find_one({'_id': obj_id})
+        fields = parse_fields(request.args.get('fields'), 'projects')
+        project = public_collection('projects').find_one({'_id': obj_id}, projection_for('projects', fields))
         
         if not project:
             return jsonify({'message': 'Project not found'}), 404
@@ -1746,20 +2490,37 @@ def get_public_project(id):
             
         # Ensure image URL is complete if it exists
         if project.get('image_url'):
+            add_srcset(project, 'image_url', base='http://localhost:5000')
             project['image_url'] = f'http://localhost:5000{project["image_url"]}'
             
-        return json_util.dumps(project)
+        return jsonify(select_fields(project, fields))
         
+    except InvalidFields as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Error fetching project: {str(e)}'}), 500
-# ===== SERVE UPLOADED FILES - FIXED =====
-@app.route('/uploads/<filename>')
+# ===== SERVE UPLOADED FILES =====
+@app.route('/uploads/<path:filename>')
 def serve_uploaded_file(filename):
-    """Serve uploaded files"""
+    """Serve an upload, or its best variant for ?w= and the Accept header"""
+    # Old certificate URLs point at /uploads/certificates/ but the files live in the main folder
+    filepath = upload_path(f'/uploads/{filename}')
+    name = os.path.relpath(filepath, UPLOAD_FOLDER).replace(os.sep, '/')
     try:
-        return send_from_directory(UPLOAD_FOLDER, filename)
-    except Exception as e:
-        print(f"Error serving file {filename}: {str(e)}")
+        variant, _ = image_variants.pick(
+            filepath,
+            width=request.args.get('w', type=int),
+            accept=request.headers.get('Accept', '')
+        )
+        if variant is None:
+            response = asset_server.send(name)
+        else:
+            response = asset_server.send(posixpath.join(posixpath.dirname(name), variant))
+        # Once variants exist, the original is also an Accept-dependent choice
+        if image_variants.manifest(filepath):
+            response.vary.add('Accept')
+        return response
+    except NotFound:
         return jsonify({'message': 'File not found'}), 404
 
 # Make sure upload directory exists
@@ -1789,22 +2550,111 @@ def upload_file(current_user):
         return jsonify({'message': 'File type not allowed'}), 400
         
     try:
-        filename = secure_filename(f"{uuid.uuid4().hex}_{file.filename}")
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
         return jsonify({
-            'url': f'/uploads/{filename}',
+            'url': store_upload(file),
             'message': 'File uploaded successfully'
         })
     except Exception as e:
         return jsonify({'message': f'Upload failed: {str(e)}'}), 500
 
-@app.route('/uploads/<filename>')
-def serve_upload(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+# ========== CHUNKED UPLOADS ========== #
+def upload_session_or_404(upload_id, current_user):
+    session = chunked_uploads.get(upload_id)
+    if session.get('owner') != str(current_user['_id']):
+        raise UploadError('Upload not found', 404)
+    return session
+
+@app.route('/api/uploads', methods=['POST'])
+@token_required(roles=['admin'])
+def init_chunked_upload(current_user):
+    """Start a resumable upload: {filename, size, sha256?, kind?}"""
+    data = request.json or {}
+    filename = data.get('filename', '')
+    if not allowed_file(filename):
+        return jsonify({'message': 'File type not allowed'}), 400
+    try:
+        size = int(data.get('size', 0))
+        session = chunked_uploads.create(
+            filename, size, data.get('sha256'),
+            owner=str(current_user['_id']),
+            kind='blog' if data.get('kind') == 'blog' else None
+        )
+    except ValueError:
+        return jsonify({'message': 'Invalid file size'}), 400
+    except UploadError as e:
+        return jsonify({'message': str(e), **e.extra}), e.status
+    return jsonify({
+        'upload_id': session['id'],
+        'offset': 0,
+        'size': session['size'],
+        'chunk_size': chunked_uploads.max_chunk_bytes
+    }), 201
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+@token_required(roles=['admin'])
+def chunked_upload_status(current_user, upload_id):
+    """Committed offset, so an interrupted client knows where to resume"""
+    try:
+        session = upload_session_or_404(upload_id, current_user)
+    except UploadError as e:
+        return jsonify({'message': str(e), **e.extra}), e.status
+    return jsonify({'upload_id': upload_id, 'offset': session['offset'], 'size': session['size']})
+
+@app.route('/api/uploads/<upload_id>', methods=['PUT'])
+@token_required(roles=['admin'])
+def upload_chunk(current_user, upload_id):
+    """Append the raw request body at ?offset= (or the Upload-Offset header)"""
+    try:
+        upload_session_or_404(upload_id, current_user)
+        offset = int(request.args.get('offset', request.headers.get('Upload-Offset', -1)))
+        started = time.perf_counter()
+        session = chunked_uploads.write_chunk(
+            upload_id, offset, request.stream,
+            chunk_checksum=request.headers.get('X-Chunk-SHA256')
+        )
+        upload_duration.observe(time.perf_counter() - started, kind='chunk')
+        upload_bytes.inc(session['offset'] - offset, kind='chunk')
+    except ValueError:
+        return jsonify({'message': 'Invalid offset'}), 400
+    except UploadError as e:
+        return jsonify({'message': str(e), **e.extra}), e.status
+    return jsonify({'upload_id': upload_id, 'offset': session['offset'], 'size': session['size']})
+
+@app.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+@token_required(roles=['admin'])
+def finalize_chunked_upload(current_user, upload_id):
+    """Check the assembled file and move it into content-addressed storage"""
+    try:
+        upload_session_or_404(upload_id, current_user)
+        assembled = os.path.join(chunked_uploads.root, f'{upload_id}.done')
+        session = chunked_uploads.finalize(upload_id, assembled)
+    except UploadError as e:
+        return jsonify({'message': str(e), **e.extra}), e.status
+    try:
+        url = store_upload_path(assembled, session['filename'], 'blog' if session.get('kind') == 'blog' else None)
+    finally:
+        if os.path.exists(assembled):
+            os.remove(assembled)
+    return jsonify({
+        'url': url,
+        'size': session['size'],
+        'sha256': session['sha256'],
+        'message': 'File uploaded successfully'
+    })
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+@token_required(roles=['admin'])
+def abort_chunked_upload(current_user, upload_id):
+    try:
+        upload_session_or_404(upload_id, current_user)
+        chunked_uploads.abort(upload_id)
+    except UploadError as e:
+        return jsonify({'message': str(e), **e.extra}), e.status
+    return jsonify({'message': 'Upload cancelled'})
 
 # ========== MESSAGE/CONTACT ROUTES ==========
 @app.route('/api/messages', methods=['POST'])
+@invalidates_cache('messages')
 def send_message():
     data = request.get_json()
 
@@ -1832,6 +2682,7 @@ def send_message():
 
 @app.route('/api/messages/<id>/read', methods=['PUT'])
 @token_required(roles=['admin'])
+@invalidates_cache('messages')
 def mark_as_read(current_user, id):
     try:
         result = collections['messages'].update_one(
@@ -1846,6 +2697,7 @@ def mark_as_read(current_user, id):
 
 @app.route('/api/messages/<id>', methods=['DELETE'])
 @token_required(roles=['admin'])
+@invalidates_cache('messages')
 def delete_message(current_user, id):
     try:
         result = collections['messages'].delete_one({'_id': ObjectId(id)})
@@ -1859,33 +2711,25 @@ def delete_message(current_user, id):
 @token_required(roles=['admin'])
 def get_messages(current_user):
     try:
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
-        skip = (page - 1) * per_page
-
         query = {}
-        total = collections['messages'].count_documents(query)
-        messages = list(collections['messages'].find(query)
-                        .sort('created_at', -1)
-                        .skip(skip)
-                        .limit(per_page))
+        messages, meta = paginate(collections['messages'], query, 'created_at')
 
         return jsonify({
-            'data': json_util.dumps(messages),
-            'total': total,
-            'page': page,
-            'per_page': per_page,
-            'total_pages': (total + per_page - 1) // per_page
+            'data': messages,
+            **meta
         }), 200
 
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # ========== SOCIAL LINKS ==========
 @app.route('/api/public/contact-info', methods=['GET'])
+@cached_response('settings')
 def get_contact_info():
     try:
-        settings = collections['settings'].find_one()
+        settings = public_collection('settings').find_one()
         if not settings:
             return jsonify({'error': 'Settings not found'}), 404
 
@@ -1914,6 +2758,7 @@ def get_contact_info():
 
 @app.route('/api/social', methods=['PUT'])
 @token_required(roles=['admin'])
+@invalidates_cache('settings')
 def update_social_links(current_user):
     try:
         data = request.json
@@ -1927,17 +2772,51 @@ def update_social_links(current_user):
         return jsonify({'message': f'Error updating social links: {str(e)}'}), 500
 
 # ========== PUBLIC API ========== #
+@app.route('/api/public/batch', methods=['POST'])
+def public_batch():
+    """Several public GETs in one round trip: {"requests": [{"id": "skills", "path": "/api/public/skills", "etag": "..."}]}"""
+    try:
+        parts = batch_dispatcher.parse(request.get_json(silent=True), request.path)
+    except BatchError as e:
+        return jsonify({'message': str(e)}), 400
+    return jsonify({'responses': batch_dispatcher.run(parts)})
+
+# Default fields per portfolio section: what the summary cards render
+PORTFOLIO_SECTIONS = {
+    'skills': {'_id': 1, 'name': 1, 'level': 1, 'category': 1, 'icon': 1},
+    'projects': {'_id': 1, 'title': 1, 'description': 1, 'technologies': 1, 'image_url': 1},
+    'education': {'_id': 1, 'degree': 1, 'institution': 1, 'start_date': 1, 'end_date': 1},
+    'experience': {'_id': 1, 'position': 1, 'company': 1, 'duration': 1},
+    'certificates': {'_id': 1, 'name': 1, 'issuer': 1, 'issueDate': 1},
+    'blog': {'_id': 1, 'title': 1, 'excerpt': 1, 'date': 1, 'slug': 1}
+}
+
 @app.route('/api/public/portfolio', methods=['GET'])
+@cached_response('skills', 'projects', 'education', 'experience', 'certificates', 'blog')
 def public_portfolio():
-    portfolio = {
-        'skills': list(collections['skills'].find({}, {'_id': 1, 'name': 1, 'level': 1})),
-        'projects': list(collections['projects'].find({}, {'_id': 1, 'title': 1, 'description': 1, 'image_url': 1})),
-        'education': list(collections['education'].find({}, {'_id': 1, 'degree': 1, 'institution': 1, 'year': 1})),
-        'experience': list(collections['experience'].find({}, {'_id': 1, 'position': 1, 'company': 1, 'duration': 1})),
-        'certificates': list(collections['certificates'].find({}, {'_id': 1, 'name': 1, 'issuer': 1, 'date': 1})),  # Added
-        'blog': list(collections['blog'].find({}, {'_id': 1, 'title': 1, 'excerpt': 1, 'date': 1, 'slug': 1}))
-    }
-    return json_util.dumps(portfolio)
+    """Homepage summary; ?include=skills,projects picks sections and ?fields[projects]=title,... their fields"""
+    deadline = app.config['PORTFOLIO_DEADLINE']
+
+    def section_reader(name, fields):
+        projection = projection_for(name, fields, default=PORTFOLIO_SECTIONS[name])
+        # The server gives up too, so a timed-out read does not hold a worker for long
+        cursor = public_collection(name).find({}, projection).max_time_ms(int(deadline * 1000))
+        return lambda: [select_fields(doc, fields) for doc in cursor]
+
+    try:
+        tasks = {}
+        for name in parse_include(request.args.get('include'), PORTFOLIO_SECTIONS):
+            tasks[name] = section_reader(name, parse_fields(request.args.get(f'fields[{name}]'), name))
+    except InvalidFields as e:
+        return jsonify({'message': str(e)}), 400
+
+    portfolio, statuses = portfolio_fanout.run(tasks, deadline)
+    if any(status != 'ok' for status in statuses.values()):
+        g.partial_response = True
+        for name in statuses:
+            portfolio.setdefault(name, [])
+        portfolio['_meta'] = {'partial': True, 'sections': statuses}
+    return jsonify(portfolio)
 
 # ========== SETTINGS ========== #
 @app.route('/api/settings', methods=['GET'])
@@ -1947,16 +2826,165 @@ def get_settings():
 
 @app.route('/api/settings', methods=['PUT'])
 @token_required(roles=['admin'])
+@invalidates_cache('settings')
 def update_settings(current_user):
     data = request.json
     collections['settings'].update_one({}, {'$set': data})
     return jsonify({'message': 'Settings updated'})
 
+# ========== CLI ========== #
+@app.cli.command('ensure-indexes')
+def ensure_indexes_command():
+    """Create the registered indexes on every collection"""
+    created, errors = ensure_indexes(collections)
+    for name, index_names in created.items():
+        print(f"{name}: {', '.join(index_names)}")
+    for error in errors:
+        print(f"ERROR {error}")
+    if errors:
+        raise SystemExit(1)
+
+
+@app.cli.command('verify-indexes')
+def verify_indexes_command():
+    """Explain every query shape the routes issue and fail on COLLSCAN or in-memory SORT"""
+    problems = verify_query_plans(collections)
+    for problem in problems:
+        print(f"{problem['collection']} / {problem['query']}: {' -> '.join(problem['stages'])}")
+    if problems:
+        raise SystemExit(1)
+    print('All query shapes are index-backed')
+
+# Record fields that point at an upload, per collection
+UPLOAD_FIELDS = {
+    'skills': 'imageUrl',
+    'certificates': 'imageUrl',
+    'projects': 'image_url',
+    'education': 'image_url',
+    'experience': 'image_url'
+}
+
+# Older certificate documents keep their image under these names instead
+LEGACY_UPLOAD_FIELDS = {
+    'certificates': ('image_url', 'image')
+}
+
+# Every field that may mention an upload URL, including free text (e.g. images inside blog content)
+UPLOAD_REFERENCE_FIELDS = {
+    'skills': ('imageUrl', 'icon', 'description'),
+    'certificates': ('imageUrl', 'image_url', 'image', 'icon', 'description'),
+    'projects': ('image_url', 'description'),
+    'education': ('image_url', 'description'),
+    'experience': ('image_url', 'description'),
+    'blog': ('image', 'content', 'excerpt')
+}
+
+
+def upload_reference(filepath):
+    """First record still pointing at a flat upload file, as 'collection _id', or None"""
+    relative = os.path.relpath(filepath, UPLOAD_FOLDER).replace(os.sep, '/')
+    # Root-level files are also served as /uploads/certificates/<name> (see upload_path)
+    prefix = '/uploads/(certificates/)?' if '/' not in relative else '/uploads/'
+    pattern = prefix + re.escape(relative) + r'(?![\w./-])'
+    for name, fields in UPLOAD_REFERENCE_FIELDS.items():
+        doc = collections[name].find_one({'$or': [{field: {'$regex': pattern}} for field in fields]}, {'_id': 1})
+        if doc:
+            return f"{name} {doc['_id']}"
+    return None
+
+
+def legacy_files(filepath):
+    """A flat upload plus the siblings generated from it: .gz/.br copies and recorded image variants"""
+    files = [filepath] + [filepath + suffix for suffix in ('.gz', '.br')]
+    manifest = image_variants.manifest(filepath)
+    if manifest:
+        directory = os.path.dirname(filepath)
+        files.extend(os.path.join(directory, variant['file']) for variant in manifest['variants'])
+        files.append(manifest_path(filepath))
+    return [path for path in files if os.path.isfile(path)]
+
+
+@app.cli.command('migrate-uploads')
+@click.option('--dry-run', is_flag=True, help='Report what would move without changing anything')
+@click.option('--delete-legacy', is_flag=True, help='Delete migrated flat files no record references any more')
+def migrate_uploads_command(dry_run, delete_legacy):
+    """Move flat uploads into content-addressed storage and rewrite the records that use them"""
+    migrated, missing, pending, touched = 0, 0, [], set()
+    fields = [(name, field) for name, field in UPLOAD_FIELDS.items()]
+    fields += [(name, field) for name, names in LEGACY_UPLOAD_FIELDS.items() for field in names]
+    for name, field in fields:
+        for doc in collections[name].find({field: {'$regex': '/uploads/'}}, {field: 1}):
+            url = doc[field]
+            if blob_store.is_blob(url.split('/uploads/', 1)[1]):
+                continue
+            filepath = upload_path(url)
+            if not os.path.isfile(filepath):
+                print(f"MISSING {name}.{field} {doc['_id']}: {url}")
+                missing += 1
+                continue
+            if dry_run:
+                print(f"{name}.{field} {doc['_id']}: {url}")
+                migrated += 1
+                continue
+            # Each record takes its own reference, so shared files end up with the right count
+            blob, created = blob_store.put(filepath, filepath.rsplit('.', 1)[-1])
+            collections[name].update_one({'_id': doc['_id']}, {'$set': {field: f'/uploads/{blob}'}})
+            # Remembered so a later --delete-legacy run still knows which flat files were migrated
+            db.legacy_uploads.update_one({'_id': filepath}, {'$set': {'blob': blob}}, upsert=True)
+            touched.add(name)
+            if created:
+                precompress(blob_store.path(blob))
+                future = image_variants.enqueue(blob_store.path(blob))
+                if future is not None:
+                    pending.append(future)
+            migrated += 1
+    wait_futures(pending)
+    # Running servers rebuild their in-memory indexes from the rewritten records
+    collection_versions.bump(*touched)
+
+    if dry_run:
+        print(f"Would migrate {migrated} references, {missing} missing files")
+        return
+
+    deletable = []
+    for legacy in db.legacy_uploads.find({}, {'_id': 1}):
+        filepath = legacy['_id']
+        if not os.path.isfile(filepath):
+            db.legacy_uploads.delete_one({'_id': filepath})
+            continue
+        # Rewritten records no longer match; anything left (blog content, other fields) keeps the file
+        reference = upload_reference(filepath)
+        if reference:
+            print(f"KEEP {filepath}: still referenced by {reference}")
+            continue
+        deletable.extend(legacy_files(filepath))
+        if delete_legacy:
+            db.legacy_uploads.delete_one({'_id': filepath})
+
+    if delete_legacy:
+        for path in deletable:
+            os.remove(path)
+        print(f"Deleted {len(deletable)} legacy files")
+    elif deletable:
+        print(f"{len(deletable)} legacy files can be deleted (run again with --delete-legacy):")
+        for path in deletable:
+            print(f"  {path}")
+
+    print(f"Migrated {migrated} references, {missing} missing files")
+    print(f"Storage: {blob_store.stats()}")
+
 # ========== ERROR HANDLERS ========== #
 @app.errorhandler(404)
 def not_found(e):
     return jsonify({'message': 'Resource not found'}), 404
 
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({
+        'message': 'Request body too large',
+        'max_bytes': app.config['MAX_CONTENT_LENGTH']
+    }), 413
+
 @app.errorhandler(500)
 def server_error(e):
     return jsonify({'message': 'Internal server error'}), 500
@@ -0,0 +1,103 @@
+import gzip
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from flask import current_app, request, send_file
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+from http_cache import format_cache_control
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; SVGs then get a .gz sibling only
+    brotli = None
+
+
+# Text formats worth keeping .br/.gz siblings for; raster images are already compressed
+PRECOMPRESSED_EXTENSIONS = {'svg'}
+CONTENT_HASHED = re.compile(r'^[0-9a-f]{64}\.')
+OFFLOAD_MODES = {'x-accel', 'x-sendfile'}
+
+
+def precompress(path):
+    """Write .gz (and .br when available) siblings next to a text asset"""
+    if path.rsplit('.', 1)[-1].lower() not in PRECOMPRESSED_EXTENSIONS:
+        return
+    with open(path, 'rb') as f:
+        data = f.read()
+    siblings = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        siblings['.br'] = brotli.compress(data, quality=11)
+    for suffix, compressed in siblings.items():
+        # Only worth serving when it is actually smaller
+        if len(compressed) < len(data):
+            with open(path + suffix + '.tmp', 'wb') as f:
+                f.write(compressed)
+            os.replace(path + suffix + '.tmp', path + suffix)
+
+
+class AssetServer:
+    """Serves files from the upload folder with the right caching for their names.
+
+    Content-hashed names (and the variants derived from them) never change, so
+    they are marked immutable with a one-year max-age; anything else gets the
+    regular policy plus ETag/Last-Modified revalidation. Byte ranges are
+    answered by Werkzeug's conditional send_file. SVGs are sent from a
+    precompressed .br/.gz sibling when the client accepts it.
+
+    With mode='x-accel' or 'x-sendfile' the response carries only headers and
+    nginx (or Apache/lighttpd) streams the file itself, so Python never opens
+    it; precompressed siblings are then left to the server (gzip_static /
+    brotli_static). x-accel needs an `internal` location at `accel_prefix`
+    aliased to the upload folder.
+    """
+
+    def __init__(self, root, mode=None, accel_prefix='/_uploads/', policy=None, immutable_policy=None):
+        if mode and mode not in OFFLOAD_MODES:
+            raise ValueError(f'Unknown asset offload mode: {mode}')
+        self.root = root
+        self.mode = mode or None
+        self.accel_prefix = accel_prefix.rstrip('/') + '/'
+        self.policy = policy or {'public': True, 'max_age': 3600}
+        self.immutable_policy = immutable_policy or {'public': True, 'max_age': 31536000, 'immutable': True}
+
+    def is_immutable(self, name):
+        return CONTENT_HASHED.match(os.path.basename(name)) is not None
+
+    def cache_control(self, name):
+        return format_cache_control(self.immutable_policy if self.is_immutable(name) else self.policy)
+
+    def send(self, name):
+        """Response for a path relative to the root; raises NotFound for anything outside it or hidden"""
+        # Dot-prefixed names are staging areas and other internals, never published assets
+        if any(segment.startswith('.') for segment in name.split('/')):
+            raise NotFound()
+        path = safe_join(self.root, name)
+        if path is None or not os.path.isfile(path):
+            raise NotFound()
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+        if self.mode == 'x-accel':
+            response = current_app.response_class(mimetype=mimetype)
+            response.headers['X-Accel-Redirect'] = self.accel_prefix + quote(name)
+        elif self.mode == 'x-sendfile':
+            response = current_app.response_class(mimetype=mimetype)
+            response.headers['X-Sendfile'] = os.path.abspath(path)
+        else:
+            encoding = None
+            if name.rsplit('.', 1)[-1].lower() in PRECOMPRESSED_EXTENSIONS:
+                for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+                    if request.accept_encodings[candidate] and os.path.isfile(path + suffix):
+                        path, encoding = path + suffix, candidate
+                        break
+            response = send_file(path, mimetype=mimetype, conditional=True, etag=True)
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+            if name.rsplit('.', 1)[-1].lower() in PRECOMPRESSED_EXTENSIONS:
+                response.vary.add('Accept-Encoding')
+
+        response.headers['Cache-Control'] = self.cache_control(name)
+        return response
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+class BatchError(ValueError):
+    """The batch request itself is malformed"""
+
+
+class BatchDispatcher:
+    """Runs several GET sub-requests through the app's own routing, concurrently.
+
+    Each part is dispatched in a fresh request context, so it goes through the
+    same handler, response cache and ETag validation as a standalone request.
+    A part may carry the ETag the client already holds; it then comes back as
+    a bodiless 304. Only paths under `prefix` are allowed, and never the batch
+    endpoint itself.
+    """
+
+    def __init__(self, app, prefix='/api/public/', workers=4, max_requests=20):
+        self.app = app
+        self.prefix = prefix
+        self.max_requests = max_requests
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch')
+
+    def parse(self, payload, own_path):
+        parts = payload.get('requests') if isinstance(payload, dict) else None
+        if not isinstance(parts, list) or not parts:
+            raise BatchError('Expected {"requests": [{"path": ...}, ...]}')
+        if len(parts) > self.max_requests:
+            raise BatchError(f'At most {self.max_requests} requests per batch')
+
+        parsed = []
+        for position, part in enumerate(parts):
+            if isinstance(part, str):
+                part = {'path': part}
+            path = part.get('path') if isinstance(part, dict) else None
+            if not isinstance(path, str):
+                raise BatchError(f'Request {position} has no path')
+            route = urlsplit(path).path
+            if not route.startswith(self.prefix) or route.rstrip('/') == own_path.rstrip('/'):
+                raise BatchError(f'Path not allowed in a batch: {path}')
+            parsed.append({
+                'id': str(part.get('id', position)),
+                'path': path,
+                'etag': part.get('etag')
+            })
+        return parsed
+
+    def run(self, parts):
+        futures = [self._executor.submit(self._dispatch, part) for part in parts]
+        return [future.result() for future in futures]
+
+    def _dispatch(self, part):
+        headers = {'If-None-Match': part['etag']} if part.get('etag') else {}
+        try:
+            with self.app.test_request_context(part['path'], method='GET', headers=headers):
+                response = self.app.full_dispatch_request()
+        except Exception as e:
+            return {'id': part['id'], 'status': 500, 'body': {'message': str(e)}}
+
+        result = {'id': part['id'], 'status': response.status_code}
+        etag, weak = response.get_etag()
+        if etag:
+            result['etag'] = f'W/"{etag}"' if weak else f'"{etag}"'
+        if response.status_code != 304:
+            result['body'] = response.get_json(silent=True) if response.is_json else response.get_data(as_text=True)
+        if 'Cache-Control' in response.headers:
+            result['cache_control'] = response.headers['Cache-Control']
+        return result
@@ -0,0 +1,73 @@
+"""Serializer microbenchmark: json_util.dumps vs serialization.dumps on 1,000 documents.
+
+Run from App/backend:  python benchmarks/bench_serialization.py [--docs 1000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+from bson import Decimal128, ObjectId, json_util
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serialization  # noqa: E402
+
+
+def make_documents(count):
+    """Certificate-shaped documents with the BSON types the routes return"""
+    start = datetime(2020, 1, 1)
+    return [
+        {
+            '_id': ObjectId(),
+            'name': f'Certificate {i}',
+            'issuer': 'Example Academy',
+            'description': 'Covers distributed systems, caching and observability. ' * 3,
+            'category': ('Technical', 'Cloud', 'Security')[i % 3],
+            'status': 'Active',
+            'skills': ['Python', 'MongoDB', 'Flask', 'Redis'][: 1 + i % 4],
+            'issueDate': start + timedelta(days=i),
+            'expiryDate': start + timedelta(days=i + 730),
+            'score': Decimal128(f'{80 + i % 20}.5'),
+            'created_by': str(ObjectId()),
+            'created_at': start + timedelta(days=i, hours=3)
+        }
+        for i in range(count)
+    ]
+
+
+def bench(label, fn, repeat, number=5):
+    best = min(timeit.repeat(fn, repeat=repeat, number=number)) / number
+    print(f'{label:<44} {best * 1000:8.2f} ms')
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    docs = make_documents(args.docs)
+    encoder = 'orjson' if serialization.orjson is not None else 'stdlib json'
+    print(f'{args.docs} documents, best of {args.repeat}, serializer backend: {encoder}\n')
+
+    legacy = bench('json_util.dumps', lambda: json_util.dumps(docs), args.repeat)
+    envelope = bench('json_util.dumps inside jsonify (double)', lambda: json.dumps({'data': json_util.dumps(docs)}), args.repeat)
+    fast = bench('serialization.dumps', lambda: serialization.dumps(docs), args.repeat)
+
+    legacy_body = json.dumps({'data': json_util.dumps(docs)})
+    fast_body = serialization.dumps({'data': docs})
+    parse_legacy = bench('client parse, double-encoded envelope', lambda: json.loads(json.loads(legacy_body)['data']), args.repeat)
+    parse_fast = bench('client parse, nested JSON', lambda: json.loads(fast_body), args.repeat)
+
+    print(f'\nencode speedup vs json_util.dumps:      {legacy / fast:5.1f}x')
+    print(f'encode speedup vs double encoding:      {envelope / fast:5.1f}x')
+    print(f'parse speedup without the inner string: {parse_legacy / parse_fast:5.1f}x')
+    print(f'body size: {len(legacy_body)} -> {len(fast_body)} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""Benchmark suite: every GET route, plus the serialization, auth, certificate and slug hot paths.
+
+Needs a MongoDB server (MONGO_URI, default mongodb://localhost:27017/). Everything
+runs in a dedicated database, MONGO_DB=vibecanvas_bench by default, which is
+emptied and re-seeded with the deterministic data set from dataset.py each run.
+
+Run from App/backend:
+    python benchmarks/bench_suite.py --save-baseline    # record benchmarks/baselines/*.json
+    python benchmarks/bench_suite.py                    # exit 1 when a benchmark regressed or has no baseline
+    python benchmarks/bench_suite.py --only hot_paths --tolerance 0.1
+"""
+import argparse
+import json
+import os
+import sys
+
+from bson import json_util
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.dataset import DEFAULT_COUNTS, seed_collections  # noqa: E402
+from benchmarks.harness import Suite, add_arguments, report  # noqa: E402
+
+
+SUITES = ('hot_paths', 'routes')
+
+# GET routes that are not worth timing: they write snapshots or stream files
+SKIP_ENDPOINTS = {'static', 'serve_uploaded_file', 'diff_memory_snapshots'}
+
+# First collection named in a rule supplies its <id>
+ID_COLLECTIONS = ('blog', 'projects', 'education', 'experience', 'certificates', 'skills')
+
+SLUG_COLLISIONS = 10
+
+
+def import_app():
+    """Import app.py against the benchmark database"""
+    os.environ.setdefault('MONGO_DB', 'vibecanvas_bench')
+    # Neither background recorder should add work to the timed requests
+    os.environ.setdefault('SLOW_QUERY_MS', '-1')
+    os.environ.setdefault('MEMORY_TRACKING', 'false')
+    os.chdir(BACKEND_DIR)
+    import app as appmod
+    return appmod
+
+
+def seed(appmod, scale, seed_value):
+    counts = {name: max(1, int(count * scale)) for name, count in DEFAULT_COUNTS.items()}
+    admin = appmod.collections['users'].find_one({'role': 'admin'})
+    inserted = seed_collections(appmod.collections, counts, seed=seed_value, admin=admin)
+    # Seeding dropped the collections, and their indexes with them
+    _, errors = appmod.ensure_indexes(appmod.collections)
+    for error in errors:
+        print(f'Index creation failed: {error}')
+    # Nothing cached from a previous data set may answer a timed request
+    appmod.collection_versions.bump(*inserted)
+    appmod.response_cache.clear()
+    appmod.principal_cache.clear()
+    print('Seeded ' + ', '.join(f'{name}={count}' for name, count in inserted.items()))
+    return admin
+
+
+def login(client):
+    response = client.post('/api/login', json={'email': 'admin@vibecanvas.com', 'password': 'Admin@1234'})
+    if response.status_code != 200:
+        raise SystemExit(f'Admin login failed ({response.status_code}): {response.get_data(as_text=True)}')
+    return response.get_json()['token']
+
+
+def hot_path_benchmarks(appmod, token, args):
+    suite = Suite('hot_paths', args.repeat)
+    collections = appmod.collections
+    certificates = list(collections['certificates'].find({}))
+    print(f'\nhot_paths ({len(certificates)} certificates)')
+
+    import serialization
+    backend = 'orjson' if serialization.orjson is not None else 'stdlib'
+    suite.bench('serialize certificates: json_util.dumps', lambda: json_util.dumps(certificates))
+    suite.bench('serialize certificates: json.dumps(default=str)', lambda: json.dumps(certificates, default=str))
+    suite.bench(f'serialize certificates: serialization.dumps ({backend})', lambda: serialization.dumps(certificates))
+
+    copies = [dict(certificate) for certificate in certificates]
+    suite.bench('add_expiry_fields over all certificates',
+                lambda: [appmod.add_expiry_fields(certificate) for certificate in copies])
+
+    view = appmod.token_required(roles=['admin'])(lambda current_user: current_user)
+    with appmod.app.test_request_context('/', headers={'Authorization': f'Bearer {token}'}):
+        suite.bench('token_required, cached principal', view, number=100)
+
+        def uncached():
+            appmod.principal_cache.clear()
+            return view()
+        suite.bench('token_required, principal loaded from MongoDB', uncached, number=20)
+
+    # unique_slug probes once per taken candidate: title, title-1, title-1-2, ...
+    title = 'Benchmark Slug Collision'
+    slug = title.lower().replace(' ', '-')
+    taken = []
+    for counter in range(SLUG_COLLISIONS):
+        taken.append({'slug': slug, 'title': title, 'status': 'draft'})
+        slug = f'{slug}-{counter + 1}'
+    inserted = collections['blog'].insert_many(taken).inserted_ids
+    try:
+        suite.bench('unique_slug, free slug', lambda: appmod.unique_slug('Benchmark Fresh Title'))
+        suite.bench(f'unique_slug, {SLUG_COLLISIONS} collisions', lambda: appmod.unique_slug(title))
+    finally:
+        collections['blog'].delete_many({'_id': {'$in': inserted}})
+    return suite
+
+
+def route_path(appmod, rule, samples):
+    """Concrete URL for a rule, or None when one of its arguments has no sample value"""
+    values = {}
+    for argument in rule.arguments:
+        if argument == 'slug':
+            values[argument] = samples['slug']
+        elif argument == 'id':
+            collection = next((name for name in ID_COLLECTIONS if name in rule.rule), None)
+            if collection is None:
+                return None
+            values[argument] = samples[collection]
+        else:
+            return None
+    return appmod.app.url_map.bind('localhost').build(rule.endpoint, values, method='GET')
+
+
+def route_benchmarks(appmod, client, token, args):
+    suite = Suite('routes', args.repeat)
+    collections = appmod.collections
+    samples = {name: str(collections[name].find_one({}, sort=[('_id', 1)])['_id']) for name in ID_COLLECTIONS}
+    samples['slug'] = collections['blog'].find_one({'status': 'published'}, sort=[('_id', 1)])['slug']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    # Time the handlers themselves, not response cache hits
+    cache_enabled = appmod.app.config['RESPONSE_CACHE_ENABLED']
+    appmod.app.config['RESPONSE_CACHE_ENABLED'] = args.with_cache
+    print(f"\nroutes (response cache {'on' if args.with_cache else 'off'})")
+    skipped = []
+    try:
+        for rule in sorted(appmod.app.url_map.iter_rules(), key=lambda rule: rule.rule):
+            if 'GET' not in rule.methods or rule.endpoint in SKIP_ENDPOINTS:
+                continue
+            path = route_path(appmod, rule, samples)
+            if path is None:
+                skipped.append(rule.rule)
+                continue
+            status = client.get(path, headers=headers).status_code
+            if status >= 400:
+                print(f'  warning: GET {path} answered {status}')
+            suite.bench(f'GET {rule.rule}', lambda path=path: client.get(path, headers=headers), number=args.number)
+
+        parts = [{'path': path} for path in ('/api/public/skills', '/api/public/projects',
+                                             '/api/public/certificates', '/api/public/experience')]
+        suite.bench('POST /api/public/batch (4 parts)',
+                    lambda: client.post('/api/public/batch', json={'requests': parts}), number=args.number)
+    finally:
+        appmod.app.config['RESPONSE_CACHE_ENABLED'] = cache_enabled
+    if skipped:
+        print('  skipped (no sample value): ' + ', '.join(skipped))
+    return suite
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument('--only', choices=SUITES, action='append', help='run only this suite (repeatable)')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier on the default document counts')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--number', type=int, default=10, help='requests per timed round in the routes suite')
+    parser.add_argument('--with-cache', action='store_true', help='leave the response cache on for routes')
+    args = parser.parse_args()
+
+    database = os.environ.get('MONGO_DB', 'vibecanvas_bench')
+    if not database.endswith('_bench'):
+        # The suite empties collections; never point it at real data by accident
+        raise SystemExit(f'Refusing to seed MONGO_DB={database}: use a database name ending in _bench')
+
+    appmod = import_app()
+    seed(appmod, args.scale, args.seed)
+    client = appmod.app.test_client()
+    token = login(client)
+
+    suites = []
+    selected = args.only or SUITES
+    if 'hot_paths' in selected:
+        suites.append(hot_path_benchmarks(appmod, token, args))
+    if 'routes' in selected:
+        suites.append(route_benchmarks(appmod, client, token, args))
+    print()
+    sys.exit(report(suites, args))
+
+
+if __name__ == '__main__':
+    main()
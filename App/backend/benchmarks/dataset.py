@@ -0,0 +1,273 @@
+"""Deterministic documents shaped like the ones the routes write.
+
+The same seed always yields the same documents (ObjectIds included), so
+benchmark runs and load tests on different machines read the same data.
+"""
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+
+BASE_DATE = datetime(2024, 1, 1)
+
+WORDS = (
+    'cache', 'cloud', 'data', 'design', 'python', 'flask', 'mongo', 'react', 'index', 'latency',
+    'deploy', 'stream', 'query', 'vector', 'docker', 'kernel', 'render', 'pixel', 'async', 'graph',
+    'secure', 'token', 'model', 'scale', 'budget', 'portfolio', 'canvas', 'vibe', 'shard', 'replica'
+)
+BLOG_CATEGORIES = ('technology', 'design', 'career', 'tutorials', 'devops', 'personal')
+TAGS = ('python', 'javascript', 'mongodb', 'performance', 'css', 'testing', 'security', 'ai', 'linux', 'react')
+SKILL_CATEGORIES = ('Technical', 'Frontend', 'Backend', 'DevOps', 'Soft Skills')
+SKILL_LEVELS = ('Beginner', 'Intermediate', 'Advanced', 'Expert')
+TECHNOLOGIES = ('React', 'Flask', 'MongoDB', 'Docker', 'Tailwind', 'Node.js', 'Redis', 'PostgreSQL', 'AWS', 'Vite')
+CERTIFICATE_CATEGORIES = ('Cloud Computing', 'Security', 'Data Science', 'Web Development', 'DevOps', 'Networking')
+CERTIFICATE_LEVELS = ('Foundational', 'Associate', 'Professional', 'Expert')
+ISSUERS = ('Amazon Web Services', 'Google Cloud', 'Microsoft', 'Coursera', 'Udemy', 'Cisco', 'MongoDB University')
+PLATFORMS = ('website', 'website', 'website', 'linkedin', 'email')
+
+
+def object_id(rng, when):
+    """ObjectId with `when` as its timestamp and seeded random bytes for the rest"""
+    return ObjectId(int(when.timestamp()).to_bytes(4, 'big') + rng.getrandbits(64).to_bytes(8, 'big'))
+
+
+def words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def paragraphs(rng, count, sentences=5):
+    return '\n\n'.join(
+        ' '.join(words(rng, rng.randint(6, 16)).capitalize() + '.' for _ in range(sentences))
+        for _ in range(count)
+    )
+
+
+def blog_posts(rng, count, author):
+    seen = set()
+    for i in range(count):
+        created = BASE_DATE + timedelta(minutes=37 * i)
+        title = words(rng, rng.randint(3, 7)).title()
+        # Same scheme as unique_slug in app.py
+        slug = title.lower().replace(' ', '-')
+        counter = 1
+        while slug in seen:
+            slug = f'{slug}-{counter}'
+            counter += 1
+        seen.add(slug)
+        content = paragraphs(rng, rng.randint(3, 12))
+        excerpt = content[:150] + '...' if len(content) > 150 else content
+        yield {
+            '_id': object_id(rng, created),
+            'title': title,
+            'slug': slug,
+            'content': content,
+            'excerpt': excerpt.replace('\n', ' ').strip(),
+            'categories': rng.sample(BLOG_CATEGORIES, rng.randint(1, 2)),
+            'tags': rng.sample(TAGS, rng.randint(0, 4)),
+            'featured': rng.random() < 0.05,
+            'image': f'/uploads/blog/{slug}.jpg' if rng.random() < 0.6 else '',
+            'status': 'published' if rng.random() < 0.9 else 'draft',
+            'readTime': f'{max(1, round(len(content.split()) / 200))} min read',
+            'date': created,
+            'author': author,
+            'createdAt': created,
+            'updatedAt': created + timedelta(hours=rng.randint(0, 48)),
+            'views': rng.randint(0, 5000),
+            'likes': rng.randint(0, 300)
+        }
+
+
+def certificates(rng, count, created_by):
+    for i in range(count):
+        issued = BASE_DATE - timedelta(days=rng.randint(0, 1500))
+        expiry = issued + timedelta(days=rng.choice((365, 730, 1095)))
+        shape = rng.random()
+        if shape < 0.2:
+            expiry_date = None
+        elif shape < 0.5:
+            # Older documents were written with the date as an ISO string
+            expiry_date = expiry.strftime('%Y-%m-%d') if rng.random() < 0.5 else expiry.isoformat() + 'Z'
+        else:
+            expiry_date = expiry
+        doc = {
+            '_id': object_id(rng, issued),
+            'name': f'{rng.choice(ISSUERS)} {words(rng, 2).title()} Certificate',
+            'issuer': rng.choice(ISSUERS),
+            'issueDate': issued,
+            'expiryDate': expiry_date,
+            'credentialId': f'CRED-{rng.getrandbits(40):010X}',
+            'credentialUrl': f'https://credentials.example.com/{i}',
+            'category': rng.choice(CERTIFICATE_CATEGORIES),
+            'status': 'Active' if rng.random() < 0.8 else 'Expired',
+            'description': paragraphs(rng, 1, sentences=2),
+            'level': rng.choice(CERTIFICATE_LEVELS),
+            'icon': '',
+            'priority': rng.choice(('High', 'Medium', 'Low')),
+            'skills': rng.sample(TECHNOLOGIES, rng.randint(0, 5)),
+            'created_by': created_by,
+            'created_at': issued,
+            'updated_at': issued
+        }
+        if rng.random() < 0.5:
+            doc['imageUrl'] = f'/uploads/certificates/cert-{i}.png'
+        yield doc
+
+
+def messages(rng, count):
+    for i in range(count):
+        created = BASE_DATE + timedelta(minutes=11 * i)
+        name = words(rng, 2).title()
+        yield {
+            '_id': object_id(rng, created),
+            'name': name,
+            'email': f"{name.lower().replace(' ', '.')}{i}@example.com",
+            'subject': words(rng, rng.randint(2, 6)).capitalize() if rng.random() < 0.8 else 'No Subject',
+            'message': paragraphs(rng, rng.randint(1, 3), sentences=3),
+            'platform': rng.choice(PLATFORMS),
+            'read': rng.random() < 0.7,
+            'created_at': created
+        }
+
+
+def skills(rng, count, created_by):
+    for i in range(count):
+        created = BASE_DATE + timedelta(days=i)
+        yield {
+            '_id': object_id(rng, created),
+            'name': f'{rng.choice(TECHNOLOGIES)} {i}',
+            'level': rng.choice(SKILL_LEVELS),
+            'category': rng.choice(SKILL_CATEGORIES),
+            'years': float(rng.randint(0, 10)),
+            'description': words(rng, 8).capitalize(),
+            'icon': '',
+            'created_at': created,
+            'updated_at': created,
+            'created_by': created_by
+        }
+
+
+def projects(rng, count, created_by):
+    for i in range(count):
+        created = BASE_DATE + timedelta(days=3 * i)
+        yield {
+            '_id': object_id(rng, created),
+            'title': words(rng, 3).title(),
+            'description': paragraphs(rng, 1, sentences=3),
+            'link': f'https://github.com/example/project-{i}',
+            'technologies': rng.sample(TECHNOLOGIES, rng.randint(1, 5)),
+            'status': 'active' if rng.random() < 0.85 else 'archived',
+            'featured': rng.random() < 0.2,
+            'image_url': f'/uploads/projects/project-{i}.png',
+            'created_by': created_by,
+            'created_at': created,
+            'updated_at': created
+        }
+
+
+def education(rng, count, created_by):
+    for i in range(count):
+        created = BASE_DATE + timedelta(days=5 * i)
+        start_year = 2010 + i % 12
+        yield {
+            '_id': object_id(rng, created),
+            'degree': rng.choice(('BSc', 'MSc', 'Diploma', 'Certificate')) + ' ' + words(rng, 2).title(),
+            'institution': f'{words(rng, 1).title()} University',
+            'field_of_study': words(rng, 2).title(),
+            'start_date': f'{start_year}-09-01',
+            'end_date': f'{start_year + 2}-06-30',
+            'description': paragraphs(rng, 1, sentences=2),
+            'courses': [words(rng, 2).title() for _ in range(rng.randint(0, 6))],
+            'gpa': round(rng.uniform(2.5, 4.0), 2) if rng.random() < 0.7 else None,
+            'website': '',
+            'featured': rng.random() < 0.3,
+            'created_by': created_by,
+            'created_at': created,
+            'updated_at': created
+        }
+
+
+def experience(rng, count, created_by):
+    for i in range(count):
+        created = BASE_DATE + timedelta(days=7 * i)
+        yield {
+            '_id': object_id(rng, created),
+            'position': words(rng, 2).title() + ' Engineer',
+            'company': words(rng, 1).title() + ' Labs',
+            'duration': f'{2015 + i % 9} - {2016 + i % 9}',
+            'location': rng.choice(('Rabat, Morocco', 'Remote', 'Paris, France', 'Casablanca, Morocco')),
+            'description': paragraphs(rng, 1, sentences=3),
+            'technologies': rng.sample(TECHNOLOGIES, rng.randint(1, 5)),
+            'responsibilities': [words(rng, 6).capitalize() for _ in range(rng.randint(1, 5))],
+            'website': '',
+            'featured': rng.random() < 0.3,
+            'created_by': created_by,
+            'created_at': created,
+            'updated_at': created
+        }
+
+
+# Collection -> (generator, whether it takes the author/creator)
+GENERATORS = {
+    'skills': (skills, True),
+    'projects': (projects, True),
+    'education': (education, True),
+    'experience': (experience, True),
+    'certificates': (certificates, True),
+    'blog': (blog_posts, True),
+    'messages': (messages, False)
+}
+
+DEFAULT_COUNTS = {
+    'skills': 40,
+    'projects': 30,
+    'education': 8,
+    'experience': 12,
+    'certificates': 300,
+    'blog': 1000,
+    'messages': 2000
+}
+
+
+def documents(name, count, seed=1234, admin=None):
+    """Generator of `count` documents for one collection; `admin` is the author/creator user document"""
+    generator, takes_creator = GENERATORS[name]
+    # One stream per collection, so changing one count leaves the others' documents unchanged
+    rng = random.Random(f'{seed}:{name}')
+    if not takes_creator:
+        return generator(rng, count)
+    admin_id = str(admin['_id']) if admin else '000000000000000000000000'
+    if name == 'blog':
+        return generator(rng, count, {'id': admin_id, 'name': admin['username'] if admin else 'admin'})
+    return generator(rng, count, admin_id)
+
+
+def seed_collections(collections, counts, seed=1234, admin=None, batch_size=1000, progress=None):
+    """Drop each collection in `counts` and fill it with its generated documents.
+
+    Dropping is much faster than deleting every document, and it takes the
+    indexes with it so the bulk insert does not maintain them: rebuild them
+    afterwards with indexes.ensure_indexes. `progress(name, done, count)` is
+    called after each inserted batch, so its last call for a collection
+    always has done == count.
+    """
+    inserted = {}
+    for name, count in counts.items():
+        collection = collections[name]
+        collection.drop()
+        batch = []
+        inserted[name] = 0
+        for doc in documents(name, count, seed, admin):
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                collection.insert_many(batch, ordered=False)
+                inserted[name] += len(batch)
+                batch = []
+                if progress:
+                    progress(name, inserted[name], count)
+        if batch:
+            collection.insert_many(batch, ordered=False)
+            inserted[name] += len(batch)
+            if progress:
+                progress(name, inserted[name], count)
+    return inserted
@@ -0,0 +1,121 @@
+"""Timing, JSON baselines and regression checks shared by the benchmark suites."""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+
+def measure(fn, repeat=7, number=10):
+    """Per-call timings in ms: best and median of `repeat` rounds of `number` calls"""
+    fn()  # Warm caches and lazy imports outside the timed rounds
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - started) * 1000 / number)
+    return {'best_ms': round(min(rounds), 4), 'median_ms': round(statistics.median(rounds), 4)}
+
+
+class Suite:
+    """Named set of timings, printed as they are taken"""
+
+    def __init__(self, name, repeat=7):
+        self.name = name
+        self.repeat = repeat
+        self.results = {}
+
+    def bench(self, label, fn, number=10):
+        result = measure(fn, repeat=self.repeat, number=number)
+        self.results[label] = result
+        print(f"  {label:<60} {result['best_ms']:9.3f} ms  (median {result['median_ms']:.3f})")
+        return result
+
+    def document(self):
+        return {
+            'suite': self.name,
+            'recorded_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'machine': f'{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)',
+            'results': self.results
+        }
+
+
+def baseline_path(name, directory=BASELINE_DIR):
+    return os.path.join(directory, f'{name}.json')
+
+
+def save_baseline(suite, directory=BASELINE_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = baseline_path(suite.name, directory)
+    with open(path, 'w') as f:
+        json.dump(suite.document(), f, indent=2, sort_keys=True)
+        f.write('\n')
+    return path
+
+
+def load_baseline(name, directory=BASELINE_DIR):
+    path = baseline_path(name, directory)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(suite, baseline, tolerance=0.25, min_delta_ms=0.05):
+    """Benchmarks whose best time grew by more than `tolerance` (and `min_delta_ms`) over the baseline"""
+    regressions = []
+    for label, result in suite.results.items():
+        before = baseline['results'].get(label)
+        if before is None:
+            continue
+        delta = result['best_ms'] - before['best_ms']
+        if delta > before['best_ms'] * tolerance and delta > min_delta_ms:
+            regressions.append({
+                'benchmark': label,
+                'baseline_ms': before['best_ms'],
+                'current_ms': result['best_ms'],
+                'change': f"{delta / before['best_ms']:+.0%}" if before['best_ms'] else 'new cost'
+            })
+    return regressions
+
+
+def report(suites, args):
+    """Save or check baselines for every suite; returns the process exit code"""
+    failed = False
+    for suite in suites:
+        if args.save_baseline:
+            print(f'Baseline written: {save_baseline(suite, args.baseline_dir)}')
+            continue
+        baseline = load_baseline(suite.name, args.baseline_dir)
+        if baseline is None:
+            # Nothing to compare against is a failed check, not a pass
+            print(f'No baseline for {suite.name}; run with --save-baseline to record one', file=sys.stderr)
+            failed = True
+            continue
+        if baseline.get('machine') != suite.document()['machine']:
+            print(f"Warning: {suite.name} baseline was recorded on {baseline.get('machine')}")
+        regressions = compare(suite, baseline, args.tolerance, args.min_delta_ms)
+        for regression in regressions:
+            print(f"REGRESSION {suite.name}: {regression['benchmark']} "
+                  f"{regression['baseline_ms']:.3f} -> {regression['current_ms']:.3f} ms ({regression['change']})",
+                  file=sys.stderr)
+        if not regressions:
+            print(f'{suite.name}: no regressions beyond {args.tolerance:.0%}')
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+def add_arguments(parser):
+    parser.add_argument('--repeat', type=int, default=7, help='timed rounds per benchmark (best is compared)')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown vs baseline, 0.25 = 25%%')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05,
+                        help='ignore slowdowns smaller than this, whatever the ratio')
+    parser.add_argument('--baseline-dir', default=BASELINE_DIR)
+    parser.add_argument('--save-baseline', action='store_true', help='record this run as the new baseline')
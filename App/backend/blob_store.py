@@ -0,0 +1,132 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+from pymongo import ReturnDocument
+
+
+BLOB_NAME = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.[a-z0-9]+$')
+
+
+class BlobStore:
+    """Content-addressed upload storage with reference counts kept in MongoDB.
+
+    Files are named by the SHA-256 of their bytes and sharded two levels deep
+    (ab/cd/abcd....jpg), so identical uploads are written once and no single
+    directory grows with the asset count. The refs collection holds one
+    document per blob counting the records that point at it; the file and its
+    image variants are removed when the last reference is released.
+    """
+
+    READ_BLOCK = 64 * 1024
+
+    def __init__(self, root, refs, tmp_dir=None):
+        self.root = root
+        self.refs = refs
+        # Partial writes are renamed into place, so keep them on the same filesystem as root
+        self._tmp = tmp_dir or os.path.join(root, '.tmp')
+        self._lock = threading.Lock()
+        os.makedirs(self._tmp, exist_ok=True)
+
+    @staticmethod
+    def is_blob(name):
+        return bool(name) and BLOB_NAME.match(name) is not None
+
+    def path(self, name):
+        return os.path.join(self.root, *name.split('/'))
+
+    def put(self, source, ext):
+        """Store a file-like object or a path and take one reference. Returns (name, created)"""
+        ext = ext.lower().lstrip('.')
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp)
+        try:
+            reader = open(source, 'rb') if isinstance(source, str) else None
+            stream = reader or source
+            try:
+                with os.fdopen(fd, 'wb') as out:
+                    while True:
+                        block = stream.read(self.READ_BLOCK)
+                        if not block:
+                            break
+                        hasher.update(block)
+                        size += len(block)
+                        out.write(block)
+            finally:
+                if reader:
+                    reader.close()
+
+            digest = hasher.hexdigest()
+            name = f'{digest[:2]}/{digest[2:4]}/{digest}.{ext}'
+            destination = self.path(name)
+            with self._lock:
+                # The lock only orders threads of this process; other workers
+                # are ordered by the refs document alone. Count the reference
+                # first, then (re)write the file whenever this put created the
+                # document: a worker whose release just deleted it may not
+                # have removed the old file yet, and is about to.
+                result = self.refs.update_one(
+                    {'_id': name},
+                    {
+                        '$inc': {'refs': 1},
+                        '$setOnInsert': {'size': size, 'created_at': datetime.now(timezone.utc)}
+                    },
+                    upsert=True
+                )
+                created = result.upserted_id is not None or not os.path.exists(destination)
+                if created:
+                    os.makedirs(os.path.dirname(destination), exist_ok=True)
+                    os.replace(tmp_path, destination)
+            return name, created
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def release(self, name):
+        """Drop one reference; returns True when that was the last one and the blob was deleted"""
+        if not self.is_blob(name):
+            return False
+        with self._lock:
+            doc = self.refs.find_one_and_update(
+                {'_id': name, 'refs': {'$gt': 0}},
+                {'$inc': {'refs': -1}},
+                return_document=ReturnDocument.AFTER
+            )
+            if doc is None or doc['refs'] > 0:
+                return False
+            if self.refs.delete_one({'_id': name, 'refs': {'$lte': 0}}).deleted_count == 0:
+                return False
+            # A put in another worker may have re-created the document since;
+            # its file is then the one on disk (or about to be), so leave it
+            if self.refs.find_one({'_id': name}, {'_id': 1}) is not None:
+                return False
+            self._remove_files(name)
+        return True
+
+    def _remove_files(self, name):
+        """Delete a blob together with its <digest>.* image variants and manifest"""
+        directory = os.path.dirname(self.path(name))
+        prefix = name.rsplit('/', 1)[-1].split('.', 1)[0] + '.'
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            return
+        for entry in entries:
+            if entry.startswith(prefix):
+                try:
+                    os.remove(os.path.join(directory, entry))
+                except OSError:
+                    pass
+
+    def stats(self):
+        totals = list(self.refs.aggregate([
+            {'$group': {'_id': None, 'blobs': {'$sum': 1}, 'references': {'$sum': '$refs'}, 'bytes': {'$sum': '$size'}}}
+        ]))
+        if not totals:
+            return {'blobs': 0, 'references': 0, 'bytes': 0}
+        totals[0].pop('_id')
+        return totals[0]
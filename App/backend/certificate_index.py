@@ -0,0 +1,230 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+
+def popcount(bits):
+    return bin(bits).count('1')
+
+
+def iter_bits(bits):
+    """Row numbers of the set bits, lowest first"""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+def bson_sort_key(value):
+    """Order values the way MongoDB sorts mixed BSON types (null < numbers < strings < ... < dates)"""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (8, value)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    if isinstance(value, dict):
+        return (3, str(value))
+    if isinstance(value, list):
+        return (4, str(value))
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return (9, value)
+    return (7, str(value))
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def lookup(doc, field):
+    for part in field.split('.'):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+class CertificateIndex:
+    """Columnar in-memory copy of the certificates collection.
+
+    Each certificate occupies a row number. Facet fields keep one bitmap (a
+    Python int) per distinct value, and a trigram index maps every 3-character
+    substring of the searchable text to a bitmap, so filters become bitwise
+    ANDs and substring search only verifies the few rows whose trigrams all
+    match. Deleted rows are tombstoned and reclaimed on the next rebuild.
+    """
+
+    FACETS = ('category', 'status', 'level', 'priority')
+    SEARCH_FIELDS = ('name', 'issuer', 'description')
+
+    def __init__(self, max_age=None):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._rows = []
+        self._texts = []
+        self._row_of = {}
+        self._alive = 0
+        self._facets = {field: {} for field in self.FACETS}
+        self._trigrams = {}
+        self._sorted = {}
+        self.built_at = None
+        self.version = None
+
+    # ----- maintenance -----
+    def is_stale(self, version=None):
+        """True before the first build, once older than max_age, or when built from another data version"""
+        if self.built_at is None:
+            return True
+        if version is not None and version != self.version:
+            return True
+        return bool(self.max_age) and time.time() - self.built_at > self.max_age
+
+    def rebuild(self, certificates, version=None):
+        """Index `certificates` from scratch; `version` is the data version they were read at"""
+        with self._lock:
+            self._reset()
+            for cert in certificates:
+                self._add(cert)
+            self.built_at = time.time()
+            self.version = version
+            return len(self._row_of)
+
+    def add(self, cert):
+        """Index a certificate, replacing any previous version of it"""
+        with self._lock:
+            self._remove(str(cert['_id']))
+            self._add(cert)
+
+    def remove(self, cert_id):
+        with self._lock:
+            self._remove(str(cert_id))
+
+    def _search_text(self, cert):
+        parts = [str(cert.get(field) or '') for field in self.SEARCH_FIELDS]
+        parts.extend(skill for skill in cert.get('skills') or [] if isinstance(skill, str))
+        # Newlines keep a search term from matching across two fields
+        return '\n'.join(parts).lower()
+
+    def _add(self, cert):
+        row = len(self._rows)
+        bit = 1 << row
+        text = self._search_text(cert)
+        self._rows.append(cert)
+        self._texts.append(text)
+        self._row_of[str(cert['_id'])] = row
+        self._alive |= bit
+        for field in self.FACETS:
+            value = cert.get(field)
+            if isinstance(value, str):
+                values = self._facets[field]
+                values[value] = values.get(value, 0) | bit
+        for gram in trigrams(text):
+            self._trigrams[gram] = self._trigrams.get(gram, 0) | bit
+        self._sorted.clear()
+
+    def _remove(self, cert_id):
+        row = self._row_of.pop(cert_id, None)
+        if row is None:
+            return
+        mask = ~(1 << row)
+        cert = self._rows[row]
+        self._alive &= mask
+        for field in self.FACETS:
+            value = cert.get(field)
+            if isinstance(value, str) and value in self._facets[field]:
+                remaining = self._facets[field][value] & mask
+                if remaining:
+                    self._facets[field][value] = remaining
+                else:
+                    del self._facets[field][value]
+        for gram in trigrams(self._texts[row]):
+            remaining = self._trigrams.get(gram, 0) & mask
+            if remaining:
+                self._trigrams[gram] = remaining
+            else:
+                self._trigrams.pop(gram, None)
+        self._rows[row] = None
+        self._texts[row] = ''
+        self._sorted.clear()
+
+    # ----- querying -----
+    def _search_bits(self, search):
+        needle = search.lower()
+        candidates = self._alive
+        if len(needle) >= 3:
+            for gram in trigrams(needle):
+                candidates &= self._trigrams.get(gram, 0)
+                if not candidates:
+                    return 0
+        matched = 0
+        for row in iter_bits(candidates):
+            if needle in self._texts[row]:
+                matched |= 1 << row
+        return matched
+
+    def _sorted_rows(self, field, descending, bits):
+        count = popcount(bits)
+        if count * 8 < len(self._row_of):
+            rows = sorted(iter_bits(bits), key=lambda row: bson_sort_key(lookup(self._rows[row], field)))
+        else:
+            order = self._sorted.get(field)
+            if order is None:
+                order = sorted(self._row_of.values(),
+                               key=lambda row: bson_sort_key(lookup(self._rows[row], field)))
+                self._sorted[field] = order
+            rows = [row for row in order if bits >> row & 1]
+        if descending:
+            rows.reverse()
+        return rows
+
+    def query(self, filters=None, search=None, sort_by='issueDate', descending=True, with_facets=False):
+        """Certificates matching every facet filter and the substring search, sorted.
+
+        Returns (certificates, facets). Facet counts for a field are computed
+        with every filter except that field's own, so the UI can show how many
+        results each alternative value would give.
+        """
+        filters = filters or {}
+        with self._lock:
+            facet_bits = {}
+            for field, value in filters.items():
+                facet_bits[field] = self._facets.get(field, {}).get(value, 0)
+
+            base = self._search_bits(search) if search else self._alive
+            result = base
+            for bits in facet_bits.values():
+                result &= bits
+
+            certificates = [dict(self._rows[row]) for row in self._sorted_rows(sort_by, descending, result)]
+
+            facets = None
+            if with_facets:
+                facets = {}
+                for field in self.FACETS:
+                    others = base
+                    for other, bits in facet_bits.items():
+                        if other != field:
+                            others &= bits
+                    counts = {}
+                    for value, bits in self._facets[field].items():
+                        count = popcount(bits & others)
+                        if count:
+                            counts[value] = count
+                    facets[field] = counts
+            return certificates, facets
+
+    def stats(self):
+        with self._lock:
+            return {
+                'certificates': len(self._row_of),
+                'rows': len(self._rows),
+                'trigrams': len(self._trigrams),
+                'built_at': self.built_at
+            }
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; sessions are then only locked within one process
+    fcntl = None
+
+
+class UploadError(Exception):
+    """Raised for any rejected upload operation; `status` is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+
+class ChunkedUploadStore:
+    """Resumable uploads written chunk by chunk straight to disk.
+
+    Each session is a <id>.part file plus a <id>.json sidecar holding the
+    committed offset, so any worker process on the same host can resume it;
+    each operation holds an flock on the part file, so two workers never
+    write the same session at once. Chunks must arrive at the committed
+    offset; a chunk that fails half way is truncated away on the next attempt. A SHA-256 of the file is maintained as chunks arrive and,
+    when another process or a restart lost it, rebuilt from the part file.
+    """
+
+    READ_BLOCK = 64 * 1024
+
+    def __init__(self, root, max_file_bytes=200 * 1024 * 1024, max_chunk_bytes=8 * 1024 * 1024, ttl=24 * 3600):
+        self.root = root
+        self.max_file_bytes = max_file_bytes
+        self.max_chunk_bytes = max_chunk_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._session_locks = {}
+        self._hashers = {}
+        os.makedirs(root, exist_ok=True)
+
+    # ----- session files -----
+    def _paths(self, upload_id):
+        if not upload_id or not all(ch in '0123456789abcdef' for ch in upload_id):
+            raise UploadError('Upload not found', 404)
+        base = os.path.join(self.root, upload_id)
+        return base + '.part', base + '.json'
+
+    def _load(self, upload_id):
+        _, meta_path = self._paths(upload_id)
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise UploadError('Upload not found', 404)
+
+    def _save(self, session):
+        _, meta_path = self._paths(session['id'])
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(session, f)
+        os.replace(tmp_path, meta_path)
+
+    def _session_lock(self, upload_id):
+        with self._lock:
+            return self._session_locks.setdefault(upload_id, threading.Lock())
+
+    @contextmanager
+    def _locked(self, upload_id):
+        """Hold a session against other threads of this process and other processes"""
+        part_path, _ = self._paths(upload_id)
+        with self._session_lock(upload_id):
+            try:
+                handle = open(part_path, 'rb')
+            except OSError:
+                handle = None
+            if handle is None:
+                # Finished or aborted meanwhile; loading the sidecar reports it
+                yield
+                return
+            # The lock follows the open file, so it also covers a finalize that renames it away
+            with handle:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_EX)
+                yield
+
+    def _hasher(self, session):
+        """Running SHA-256 of the committed bytes, rebuilt from disk if this process lacks it"""
+        entry = self._hashers.get(session['id'])
+        if entry is not None and entry[0] == session['offset']:
+            return entry[1]
+        hasher = hashlib.sha256()
+        part_path, _ = self._paths(session['id'])
+        remaining = session['offset']
+        with open(part_path, 'rb') as f:
+            while remaining > 0:
+                block = f.read(min(self.READ_BLOCK, remaining))
+                if not block:
+                    break
+                hasher.update(block)
+                remaining -= len(block)
+        return hasher
+
+    # ----- API -----
+    def create(self, filename, size, checksum=None, owner=None, kind=None):
+        if size <= 0:
+            raise UploadError('File size must be positive')
+        if size > self.max_file_bytes:
+            raise UploadError('File exceeds the maximum upload size', 413, max_bytes=self.max_file_bytes)
+        self.purge_expired()
+        session = {
+            'id': uuid.uuid4().hex,
+            'filename': filename,
+            'size': size,
+            'offset': 0,
+            'checksum': checksum.lower() if checksum else None,
+            'owner': owner,
+            'kind': kind,
+            'created_at': time.time(),
+            'updated_at': time.time()
+        }
+        part_path, _ = self._paths(session['id'])
+        open(part_path, 'wb').close()
+        self._save(session)
+        return session
+
+    def get(self, upload_id):
+        return self._load(upload_id)
+
+    def write_chunk(self, upload_id, offset, stream, chunk_checksum=None):
+        """Append one chunk read from a file-like stream, returning the updated session"""
+        with self._locked(upload_id):
+            session = self._load(upload_id)
+            if offset != session['offset']:
+                raise UploadError('Offset does not match the uploaded length', 409, offset=session['offset'])
+
+            hasher = self._hasher(session).copy()
+            chunk_hasher = hashlib.sha256()
+            written = 0
+            part_path, _ = self._paths(upload_id)
+            with open(part_path, 'r+b') as f:
+                # Drop any bytes left behind by an interrupted chunk
+                f.truncate(session['offset'])
+                f.seek(session['offset'])
+                while True:
+                    block = stream.read(self.READ_BLOCK)
+                    if not block:
+                        break
+                    written += len(block)
+                    if written > self.max_chunk_bytes or session['offset'] + written > session['size']:
+                        f.truncate(session['offset'])
+                        raise UploadError('Chunk exceeds the declared file size or chunk limit', 413)
+                    f.write(block)
+                    hasher.update(block)
+                    chunk_hasher.update(block)
+
+                if chunk_checksum and chunk_hasher.hexdigest() != chunk_checksum.lower():
+                    f.truncate(session['offset'])
+                    raise UploadError('Chunk checksum mismatch', 422, offset=session['offset'])
+
+            session['offset'] += written
+            session['updated_at'] = time.time()
+            self._save(session)
+            self._hashers[upload_id] = (session['offset'], hasher)
+            return session
+
+    def finalize(self, upload_id, destination):
+        """Verify size and checksum, then move the file into place"""
+        with self._locked(upload_id):
+            session = self._load(upload_id)
+            if session['offset'] != session['size']:
+                raise UploadError('Upload is incomplete', 409, offset=session['offset'])
+            digest = self._hasher(session).hexdigest()
+            if session['checksum'] and digest != session['checksum']:
+                raise UploadError('File checksum mismatch', 422)
+
+            part_path, meta_path = self._paths(upload_id)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            os.replace(part_path, destination)
+            os.remove(meta_path)
+            self._forget(upload_id)
+            session['sha256'] = digest
+            return session
+
+    def abort(self, upload_id):
+        with self._locked(upload_id):
+            part_path, meta_path = self._paths(upload_id)
+            self._load(upload_id)
+            for path in (part_path, meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._forget(upload_id)
+
+    def purge_expired(self):
+        """Remove sessions untouched for longer than the TTL"""
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.root):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    self.abort(name[:-len('.json')])
+            except (OSError, UploadError):
+                pass
+
+    def _forget(self, upload_id):
+        self._hashers.pop(upload_id, None)
+        with self._lock:
+            self._session_locks.pop(upload_id, None)
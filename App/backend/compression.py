@@ -0,0 +1,207 @@
+import threading
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Optional; without it only gzip (and zstd if present) are offered
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml'
+}
+# Server preference when the client rates several encodings equally
+PREFERENCE = ('br', 'zstd', 'gzip')
+
+
+def available_encodings():
+    encodings = ['gzip']
+    if brotli is not None:
+        encodings.append('br')
+    if zstandard is not None:
+        encodings.append('zstd')
+    return encodings
+
+
+class _GzipStream:
+    def __init__(self, level):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, level):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._obj.process(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+STREAMS = {'gzip': _GzipStream, 'br': _BrotliStream, 'zstd': _ZstdStream}
+
+
+def compress(data, encoding, level):
+    if encoding == 'gzip':
+        stream = _GzipStream(level)
+        return stream.compress(data) + stream.finish()
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    raise ValueError(f'Unsupported encoding: {encoding}')
+
+
+class ResponseCompressor:
+    """after_request hook that compresses text responses per Accept-Encoding.
+
+    Bodies under `min_size` bytes are left alone. A response served from the
+    response cache carries the entry's `encoded_variants` (read only) and an
+    `attach_encoding(encoding, body)` callback that stores new compressed
+    bytes in the cache, so a hot cached response is compressed once per
+    encoding and reused afterwards. Streamed responses are wrapped
+    and compressed chunk by chunk, flushing after each chunk so the client
+    still receives data incrementally.
+    """
+
+    def __init__(self, min_size=1024, levels=None, enabled=True):
+        self.enabled = enabled
+        self.min_size = min_size
+        self.levels = {'gzip': 6, 'br': 4, 'zstd': 3}
+        self.levels.update(levels or {})
+        self.encodings = available_encodings()
+        self._lock = threading.Lock()
+        self.compressed = 0
+        self.reused = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def negotiate(self, accept_encodings):
+        """Best supported encoding for a parsed Accept-Encoding header, or None"""
+        best, best_quality = None, 0
+        for encoding in PREFERENCE:
+            if encoding not in self.encodings:
+                continue
+            quality = accept_encodings[encoding]
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def is_compressible(self, response):
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        if 'Content-Encoding' in response.headers or 'Content-Range' in response.headers:
+            return False
+        if response.direct_passthrough:
+            return False
+        mimetype = response.mimetype or ''
+        return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_MIMETYPES
+
+    def after_request(self, response, request):
+        if not self.enabled or not self.is_compressible(response):
+            return response
+
+        if response.is_streamed:
+            response.vary.add('Accept-Encoding')
+            encoding = self.negotiate(request.accept_encodings)
+            if encoding is not None:
+                response.response = self._stream(response.response, encoding)
+                response.headers.pop('Content-Length', None)
+                self._encoded(response, encoding)
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self.negotiate(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        variants = getattr(response, 'encoded_variants', None)
+        body = variants.get(encoding) if variants is not None else None
+        with self._lock:
+            if body is not None:
+                self.reused += 1
+        if body is None:
+            body = compress(data, encoding, self.levels[encoding])
+            attach = getattr(response, 'attach_encoding', None)
+            if attach is not None:
+                attach(encoding, body)
+            with self._lock:
+                self.compressed += 1
+                self.bytes_in += len(data)
+                self.bytes_out += len(body)
+
+        response.set_data(body)
+        self._encoded(response, encoding)
+        return response
+
+    def _encoded(self, response, encoding):
+        response.headers['Content-Encoding'] = encoding
+        # The compressed representation differs byte-wise; a weak validator
+        # still matches If-None-Match for the same content
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+    def _stream(self, chunks, encoding):
+        stream = STREAMS[encoding](self.levels[encoding])
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                data = stream.compress(chunk) + stream.flush()
+                if data:
+                    yield data
+            yield stream.finish()
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'encodings': self.encodings,
+                'min_size': self.min_size,
+                'compressed': self.compressed,
+                'reused': self.reused,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'ratio': self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+            }
@@ -0,0 +1,89 @@
+import threading
+from collections import defaultdict
+
+from pymongo import UpdateOne
+
+
+class CounterAggregator:
+    """Write-behind accumulator for $inc counters such as blog views and likes.
+
+    Increments are summed in memory per document and written with a single
+    unordered bulk_write every `interval` seconds, and once more on shutdown.
+    If a flush fails the pending increments are merged back so nothing is lost
+    while the process stays up.
+    """
+
+    def __init__(self, collection, interval=5.0):
+        self.collection = collection
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending = defaultdict(lambda: defaultdict(int))
+        self._stop = threading.Event()
+        self._thread = None
+        self.flushes = 0
+        self.flushed_increments = 0
+
+    def increment(self, doc_id, field, amount=1):
+        with self._lock:
+            self._pending[doc_id][field] += amount
+
+    def pending(self, doc_id):
+        """Increments not yet written for one document"""
+        with self._lock:
+            return dict(self._pending.get(doc_id, {}))
+
+    def apply_pending(self, doc):
+        """Add unflushed increments to a document read from MongoDB"""
+        if doc is not None:
+            for field, amount in self.pending(doc['_id']).items():
+                doc[field] = doc.get(field, 0) + amount
+        return doc
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, defaultdict(lambda: defaultdict(int))
+        if not batch:
+            return 0
+        operations = [UpdateOne({'_id': doc_id}, {'$inc': dict(fields)}) for doc_id, fields in batch.items()]
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except Exception:
+            with self._lock:
+                for doc_id, fields in batch.items():
+                    for field, amount in fields.items():
+                        self._pending[doc_id][field] += amount
+            raise
+        self.flushes += 1
+        self.flushed_increments += sum(sum(fields.values()) for fields in batch.values())
+        return len(operations)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='counter-flush', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and write whatever is still pending"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Counter flush failed: {str(e)}")
+
+    def stats(self):
+        with self._lock:
+            pending = sum(sum(fields.values()) for fields in self._pending.values())
+            documents = len(self._pending)
+        return {
+            'pending_documents': documents,
+            'pending_increments': pending,
+            'flushes': self.flushes,
+            'flushed_increments': self.flushed_increments
+        }
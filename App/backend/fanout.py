@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class FanOut:
+    """Shared thread pool for running independent reads side by side under one deadline.
+
+    `run` never raises for a single task: each one is reported as 'ok',
+    'error' or 'timeout', so a caller can return whatever finished in time.
+    Tasks that miss the deadline keep their worker until they finish, so the
+    reads themselves should carry a server-side limit (e.g. max_time_ms).
+    Size the pool as tasks per call times the calls expected at once; when
+    every worker is busy the remaining tasks run inline in the calling thread
+    instead of queueing behind other requests' reads.
+    """
+
+    def __init__(self, workers=6):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fanout')
+        self._lock = threading.Lock()
+        self._busy = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.inline = 0
+
+    def _release(self):
+        with self._lock:
+            self._busy -= 1
+
+    def _submit(self, fn):
+        def task():
+            try:
+                return fn()
+            finally:
+                self._release()
+        return self._executor.submit(task)
+
+    def run(self, tasks, deadline):
+        """Run {name: callable} concurrently. Returns ({name: result}, {name: status})"""
+        started = time.monotonic()
+        names = list(tasks)
+        with self._lock:
+            pooled = names[:max(self.workers - self._busy, 0)]
+            self._busy += len(pooled)
+            self.inline += len(names) - len(pooled)
+        futures = {name: self._submit(tasks[name]) for name in pooled}
+
+        results, statuses = {}, {}
+        for name in names[len(pooled):]:
+            try:
+                results[name] = tasks[name]()
+                statuses[name] = 'ok'
+            except Exception as e:
+                self._failed(name, e)
+                statuses[name] = 'error'
+
+        wait(futures.values(), timeout=max(deadline - (time.monotonic() - started), 0))
+        for name, future in futures.items():
+            if not future.done():
+                if future.cancel():
+                    self._release()
+                statuses[name] = 'timeout'
+                self.timeouts += 1
+                continue
+            try:
+                results[name] = future.result()
+                statuses[name] = 'ok'
+            except Exception as e:
+                self._failed(name, e)
+                statuses[name] = 'error'
+        # Report in the order the tasks were given, whichever path ran them
+        return ({name: results[name] for name in names if name in results},
+                {name: statuses[name] for name in names})
+
+    def _failed(self, name, error):
+        print(f"Fan-out task {name} failed: {str(error)}")
+        self.errors += 1
@@ -0,0 +1,100 @@
+class InvalidFields(ValueError):
+    """A ?fields= or ?include= value named something the API does not expose"""
+
+
+def _stored(*names):
+    return {name: (name,) for name in names}
+
+
+# Fields each public collection may return. Every name maps to the stored
+# fields it is read or computed from, which is what goes into the projection.
+PUBLIC_FIELDS = {
+    'skills': {
+        **_stored('name', 'level', 'category', 'icon', 'description', 'years', 'imageUrl'),
+        'imageSrcset': ('imageUrl',)
+    },
+    'projects': {
+        **_stored('title', 'description', 'link', 'technologies', 'image_url', 'status',
+                  'featured', 'created_at', 'updated_at'),
+        'image_srcset': ('image_url',)
+    },
+    'education': {
+        **_stored('degree', 'institution', 'field_of_study', 'start_date', 'end_date', 'description',
+                  'gpa', 'courses', 'website', 'image_url', 'featured', 'created_at', 'updated_at'),
+        'image_srcset': ('image_url',)
+    },
+    'experience': {
+        **_stored('position', 'company', 'duration', 'location', 'description', 'responsibilities',
+                  'technologies', 'website', 'image_url', 'featured', 'created_at', 'updated_at'),
+        'image_srcset': ('image_url',)
+    },
+    'certificates': {
+        **_stored('name', 'issuer', 'issueDate', 'expiryDate', 'credentialId', 'credentialUrl', 'category',
+                  'status', 'description', 'level', 'icon', 'priority', 'skills', 'created_at', 'updated_at'),
+        # Older documents keep the image under image_url or image
+        'imageUrl': ('imageUrl', 'image_url', 'image'),
+        'imageSrcset': ('imageUrl', 'image_url', 'image'),
+        'isExpiringSoon': ('expiryDate',),
+        'daysUntilExpiry': ('expiryDate',)
+    },
+    'blog': {
+        **_stored('title', 'slug', 'excerpt', 'content', 'categories', 'tags', 'featured', 'image', 'status',
+                  'readTime', 'date', 'author', 'views', 'likes', 'createdAt', 'updatedAt'),
+        'score': (),
+        'highlight': ()
+    }
+}
+
+
+def parse_fields(value, collection):
+    """Field names from a comma-separated ?fields= value, or None to keep the route's default shape"""
+    if value is None or not value.strip():
+        return None
+    allowed = PUBLIC_FIELDS[collection]
+    fields = ['_id']
+    unknown = []
+    for name in value.split(','):
+        name = name.strip()
+        if not name or name in fields:
+            continue
+        if name not in allowed:
+            unknown.append(name)
+        fields.append(name)
+    if unknown:
+        raise InvalidFields(f"Unknown field(s) for {collection}: {', '.join(unknown)}")
+    return fields
+
+
+def parse_include(value, available):
+    """Section names from a comma-separated ?include= value; every section when absent"""
+    if value is None or not value.strip():
+        return list(available)
+    sections = []
+    for name in value.split(','):
+        name = name.strip()
+        if not name or name in sections:
+            continue
+        if name not in available:
+            raise InvalidFields(f"Unknown include: {name}. Available: {', '.join(available)}")
+        sections.append(name)
+    return sections
+
+
+def projection_for(collection, fields, default=None, extra=()):
+    """Mongo projection covering the requested fields, plus stored fields the route needs (e.g. its sort key)"""
+    if fields is None:
+        return default
+    projection = {'_id': 1}
+    for name in fields:
+        for stored in PUBLIC_FIELDS[collection].get(name, ()):
+            projection[stored] = 1
+    for name in extra:
+        projection[name] = 1
+    return projection
+
+
+def select_fields(doc, fields):
+    """Trim a finished response document to the requested fields, in the requested order"""
+    if fields is None:
+        return doc
+    return {name: doc[name] for name in fields if name in doc}
@@ -0,0 +1,123 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+
+class CollectionVersions:
+    """Version counter and last-modified stamp per collection, bumped on every write.
+
+    Stamps are kept at whole-second precision, as in the Last-Modified header,
+    and always move forward by at least a second so that two writes in the same
+    second still produce distinct validators.
+
+    With a `store` collection, every bump is also counted and stamped there,
+    so processes serving the same database can tell when another one wrote
+    (shared_version) and agree on Last-Modified (shared_last_modified). A
+    collection nobody has written yet gets the stamp of the first process to
+    read it.
+    """
+
+    def __init__(self, store=None, check_interval=1.0):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._stamps = {}
+        self._shared = {}
+        self.store = store
+        self.check_interval = check_interval
+        self.started_at = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def bump(self, *names):
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+                previous = self._stamps.get(name, self.started_at)
+                self._stamps[name] = max(now, previous + timedelta(seconds=1))
+                self._shared.pop(name, None)
+            stamps = {name: self._stamps[name] for name in names}
+        if self.store is not None:
+            for name in names:
+                self.store.update_one(
+                    {'_id': name},
+                    {'$inc': {'version': 1}, '$max': {'last_modified': stamps[name]}},
+                    upsert=True
+                )
+
+    def _shared_state(self, name):
+        """(version, last_modified) of a collection across all processes, re-read at most every check_interval s"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._shared.get(name)
+        if cached is not None and now - cached[0] < self.check_interval:
+            return cached[1], cached[2]
+        doc = self.store.find_one({'_id': name})
+        if doc is None:
+            self.store.update_one(
+                {'_id': name},
+                {'$setOnInsert': {'version': 0, 'last_modified': self.started_at}},
+                upsert=True
+            )
+            doc = self.store.find_one({'_id': name})
+        stamp = doc.get('last_modified') or self.started_at
+        # MongoDB hands back naive UTC datetimes
+        if stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=timezone.utc)
+        with self._lock:
+            self._shared[name] = (now, doc.get('version', 0), stamp)
+        return doc.get('version', 0), stamp
+
+    def shared_version(self, name):
+        """Write count of a collection across all processes"""
+        if self.store is None:
+            return self.version(name)
+        return self._shared_state(name)[0]
+
+    def shared_last_modified(self, *names):
+        """Last-Modified stamp every process reports for these collections"""
+        if self.store is None:
+            return self.last_modified(*names)
+        return max((self._shared_state(name)[1] for name in names), default=self.started_at)
+
+    def version(self, name):
+        with self._lock:
+            return self._versions.get(name, 0)
+
+    def last_modified(self, *names):
+        with self._lock:
+            return max((self._stamps.get(name, self.started_at) for name in names),
+                       default=self.started_at)
+
+    def snapshot(self):
+        with self._lock:
+            names = set(self._versions) | set(self._stamps)
+            return {
+                name: {
+                    'version': self._versions.get(name, 0),
+                    'last_modified': self._stamps.get(name, self.started_at).isoformat()
+                }
+                for name in sorted(names)
+            }
+
+
+def make_etag(body):
+    """Strong validator derived from the exact response bytes"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def format_cache_control(policy):
+    """Render a Cache-Control header from a policy dict such as
+    {'public': True, 'max_age': 60, 's_maxage': 300, 'stale_while_revalidate': 600}
+    """
+    directives = []
+    for name, value in policy.items():
+        if value is None or value is False:
+            continue
+        directive = name.replace('_', '-')
+        if value is True:
+            directives.append(directive)
+        else:
+            directives.append(f'{directive}={int(value)}')
+    return ', '.join(directives)
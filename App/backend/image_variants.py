@@ -0,0 +1,192 @@
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps, features
+    PIL_AVAILABLE = True
+except ImportError:  # Pillow is optional; uploads are then served as-is
+    PIL_AVAILABLE = False
+
+try:
+    import pillow_avif  # noqa: F401 - registers the AVIF plugin on older Pillow
+except ImportError:
+    pass
+
+
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+PROCESSABLE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'webp'}
+MIMETYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png'
+}
+EXTENSIONS = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg', 'png': 'png'}
+
+
+def avif_supported():
+    if not PIL_AVAILABLE:
+        return False
+    try:
+        return bool(features.check('avif'))
+    except Exception:
+        return 'AVIF' in Image.SAVE
+
+
+def manifest_path(path):
+    stem, _ = os.path.splitext(path)
+    return f'{stem}.variants.json'
+
+
+def can_process(filename):
+    return PIL_AVAILABLE and filename.rsplit('.', 1)[-1].lower() in PROCESSABLE_EXTENSIONS
+
+
+def generate_variants(path, widths=VARIANT_WIDTHS, quality=80):
+    """Write metadata-free, recompressed copies of an image at several widths.
+
+    Runs in a worker process. Produces AVIF (when the Pillow build supports
+    it), WebP and a fallback in the source format, never upscaling, plus a
+    <stem>.variants.json manifest that the serving route reads. The original
+    file is left untouched.
+    """
+    stem, ext = os.path.splitext(path)
+    with Image.open(path) as source:
+        image = ImageOps.exif_transpose(source)
+        fallback = 'png' if ext.lower() == '.png' else 'jpeg'
+        if fallback == 'jpeg' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        formats = (['avif'] if avif_supported() else []) + ['webp', fallback]
+        targets = sorted({w for w in widths if w < image.width} | {image.width})
+
+        variants = []
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                filename = f'{os.path.basename(stem)}.w{width}.{EXTENSIONS[fmt]}'
+                options = {'optimize': True} if fmt in ('jpeg', 'png') else {}
+                if fmt != 'png':
+                    options['quality'] = quality
+                # No exif/icc arguments: the saved variant carries no metadata
+                target = os.path.join(os.path.dirname(path), filename)
+                resized.save(target, format=fmt.upper(), **options)
+                variants.append({'width': width, 'format': fmt, 'file': filename, 'bytes': os.path.getsize(target)})
+
+    manifest = {
+        'source': os.path.basename(path),
+        'width': image.width,
+        'height': image.height,
+        'bytes': os.path.getsize(path),
+        'variants': variants
+    }
+    tmp_path = manifest_path(path) + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path(path))
+    return manifest
+
+
+class VariantPipeline:
+    """Process pool that builds image variants off the request path"""
+
+    def __init__(self, workers=2, widths=VARIANT_WIDTHS, quality=80):
+        self.workers = workers
+        self.widths = widths
+        self.quality = quality
+        self._executor = None
+        self._lock = threading.Lock()
+        self._manifests = {}
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def enqueue(self, path, on_done=None):
+        """Schedule variant generation; on_done(manifest) runs in the parent once it finishes"""
+        if not can_process(path):
+            return None
+        future = self._pool().submit(generate_variants, path, self.widths, self.quality)
+
+        def finished(f):
+            try:
+                manifest = f.result()
+            except Exception as e:
+                print(f"Image variants failed for {path}: {str(e)}")
+                return
+            with self._lock:
+                self._manifests.pop(manifest_path(path), None)
+            if on_done:
+                on_done(manifest)
+        future.add_done_callback(finished)
+        return future
+
+    def manifest(self, path):
+        """Variant manifest for an original file, or None if it has not been processed"""
+        key = manifest_path(path)
+        try:
+            mtime = os.path.getmtime(key)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._manifests.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+        try:
+            with open(key) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._manifests[key] = (mtime, manifest)
+        return manifest
+
+    def pick(self, path, width=None, accept=None):
+        """Best variant filename for a requested width and Accept header, or None for the original.
+
+        Without a width, only a better format the client accepts is worth
+        serving; and a variant is only served when it is smaller than the
+        original file.
+        """
+        manifest = self.manifest(path)
+        if not manifest:
+            return None, None
+        available = {v['format'] for v in manifest['variants']}
+        fmt = None
+        for candidate in ('avif', 'webp'):
+            if candidate in available and accept is not None and MIMETYPES[candidate] in accept:
+                fmt = candidate
+                break
+        if fmt is None:
+            if not width:
+                return None, None
+            fmt = next((v['format'] for v in manifest['variants'] if v['format'] not in ('avif', 'webp')), None)
+        if fmt is None:
+            return None, None
+
+        candidates = sorted((v for v in manifest['variants'] if v['format'] == fmt), key=lambda v: v['width'])
+        chosen = candidates[-1]
+        if width:
+            chosen = next((v for v in candidates if v['width'] >= width), candidates[-1])
+        # Manifests written before sizes were recorded fall back to stat()
+        try:
+            variant_bytes = chosen.get('bytes') or os.path.getsize(os.path.join(os.path.dirname(path), chosen['file']))
+            source_bytes = manifest.get('bytes') or os.path.getsize(path)
+        except OSError:
+            return None, None
+        if variant_bytes >= source_bytes:
+            return None, None
+        return chosen['file'], MIMETYPES[fmt]
+
+    def srcset(self, path, url):
+        """srcset string for an upload URL, using the serving route's ?w= parameter"""
+        manifest = self.manifest(path)
+        if not manifest:
+            return None
+        widths = sorted({v['width'] for v in manifest['variants']})
+        return ', '.join(f'{url}?w={w} {w}w' for w in widths)
@@ -0,0 +1,141 @@
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+
+# Indexes for every collection in app.collections. Names are explicit so that
+# re-running ensure_indexes() is a no-op instead of creating duplicates.
+INDEXES = {
+    'users': [
+        IndexModel([('email', ASCENDING), ('role', ASCENDING)], name='email_role'),
+        IndexModel([('role', ASCENDING)], name='role')
+    ],
+    'skills': [
+        IndexModel([('name', ASCENDING)], name='name')
+    ],
+    'projects': [
+        IndexModel([('created_at', DESCENDING), ('_id', DESCENDING)], name='created_at_id'),
+        IndexModel([('status', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)], name='status_created_at_id')
+    ],
+    'education': [
+        IndexModel([('start_date', DESCENDING), ('_id', DESCENDING)], name='start_date_id'),
+        IndexModel([('featured', ASCENDING), ('start_date', DESCENDING), ('_id', DESCENDING)], name='featured_start_date_id')
+    ],
+    'experience': [
+        IndexModel([('created_at', DESCENDING), ('_id', DESCENDING)], name='created_at_id'),
+        IndexModel([('featured', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)], name='featured_created_at_id')
+    ],
+    'certificates': [
+        IndexModel([('issueDate', DESCENDING), ('_id', DESCENDING)], name='issue_date_id'),
+        IndexModel([('category', ASCENDING), ('issueDate', DESCENDING)], name='category_issue_date'),
+        IndexModel([('status', ASCENDING), ('expiryDate', ASCENDING)], name='status_expiry_date')
+    ],
+    'settings': [],
+    'messages': [
+        IndexModel([('created_at', DESCENDING), ('_id', DESCENDING)], name='created_at_id'),
+        IndexModel([('read', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)], name='read_created_at_id')
+    ],
+    'blog': [
+        IndexModel([('slug', ASCENDING)], name='slug', unique=True),
+        IndexModel([('createdAt', DESCENDING), ('_id', DESCENDING)], name='created_at_id'),
+        IndexModel([('categories', ASCENDING), ('createdAt', DESCENDING), ('_id', DESCENDING)], name='categories_created_at_id'),
+        IndexModel([('featured', ASCENDING), ('createdAt', DESCENDING), ('_id', DESCENDING)], name='featured_created_at_id')
+    ]
+}
+
+
+def ensure_indexes(collections):
+    """Create every registered index. Returns {collection: [created names]} and a list of errors.
+
+    Creating an index that already exists with the same definition is a no-op
+    on the server, so this is safe to run on every start.
+    """
+    created = {}
+    errors = []
+    for name, models in INDEXES.items():
+        if not models or name not in collections:
+            continue
+        try:
+            created[name] = collections[name].create_indexes(models)
+        except OperationFailure as e:
+            # e.g. duplicate slugs blocking the unique index, or an index with
+            # the same name but different options created by hand
+            errors.append(f'{name}: {e}')
+    return created, errors
+
+
+def _sort_keys(field, direction=-1):
+    return [(field, direction), ('_id', direction)]
+
+
+def _after(field, value=None):
+    """Shape of the filter pagination.keyset_page adds for a cursor"""
+    value = value if value is not None else datetime.utcnow()
+    return {field: {'$lte': value}, '$or': [{field: {'$lt': value}}, {'_id': {'$lt': ObjectId()}}]}
+
+
+# Query shapes issued by the routes, with representative values. Listings that
+# intentionally read a whole collection without a sort (public_portfolio, the
+# unpaginated public lists) are not included since a collection scan is the
+# right plan for them.
+QUERY_SHAPES = [
+    ('users', 'login', {'email': 'admin@example.com', 'role': 'admin'}, None),
+    ('users', 'default admin check', {'role': 'admin'}, None),
+    ('skills', 'skills', {}, [('name', 1)]),
+    ('blog', 'get_blog_posts', {}, _sort_keys('createdAt')),
+    ('blog', 'get_blog_posts cursor', _after('createdAt'), _sort_keys('createdAt')),
+    ('blog', 'get_blog_posts category', {'categories': 'technology'}, _sort_keys('createdAt')),
+    ('blog', 'get_blog_posts featured', {'featured': True}, _sort_keys('createdAt')),
+    ('blog', 'get_blog_post_by_slug', {'slug': 'hello-world'}, None),
+    ('projects', 'get_projects', {}, _sort_keys('created_at')),
+    ('projects', 'get_projects cursor', _after('created_at'), _sort_keys('created_at')),
+    ('projects', 'get_public_projects', {'status': 'active'}, _sort_keys('created_at')),
+    ('education', 'get_educations', {}, _sort_keys('start_date')),
+    ('education', 'get_educations cursor', _after('start_date', '2020-01-01'), _sort_keys('start_date')),
+    ('education', 'get_public_educations featured', {'featured': True}, _sort_keys('start_date')),
+    ('experience', 'get_experiences', {}, _sort_keys('created_at')),
+    ('experience', 'get_experiences cursor', _after('created_at'), _sort_keys('created_at')),
+    ('experience', 'get_public_experiences featured', {'featured': True}, _sort_keys('created_at')),
+    ('certificates', 'certificates', {}, [('issueDate', -1)]),
+    ('certificates', 'certificates category', {'category': 'Cloud Computing'}, [('issueDate', -1)]),
+    ('certificates', 'certificate_stats', {'status': 'Active'}, None),
+    ('certificates', 'get_public_certificates cursor', {'_id': {'$lt': ObjectId()}}, [('_id', -1)]),
+    ('messages', 'get_messages', {}, _sort_keys('created_at')),
+    ('messages', 'get_messages cursor', _after('created_at'), _sort_keys('created_at')),
+    ('messages', 'get_messages unread', {'read': False}, _sort_keys('created_at'))
+]
+
+
+def _plan_stages(plan):
+    """Every stage name in an explain() plan tree, whatever the server version nests it under"""
+    stages = []
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            stages.append(plan['stage'])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+def verify_query_plans(collections, shapes=QUERY_SHAPES):
+    """Explain every query shape and report those that scan the collection or sort in memory"""
+    problems = []
+    for name, label, query, sort in shapes:
+        cursor = collections[name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        winning_plan = cursor.explain().get('queryPlanner', {}).get('winningPlan', {})
+        stages = _plan_stages(winning_plan)
+        bad = [stage for stage in stages if stage in ('COLLSCAN', 'SORT')]
+        if bad:
+            problems.append({
+                'collection': name,
+                'query': label,
+                'stages': stages
+            })
+    return problems
@@ -0,0 +1,152 @@
+import linecache
+import sys
+import threading
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+
+# Allocations made by the tracer itself or by imports are never the leak we are looking for
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>')
+)
+
+GROUPINGS = ('lineno', 'filename', 'traceback')
+
+
+class MemoryTracker:
+    """Per-request allocation accounting and named tracemalloc snapshots.
+
+    Request figures come from tracemalloc's process-wide counters, which any
+    concurrent request disturbs (reset_peak included). So only one request
+    per process is accounted at a time: requests starting while it runs are
+    not tracked, and the tracked one is flagged `concurrent` if anything
+    overlapped it, since its figures then include the others' allocations.
+    Tracing costs CPU and memory of its own, which is why it only runs when
+    enabled or while snapshots are being taken.
+    """
+
+    def __init__(self, frames=1, keep=10):
+        self.frames = frames
+        self._keep = keep
+        self._snapshots = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._tracked = None
+        self.untracked = 0
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def stop(self):
+        """Stop tracing and forget every snapshot"""
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+
+    def begin(self):
+        """Mark the start of a request; returns the marker `end` expects (pass it even when untracked)"""
+        with self._lock:
+            self._in_flight += 1
+            if self._tracked is not None:
+                self._tracked['concurrent'] = True
+                self.untracked += 1
+                return {'tracked': False}
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            self._tracked = {
+                'tracked': True,
+                'started': current,
+                'blocks': sys.getallocatedblocks(),
+                'concurrent': self._in_flight > 1
+            }
+            return self._tracked
+
+    def end(self, mark):
+        """Bytes at peak and retained since `begin`, and the net change in live allocated blocks.
+
+        None for a request that was not tracked; `end` must still be called
+        once per `begin`.
+        """
+        with self._lock:
+            self._in_flight -= 1
+            if not mark['tracked']:
+                return None
+            self._tracked = None
+            current, peak = tracemalloc.get_traced_memory()
+            return {
+                'peak': max(peak - mark['started'], 0),
+                'net': current - mark['started'],
+                'blocks': sys.getallocatedblocks() - mark['blocks'],
+                'concurrent': mark['concurrent']
+            }
+
+    def take(self, label=None):
+        """Take and keep a snapshot; tracing starts here if it was off"""
+        self.start()
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        current, peak = tracemalloc.get_traced_memory()
+        entry = {
+            'id': uuid.uuid4().hex[:12],
+            'label': label,
+            'taken_at': datetime.now(timezone.utc),
+            'traced_bytes': current,
+            'peak_bytes': peak,
+            'snapshot': snapshot
+        }
+        with self._lock:
+            self._snapshots[entry['id']] = entry
+            while len(self._snapshots) > self._keep:
+                self._snapshots.popitem(last=False)
+        return entry
+
+    def get(self, snapshot_id):
+        with self._lock:
+            return self._snapshots.get(snapshot_id)
+
+    def list(self):
+        with self._lock:
+            return [self.describe(entry) for entry in self._snapshots.values()]
+
+    @staticmethod
+    def describe(entry):
+        return {key: value for key, value in entry.items() if key != 'snapshot'}
+
+    @staticmethod
+    def _where(stat, group_by):
+        frames = stat.traceback if group_by == 'traceback' else stat.traceback[:1]
+        if group_by == 'filename':
+            return [frame.filename for frame in frames]
+        return [f'{frame.filename}:{frame.lineno}' for frame in frames]
+
+    def top(self, entry, group_by='lineno', limit=20):
+        """Largest allocation sites in one snapshot"""
+        stats = entry['snapshot'].statistics(group_by)
+        return [
+            {'where': self._where(stat, group_by), 'size': stat.size, 'count': stat.count}
+            for stat in stats[:limit]
+        ]
+
+    def diff(self, before, after, group_by='lineno', limit=20):
+        """Allocation sites that grew the most between two snapshots"""
+        stats = after['snapshot'].compare_to(before['snapshot'], group_by)
+        return [
+            {
+                'where': self._where(stat, group_by),
+                'size': stat.size,
+                'size_diff': stat.size_diff,
+                'count': stat.count,
+                'count_diff': stat.count_diff
+            }
+            for stat in stats[:limit]
+        ]
@@ -0,0 +1,147 @@
+import threading
+import time
+
+from pymongo import monitoring
+from pymongo.read_preferences import Nearest, PrimaryPreferred, SecondaryPreferred
+
+
+# MongoClient keyword -> (environment variable, default). None means pymongo's own default.
+CLIENT_OPTIONS = {
+    'maxPoolSize': ('MONGO_MAX_POOL_SIZE', 100),
+    'minPoolSize': ('MONGO_MIN_POOL_SIZE', 0),
+    'maxIdleTimeMS': ('MONGO_MAX_IDLE_TIME_MS', None),
+    'maxConnecting': ('MONGO_MAX_CONNECTING', None),
+    'waitQueueTimeoutMS': ('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000),
+    'serverSelectionTimeoutMS': ('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000),
+    'connectTimeoutMS': ('MONGO_CONNECT_TIMEOUT_MS', 5000),
+    'socketTimeoutMS': ('MONGO_SOCKET_TIMEOUT_MS', None)
+}
+
+READ_PREFERENCES = {
+    'primaryPreferred': PrimaryPreferred,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest
+}
+
+
+def client_options(environ):
+    """MongoClient keyword arguments from MONGO_* environment variables"""
+    options = {}
+    for option, (variable, default) in CLIENT_OPTIONS.items():
+        value = environ.get(variable, default)
+        if value is not None and value != '':
+            options[option] = int(value)
+    # e.g. "zstd,snappy,zlib"; the server picks the first one it also supports
+    if environ.get('MONGO_COMPRESSORS'):
+        options['compressors'] = environ['MONGO_COMPRESSORS']
+    options['appname'] = environ.get('MONGO_APPNAME', 'vibecanvas-backend')
+    return options
+
+
+def read_preference(mode, max_staleness=None):
+    """Read preference for a mode name, or None for primary reads"""
+    if not mode or mode == 'primary':
+        return None
+    if mode not in READ_PREFERENCES:
+        raise ValueError(f'Unknown read preference: {mode}')
+    if max_staleness is None or max_staleness < 0:
+        return READ_PREFERENCES[mode]()
+    if max_staleness < 90:
+        # The server-side minimum: heartbeat interval plus idle write period
+        raise ValueError('max staleness must be at least 90 seconds')
+    return READ_PREFERENCES[mode](max_staleness=max_staleness)
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters per server, fed by pymongo's CMAP events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools = {}
+        self._local = threading.local()
+
+    def _pool(self, address):
+        key = f'{address[0]}:{address[1]}'
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = {
+                'open': 0,
+                'in_use': 0,
+                'created': 0,
+                'closed': 0,
+                'checkouts': 0,
+                'checkout_failures': {},
+                'cleared': 0,
+                'wait_ms_total': 0.0,
+                'wait_ms_max': 0.0
+            }
+        return pool
+
+    def _update(self, address, **deltas):
+        with self._lock:
+            pool = self._pool(address)
+            for field, delta in deltas.items():
+                pool[field] += delta
+
+    def _waited_ms(self):
+        started = getattr(self._local, 'started', None)
+        self._local.started = None
+        return (time.monotonic() - started) * 1000 if started is not None else 0.0
+
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._update(event.address, cleared=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._update(event.address, open=1, created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(event.address, open=-1, closed=1)
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.monotonic()
+
+    def connection_check_out_failed(self, event):
+        waited = self._waited_ms()
+        with self._lock:
+            pool = self._pool(event.address)
+            failures = pool['checkout_failures']
+            failures[str(event.reason)] = failures.get(str(event.reason), 0) + 1
+            pool['wait_ms_total'] += waited
+
+    def connection_checked_out(self, event):
+        waited = self._waited_ms()
+        with self._lock:
+            pool = self._pool(event.address)
+            pool['in_use'] += 1
+            pool['checkouts'] += 1
+            pool['wait_ms_total'] += waited
+            pool['wait_ms_max'] = max(pool['wait_ms_max'], waited)
+
+    def connection_checked_in(self, event):
+        self._update(event.address, in_use=-1)
+
+    def snapshot(self):
+        with self._lock:
+            pools = {}
+            for address, pool in self._pools.items():
+                attempts = pool['checkouts'] + sum(pool['checkout_failures'].values())
+                pools[address] = {
+                    **pool,
+                    'checkout_failures': dict(pool['checkout_failures']),
+                    'idle': pool['open'] - pool['in_use'],
+                    'wait_ms_avg': pool['wait_ms_total'] / attempts if attempts else 0.0
+                }
+            return pools
@@ -0,0 +1,120 @@
+import base64
+import threading
+import time
+
+from bson import json_util
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort_value, doc_id, direction='next'):
+    """Opaque token holding the (sort key, _id) position of a document"""
+    payload = json_util.dumps({'v': sort_value, 'id': doc_id, 'd': direction})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        if payload.get('d') not in ('next', 'prev') or 'id' not in payload:
+            raise InvalidCursor('Malformed cursor')
+        return payload.get('v'), payload['id'], payload['d']
+    except InvalidCursor:
+        raise
+    except Exception:
+        raise InvalidCursor('Malformed cursor')
+
+
+def _after(sort_field, sort_direction, value, doc_id):
+    """Filter matching documents strictly after (value, doc_id) in the given order.
+
+    The inclusive bound on sort_field is redundant logically but gives the
+    planner a range on the leading key of the (sort_field, _id) index, so the
+    page is read straight off the index instead of through an $or plan.
+    """
+    op = '$lt' if sort_direction < 0 else '$gt'
+    if sort_field == '_id':
+        return {'_id': {op: doc_id}}
+    return {
+        sort_field: {op + 'e': value},
+        '$or': [
+            {sort_field: {op: value}},
+            {'_id': {op: doc_id}}
+        ]
+    }
+
+
+def keyset_page(collection, query, sort_field, sort_direction, limit, cursor=None, projection=None):
+    """Fetch one page ordered by (sort_field, _id) without skip().
+
+    Returns (docs, next_cursor, prev_cursor). A 'prev' cursor walks the index
+    backwards from the first document of the current page and the results are
+    flipped back into display order. Documents lacking sort_field are only
+    reachable on the first page, so sort on fields every document has.
+    """
+    direction = 'next'
+    if cursor:
+        value, doc_id, direction = decode_cursor(cursor)
+
+    scan_direction = sort_direction if direction == 'next' else -sort_direction
+    conditions = [query] if query else []
+    if cursor:
+        conditions.append(_after(sort_field, scan_direction, value, doc_id))
+    if not conditions:
+        filter_ = {}
+    elif len(conditions) == 1:
+        filter_ = conditions[0]
+    else:
+        filter_ = {'$and': conditions}
+
+    sort = [('_id', scan_direction)] if sort_field == '_id' else [(sort_field, scan_direction), ('_id', scan_direction)]
+    docs = list(collection.find(filter_, projection).sort(sort).limit(limit + 1))
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+
+    if direction == 'next':
+        has_next, has_prev = has_more, cursor is not None
+    else:
+        docs.reverse()
+        has_next, has_prev = True, has_more
+
+    next_cursor = prev_cursor = None
+    if docs and has_next:
+        last = docs[-1]
+        next_cursor = encode_cursor(last.get(sort_field), last['_id'], 'next')
+    if docs and has_prev:
+        first = docs[0]
+        prev_cursor = encode_cursor(first.get(sort_field), first['_id'], 'prev')
+    return docs, next_cursor, prev_cursor
+
+
+class CountCache:
+    """Short-lived memo of count_documents results so totals are not recounted per page"""
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def count(self, collection, query):
+        key = (collection.name, json_util.dumps(query, sort_keys=True))
+        now = time.time()
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached and cached[1] > now:
+                return cached[0]
+        total = collection.count_documents(query)
+        with self._lock:
+            self._counts[key] = (total, now + self.ttl)
+        return total
+
+    def invalidate(self, collection_name=None):
+        with self._lock:
+            if collection_name is None:
+                self._counts.clear()
+            else:
+                for key in [k for k in self._counts if k[0] == collection_name]:
+                    del self._counts[key]
@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+
+
+class HasherSaturated(Exception):
+    """Every worker is busy and the wait queue is full"""
+
+
+class HasherTimeout(Exception):
+    """The hash did not finish within the configured deadline"""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool with admission control.
+
+    bcrypt releases the GIL while hashing, so a few threads are enough to use
+    spare cores without starving the request threads. At most
+    `workers + max_queue` hashes may be in flight; anything beyond that is
+    rejected immediately instead of queueing behind a login burst.
+    """
+
+    def __init__(self, rounds=12, workers=2, max_queue=8, timeout=5.0):
+        self.rounds = rounds
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HasherSaturated('Too many concurrent password checks')
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is held until the hash actually finishes, even if the caller gave up
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self.timed_out += 1
+            raise HasherTimeout('Password check timed out')
+
+    def verify(self, password, hashed):
+        return self._submit(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def hash(self, password):
+        hashed = self._submit(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds))
+        return hashed.decode('utf-8')
+
+    def needs_rehash(self, hashed):
+        """True when the stored hash was made with a different cost factor ($2b$<cost>$...)"""
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def stats(self):
+        return {
+            'rounds': self.rounds,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out
+        }
@@ -0,0 +1,219 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+
+from pymongo import monitoring
+
+
+# ?__profile= / X-Profile values -> profiler mode
+MODES = {'1': 'sample', 'true': 'sample', 'sample': 'sample', 'cprofile': 'cprofile'}
+
+
+def _frame_label(code):
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class _Sampler(threading.Thread):
+    """Samples one thread's Python stack every `interval` seconds"""
+
+    def __init__(self, ident, interval, max_depth=128):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.target = ident
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+class Profile:
+    def __init__(self, mode, method, path, endpoint):
+        self.id = uuid.uuid4().hex[:12]
+        self.mode = mode
+        self.method = method
+        self.path = path
+        self.endpoint = endpoint
+        self.started_at = datetime.now(timezone.utc)
+        self.mongo_commands = Counter()
+        self.mongo_ms = 0.0
+        self.bytes_serialized = 0
+        self.status = None
+        self.response_bytes = None
+        self.duration_ms = None
+        self.stacks = Counter()
+        self.functions = []
+        self._started = time.perf_counter()
+        self._sampler = None
+        self._cprofile = None
+
+    def summary(self):
+        return {
+            'id': self.id,
+            'mode': self.mode,
+            'method': self.method,
+            'path': self.path,
+            'endpoint': self.endpoint,
+            'started_at': self.started_at,
+            'duration_ms': self.duration_ms,
+            'status': self.status,
+            'mongo': {
+                'commands': sum(self.mongo_commands.values()),
+                'ms': round(self.mongo_ms, 3),
+                'by_command': dict(self.mongo_commands)
+            },
+            'bytes_serialized': self.bytes_serialized,
+            'response_bytes': self.response_bytes,
+            'samples': sum(self.stacks.values())
+        }
+
+    def collapsed(self):
+        """Folded stacks ("root;child;leaf count" lines) for flamegraph.pl, speedscope or inferno"""
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def call_tree(self, min_share=0.005):
+        """Sampled stacks merged into a tree; branches under `min_share` of all samples are dropped"""
+        root = {'name': 'all', 'samples': 0, 'children': {}}
+        for stack, count in self.stacks.items():
+            root['samples'] += count
+            node = root
+            for label in stack:
+                node = node['children'].setdefault(label, {'name': label, 'samples': 0, 'children': {}})
+                node['samples'] += count
+        floor = root['samples'] * min_share
+
+        def finish(node):
+            children = [finish(child) for child in node['children'].values() if child['samples'] >= floor]
+            return {
+                'name': node['name'],
+                'samples': node['samples'],
+                'children': sorted(children, key=lambda child: -child['samples'])
+            }
+        return finish(root)
+
+
+class RequestProfiler(monitoring.CommandListener):
+    """On-demand profiling of single requests, kept in memory for the admin API.
+
+    'sample' mode records the request thread's stack every `interval` seconds
+    (call tree and collapsed stacks); 'cprofile' mode traces every call on that
+    thread and reports the function table. Either way the Mongo commands and
+    JSON bytes produced on the request thread are counted; work the request
+    hands to other threads (e.g. the portfolio fan-out) is not attributed.
+    When nothing is being profiled the hooks cost a dict lookup.
+    """
+
+    QUERY_PARAM = '__profile'
+
+    def __init__(self, interval=0.001, keep=20):
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._profiles = OrderedDict()
+        self._keep = keep
+
+    @staticmethod
+    def requested_mode(request):
+        value = request.args.get(RequestProfiler.QUERY_PARAM) or request.headers.get('X-Profile')
+        return MODES.get(value.lower()) if value else None
+
+    def start(self, mode, method, path, endpoint):
+        profile = Profile(mode, method, path, endpoint)
+        ident = threading.get_ident()
+        self._active[ident] = profile
+        if mode == 'cprofile':
+            profile._cprofile = cProfile.Profile()
+            profile._cprofile.enable()
+        else:
+            profile._sampler = _Sampler(ident, self.interval)
+            profile._sampler.start()
+        return profile
+
+    def _halt(self, profile):
+        self._active.pop(threading.get_ident(), None)
+        if profile._sampler is not None:
+            profile._sampler.stop()
+            profile.stacks = profile._sampler.stacks
+            profile._sampler = None
+        if profile._cprofile is not None:
+            profile._cprofile.disable()
+            profile.functions = self._function_table(profile._cprofile)
+            profile._cprofile = None
+        if profile.duration_ms is None:
+            profile.duration_ms = round((time.perf_counter() - profile._started) * 1000, 3)
+
+    def finish(self, profile, response):
+        self._halt(profile)
+        profile.status = response.status_code
+        if not response.is_streamed:
+            profile.response_bytes = response.calculate_content_length()
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self._keep:
+                self._profiles.popitem(last=False)
+        return profile
+
+    def discard(self, profile):
+        """Stop a profile whose request never produced a response"""
+        if profile._sampler is not None or profile._cprofile is not None:
+            self._halt(profile)
+
+    @staticmethod
+    def _function_table(profiler, limit=60):
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        rows = []
+        for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+            rows.append({
+                'function': f'{name} ({os.path.basename(filename)}:{line})',
+                'calls': calls,
+                'own_ms': round(own * 1000, 3),
+                'cumulative_ms': round(cumulative * 1000, 3)
+            })
+        rows.sort(key=lambda row: -row['cumulative_ms'])
+        return rows[:limit]
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self):
+        with self._lock:
+            return [profile.summary() for profile in reversed(self._profiles.values())]
+
+    def count_serialized(self, size):
+        if self._active:
+            profile = self._active.get(threading.get_ident())
+            if profile is not None:
+                profile.bytes_serialized += size
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        if self._active:
+            profile = self._active.get(threading.get_ident())
+            if profile is not None:
+                profile.mongo_commands[event.command_name] += 1
+                profile.mongo_ms += event.duration_micros / 1000
+
+    def failed(self, event):
+        self.succeeded(event)
@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheEntry:
+    """A serialized response body plus what is needed to replay it.
+
+    `encoded` holds compressed copies of the body keyed by content coding,
+    added lazily through ResponseCache.attach_encoding and counted in `size`.
+    `versions` are the data versions the body was built from, if known.
+    """
+    __slots__ = ('body', 'status', 'mimetype', 'tags', 'etag', 'size', 'created_at', 'expires_at', 'encoded',
+                 'cache_control', 'versions')
+
+    def __init__(self, body, status, mimetype, tags, etag=None, ttl=None, cache_control=None, versions=None):
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+        self.tags = tuple(tags)
+        self.etag = etag
+        self.cache_control = cache_control
+        self.versions = versions
+        self.size = len(body)
+        self.created_at = time.time()
+        self.expires_at = self.created_at + ttl if ttl else None
+        self.encoded = {}
+
+    def expired(self, now=None):
+        return self.expires_at is not None and (now or time.time()) >= self.expires_at
+
+
+class ResponseCache:
+    """In-process LRU cache of response bodies bounded by total size in bytes.
+
+    Every entry is tagged with the collections it was built from so that a
+    write to one collection only drops the responses that depend on it.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, versions=None):
+        """Cached entry for key; with `versions`, an entry built from other data versions is dropped as a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expired():
+                self._remove(key)
+                self.misses += 1
+                return None
+            if versions is not None and entry.versions is not None and entry.versions != versions:
+                # Another process wrote one of the collections this body was built from
+                self._remove(key)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, body, status=200, mimetype='application/json', tags=(), etag=None, ttl=None,
+            cache_control=None, versions=None):
+        """Cache a body; `ttl` overrides the cache-wide TTL, `cache_control` is replayed on hits and
+        `versions` are the data versions the body was built from (see get)"""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        entry = CacheEntry(body, status, mimetype, tags, etag, ttl or self.ttl, cache_control, versions)
+        # Never let a single oversized response flush the whole cache
+        if entry.size > self.max_bytes:
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.current_bytes += entry.size
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self.current_bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return entry
+
+    def attach_encoding(self, key, encoding, body, entry=None):
+        """Store a compressed copy of a cached body, charged to the byte budget like the body itself.
+
+        With `entry`, the copy is only attached if `key` still maps to that
+        entry, so a body compressed from a replaced response is dropped.
+        """
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None or (entry is not None and current is not entry) or encoding in current.encoded:
+                return False
+            if current.size + len(body) > self.max_bytes:
+                return False
+            # Copy on write: responses already holding the old dict keep a consistent view
+            current.encoded = {**current.encoded, encoding: body}
+            current.size += len(body)
+            self.current_bytes += len(body)
+            self._entries.move_to_end(key)
+            while self.current_bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, *tags):
+        """Drop every entry built from any of the given collections"""
+        with self._lock:
+            dropped = 0
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    if key in self._entries:
+                        self._remove(key)
+                        dropped += 1
+            self.invalidations += dropped
+            return dropped
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return entry
@@ -0,0 +1,295 @@
+import html
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+TAG_RE = re.compile(r'<[^>]+>')
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or that the
+this to was were will with you your we our they their not no so if than then
+""".split())
+
+# (suffix, replacement, minimum stem length) applied longest first
+SUFFIXES = [
+    ('ational', 'ate', 2), ('tional', 'tion', 2), ('ization', 'ize', 2),
+    ('iveness', 'ive', 2), ('fulness', 'ful', 2), ('ousness', 'ous', 2),
+    ('alism', 'al', 2), ('ation', 'ate', 2), ('ement', '', 3), ('ment', '', 3),
+    ('ness', '', 3), ('ance', '', 3), ('ence', '', 3), ('able', '', 3), ('ible', '', 3),
+    ('ical', 'ic', 2), ('ful', '', 3), ('ous', '', 3), ('ive', '', 3), ('ize', '', 3),
+    ('ly', '', 3)
+]
+
+
+# Endings stem() may strip; a partial word ending in the start of one may already reach its stem
+STRIPPED_ENDINGS = ('s', 'es', 'ies', 'sses', 'ed', 'eed', 'ing') + tuple(suffix for suffix, _, _ in SUFFIXES)
+
+
+def _has_vowel(word):
+    return any(ch in 'aeiouy' for ch in word)
+
+
+def stem(word):
+    """Light suffix-stripping stemmer (Porter step 1 plus common derivational suffixes)"""
+    if len(word) <= 3 or not word.isalpha():
+        return word
+
+    # Plurals
+    if word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith('ies'):
+        word = word[:-3] + 'y'
+    elif word.endswith('s') and not word.endswith('ss') and not word.endswith('us'):
+        word = word[:-1]
+
+    # Past tense and gerunds
+    for suffix in ('eed', 'ing', 'ed'):
+        if word.endswith(suffix):
+            base = word[:-len(suffix)]
+            if suffix == 'eed':
+                word = base + 'ee'
+            elif _has_vowel(base) and len(base) >= 2:
+                if base.endswith(('at', 'bl', 'iz')):
+                    base += 'e'
+                elif len(base) > 2 and base[-1] == base[-2] and base[-1] not in 'lsz':
+                    base = base[:-1]
+                word = base
+            break
+
+    # Two passes so that e.g. optimization -> optimize -> optim
+    for _ in range(2):
+        for suffix, replacement, min_stem in SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+                word = word[:-len(suffix)] + replacement
+                break
+        else:
+            break
+
+    if word.endswith('y') and len(word) > 3 and _has_vowel(word[:-1]):
+        word = word[:-1] + 'i'
+    elif word.endswith('e') and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Lower-cased, stemmed terms with stopwords removed"""
+    return [stem(token) for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def strip_markup(text):
+    return TAG_RE.sub(' ', text or '')
+
+
+class SearchIndex:
+    """In-memory inverted index over blog posts ranked with BM25.
+
+    Titles count TITLE_WEIGHT times towards both term frequency and document
+    length (a simple BM25F). The last query term also matches as a prefix so
+    results update sensibly while the user is still typing.
+    """
+
+    TITLE_WEIGHT = 3
+
+    def __init__(self, k1=1.2, b=0.75, max_age=None):
+        self.k1 = k1
+        self.b = b
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._postings = {}
+        self._doc_lengths = {}
+        self._docs = {}
+        self._total_length = 0
+        self._vocabulary = None
+        self.built_at = None
+        self.version = None
+
+    # ----- maintenance -----
+    def is_stale(self, version=None):
+        """True before the first build, once older than max_age, or when built from another data version"""
+        if self.built_at is None:
+            return True
+        if version is not None and version != self.version:
+            return True
+        return bool(self.max_age) and time.time() - self.built_at > self.max_age
+
+    def rebuild(self, posts, version=None):
+        """Index `posts` from scratch; `version` is the data version they were read at"""
+        with self._lock:
+            self._postings = {}
+            self._doc_lengths = {}
+            self._docs = {}
+            self._total_length = 0
+            self._vocabulary = None
+            for post in posts:
+                self._add(post)
+            self.built_at = time.time()
+            self.version = version
+            return len(self._docs)
+
+    def add(self, post):
+        """Index a post, replacing any previous version of it"""
+        with self._lock:
+            self._remove(str(post['_id']))
+            self._add(post)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(str(doc_id))
+
+    def _add(self, post):
+        doc_id = str(post['_id'])
+        title = post.get('title') or ''
+        content = strip_markup(post.get('content'))
+        frequencies = Counter()
+        for term in tokenize(title):
+            frequencies[term] += self.TITLE_WEIGHT
+        for term in tokenize(content):
+            frequencies[term] += 1
+        length = sum(frequencies.values())
+
+        for term, tf in frequencies.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+        self._docs[doc_id] = {
+            'title': title,
+            'content': content,
+            'terms': tuple(frequencies),
+            'categories': tuple(post.get('categories') or ()),
+            'featured': bool(post.get('featured'))
+        }
+        self._vocabulary = None
+
+    def _remove(self, doc_id):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for term in doc['terms']:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id, 0)
+        self._vocabulary = None
+
+    # ----- querying -----
+    def _expand_prefix(self, prefix, limit=50):
+        if len(prefix) < 2:
+            return []
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        terms = []
+        i = bisect_left(self._vocabulary, prefix)
+        while (i < len(self._vocabulary) and len(terms) < limit
+               and self._vocabulary[i].startswith(prefix)):
+            terms.append(self._vocabulary[i])
+            i += 1
+        return terms
+
+    def _partial_stems(self, partial):
+        """Indexed stems the partial word may be heading for: 'cachi' can still become 'caching' -> 'cach'"""
+        terms = []
+        for cut in range(3, len(partial)):
+            rest = partial[cut:]
+            if any(ending.startswith(rest) for ending in STRIPPED_ENDINGS):
+                term = stem(partial[:cut])
+                if term in self._postings:
+                    terms.append(term)
+        return terms
+
+    def query_terms(self, query):
+        """Stemmed query terms, with the trailing partial word expanded by prefix.
+
+        The vocabulary holds stems, so the partial word is expanded both as
+        typed and stemmed ('deploy' -> 'deploi'), plus any stem it has typed
+        past ('cachi' -> 'cach').
+        """
+        raw = [token for token in TOKEN_RE.findall(query.lower()) if token not in STOPWORDS]
+        if not raw:
+            return []
+        terms = [stem(token) for token in raw]
+        if not query[-1:].isspace():
+            partial = raw[-1]
+            with self._lock:
+                for prefix in dict.fromkeys((partial, stem(partial))):
+                    terms.extend(self._expand_prefix(prefix))
+                terms.extend(self._partial_stems(partial))
+        return list(dict.fromkeys(terms))
+
+    def search(self, query, category=None, featured=None):
+        """All matching post ids with scores, best first"""
+        terms = self.query_terms(query)
+        with self._lock:
+            n_docs = len(self._docs)
+            if not terms or not n_docs:
+                return []
+            avg_length = self._total_length / n_docs
+            scores = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            results = []
+            for doc_id, score in scores.items():
+                doc = self._docs[doc_id]
+                if category and category not in doc['categories']:
+                    continue
+                if featured is not None and doc['featured'] != featured:
+                    continue
+                results.append((doc_id, score))
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results
+
+    def snippet(self, doc_id, query, width=30):
+        """Escaped excerpt of about `width` words around the densest run of matches, matches in <mark>"""
+        terms = set(self.query_terms(query))
+        with self._lock:
+            doc = self._docs.get(str(doc_id))
+            if doc is None:
+                return ''
+            words = doc['content'].split()
+        if not words:
+            return ''
+
+        hits = [i for i, word in enumerate(words)
+                if any(stem(token) in terms for token in TOKEN_RE.findall(word.lower()))]
+        start = 0
+        if hits:
+            best = 0
+            for i, position in enumerate(hits):
+                count = bisect_left(hits, position + width) - i
+                if count > best:
+                    best, start = count, max(0, position - width // 4)
+        window = words[start:start + width]
+        hit_set = set(hits)
+
+        rendered = []
+        for offset, word in enumerate(window):
+            escaped = html.escape(word)
+            rendered.append(f'<mark>{escaped}</mark>' if start + offset in hit_set else escaped)
+        text = ' '.join(rendered)
+        if start > 0:
+            text = '… ' + text
+        if start + width < len(words):
+            text += ' …'
+        return text
+
+    def stats(self):
+        with self._lock:
+            return {
+                'documents': len(self._docs),
+                'terms': len(self._postings),
+                'built_at': self.built_at
+            }
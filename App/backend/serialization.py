@@ -0,0 +1,81 @@
+import base64
+import datetime
+import decimal
+import json
+import uuid
+
+from bson import Binary, Decimal128, ObjectId
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # Falls back to the stdlib encoder with the same conversions
+    orjson = None
+
+
+def _default(obj):
+    """Conversions for the BSON types neither encoder knows about"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        return str(obj.to_decimal())
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, (bytes, Binary)):
+        return base64.b64encode(bytes(obj)).decode('ascii')
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _default_stdlib(obj):
+    if isinstance(obj, datetime.datetime):
+        # MongoDB hands back naive datetimes that are UTC
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=datetime.timezone.utc)
+        return obj.astimezone(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+    if isinstance(obj, datetime.date):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    return _default(obj)
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        """Encode to UTF-8 JSON bytes: ObjectId as its hex string, datetimes as ISO 8601 UTC"""
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+    loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(default=_default_stdlib, ensure_ascii=False, separators=(',', ':'))
+
+    def dumps(obj):
+        """Encode to UTF-8 JSON bytes: ObjectId as its hex string, datetimes as ISO 8601 UTC"""
+        return _encoder.encode(obj).encode('utf-8')
+
+    def loads(s):
+        return json.loads(s)
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by dumps/loads above, so jsonify handles BSON documents directly"""
+
+    mimetype = 'application/json'
+    # Optional callable told the size of every response body encoded here
+    observer = None
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = dumps(obj)
+        if self.observer is not None:
+            self.observer(len(body))
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from bson import json_util
+from flask import has_request_context, request
+from pymongo import monitoring
+from pymongo.errors import CollectionInvalid
+
+from indexes import _plan_stages
+
+
+# Commands worth recording; getMore and the like belong to a command already seen
+RECORDED = ('find', 'aggregate', 'count', 'distinct', 'findAndModify', 'update', 'delete')
+# Read commands explain() can run without side effects
+EXPLAINABLE = ('find', 'aggregate', 'count', 'distinct')
+# Driver/session fields explain() rejects or that only add noise to a stored command
+DRIVER_FIELDS = ('lsid', 'txnNumber', '$db', '$clusterTime', '$readPreference', 'readConcern', 'writeConcern')
+# Stored command text is trimmed to its shape above this size
+MAX_COMMAND_CHARS = 16 * 1024
+
+
+def _shape(value):
+    """Query with every literal replaced by a placeholder, keeping field names and operators"""
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # {'$in': [...]} or {'$and': [...]}: one entry stands for all of them
+        return [_shape(value[0])] if value else []
+    return '?'
+
+
+def _sort_shape(sort):
+    # Sort directions (and $meta) are part of the plan, so they stay
+    return dict(sort) if isinstance(sort, dict) else {}
+
+
+def query_shape(command_name, command):
+    """Literal-free description of a command: what it filters and sorts on, not the values"""
+    if command_name == 'find':
+        return {'filter': _shape(command.get('filter', {})), 'sort': _sort_shape(command.get('sort'))}
+    if command_name == 'aggregate':
+        stages = []
+        for stage in command.get('pipeline', []):
+            name = next(iter(stage), '?')
+            if name == '$match':
+                stages.append({name: _shape(stage[name])})
+            elif name == '$sort':
+                stages.append({name: _sort_shape(stage[name])})
+            else:
+                stages.append(name)
+        return {'pipeline': stages}
+    if command_name == 'count':
+        return {'query': _shape(command.get('query', {}))}
+    if command_name == 'distinct':
+        return {'key': command.get('key'), 'query': _shape(command.get('query', {}))}
+    if command_name == 'findAndModify':
+        return {'query': _shape(command.get('query', {})), 'sort': _sort_shape(command.get('sort'))}
+    if command_name in ('update', 'delete'):
+        statements = command.get('updates' if command_name == 'update' else 'deletes') or [{}]
+        return {'q': _shape(statements[0].get('q', {})), 'statements': len(statements)}
+    return {}
+
+
+def explain_summary(result):
+    """The parts of an explain('executionStats') result worth keeping per sample"""
+    planner = result.get('queryPlanner') or {}
+    if not planner and result.get('stages'):
+        # Aggregations nest the find-layer plan under their first $cursor stage
+        planner = (result['stages'][0].get('$cursor') or {}).get('queryPlanner', {})
+        stats = (result['stages'][0].get('$cursor') or {}).get('executionStats', {})
+    else:
+        stats = result.get('executionStats') or {}
+    stages = _plan_stages(planner.get('winningPlan', {}))
+    return {
+        'stages': stages,
+        'collscan': 'COLLSCAN' in stages,
+        'in_memory_sort': 'SORT' in stages,
+        'returned': stats.get('nReturned'),
+        'keys_examined': stats.get('totalKeysExamined'),
+        'docs_examined': stats.get('totalDocsExamined'),
+        'execution_ms': stats.get('executionTimeMillis'),
+        # As text: plan filters hold $-operator field names, which older servers refuse to store
+        'winning_plan': json_util.dumps(planner.get('winningPlan', {}))
+    }
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    """Records MongoDB commands slower than a threshold into a capped collection.
+
+    The listener only copies the command and the originating route; explaining
+    and storing happen on a background thread so the request that ran the slow
+    command is not slowed down further. Each query shape is explained at most
+    once per `explain_interval` seconds. Nothing is recorded until `bind` is
+    called with the database to write to.
+    """
+
+    def __init__(self, threshold_ms=100, explain_interval=300, max_pending=200):
+        self.threshold_ms = threshold_ms
+        self.explain_interval = explain_interval
+        self.collection = None
+        self._lock = threading.Lock()
+        self._started = {}
+        self._explained = {}
+        self._local = threading.local()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._worker = None
+        self.recorded = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def bind(self, db, name='slow_queries', size=16 * 1024 * 1024):
+        """Start recording into db[name], creating it as a capped collection when missing"""
+        self._local.internal = True
+        try:
+            if name not in db.list_collection_names():
+                try:
+                    db.create_collection(name, capped=True, size=size)
+                except CollectionInvalid:
+                    pass  # Another worker created it first
+            self.collection = db[name]
+        finally:
+            self._local.internal = False
+        self._worker = threading.Thread(target=self._run, name='slow-queries', daemon=True)
+        self._worker.start()
+
+    def _ignored(self, event):
+        return (self.collection is None
+                or self.threshold_ms < 0
+                or event.command_name not in RECORDED
+                or getattr(self._local, 'internal', False))
+
+    def started(self, event):
+        if self._ignored(event):
+            return
+        target = event.command.get(event.command_name)
+        if target == self.collection.name:
+            return
+        if has_request_context():
+            route = f'{request.method} {request.url_rule.rule if request.url_rule else request.path}'
+        else:
+            route = 'background'
+        command = {key: value for key, value in event.command.items() if key not in DRIVER_FIELDS}
+        with self._lock:
+            self._started[(event.connection_id, event.request_id)] = (command, route)
+
+    def succeeded(self, event):
+        with self._lock:
+            started = self._started.pop((event.connection_id, event.request_id), None)
+        if started is None or event.duration_micros < self.threshold_ms * 1000:
+            return
+        command, route = started
+        try:
+            self._queue.put_nowait((event.database_name, event.command_name, command, route,
+                                    event.duration_micros / 1000, datetime.now(timezone.utc)))
+        except queue.Full:
+            self.dropped += 1
+
+    def failed(self, event):
+        with self._lock:
+            self._started.pop((event.connection_id, event.request_id), None)
+
+    def _run(self):
+        self._local.internal = True
+        while True:
+            item = self._queue.get()
+            try:
+                self._record(*item)
+            except Exception as e:
+                self.errors += 1
+                print(f"Slow query log failed: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _record(self, database, command_name, command, route, duration_ms, at):
+        collection = command.get(command_name)
+        shape = query_shape(command_name, command)
+        shape_text = f'{collection}.{command_name} ' + json.dumps(shape, default=str)
+        shape_id = hashlib.sha1(shape_text.encode('utf-8')).hexdigest()[:16]
+
+        explain = None
+        now = time.monotonic()
+        if command_name in EXPLAINABLE and now - self._explained.get(shape_id, -self.explain_interval) >= self.explain_interval:
+            self._explained[shape_id] = now
+            try:
+                database_handle = self.collection.database.client[database]
+                explain = explain_summary(database_handle.command({'explain': command, 'verbosity': 'executionStats'}))
+            except Exception as e:
+                # A sample without a plan is still worth keeping
+                explain = {'error': str(e)}
+
+        command_text = json_util.dumps(command)
+        if len(command_text) > MAX_COMMAND_CHARS:
+            command_text = json.dumps({command_name: collection, 'truncated': True, **shape}, default=str)
+        self.collection.insert_one({
+            'ts': at,
+            'shape_id': shape_id,
+            'shape': shape_text,
+            'collection': collection,
+            'command_name': command_name,
+            'route': route,
+            'duration_ms': round(duration_ms, 3),
+            'command': command_text,
+            'explain': explain
+        })
+        self.recorded += 1
+
+    def stats(self):
+        return {
+            'threshold_ms': self.threshold_ms,
+            'explain_interval': self.explain_interval,
+            'recorded': self.recorded,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'pending': self._queue.qsize()
+        }
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# The backend modules are imported by their plain names, as app.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def appmod(tmp_path_factory):
+    """app.py imported against an in-memory mongomock database, from a scratch working directory"""
+    mongomock = pytest.importorskip('mongomock')
+    patch = pytest.MonkeyPatch()
+    patch.setattr('pymongo.MongoClient', mongomock.MongoClient)
+    patch.setenv('MONGO_DB', 'vibecanvas_test')
+    patch.setenv('BCRYPT_ROUNDS', '4')
+    patch.setenv('SLOW_QUERY_MS', '-1')
+    # uploads/ and upload-staging/ are created relative to the working directory
+    patch.chdir(tmp_path_factory.mktemp('backend'))
+    import app
+    yield app
+    patch.undo()
+
+
+@pytest.fixture
+def client(appmod):
+    appmod.response_cache.clear()
+    return appmod.app.test_client()
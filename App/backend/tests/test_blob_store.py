@@ -0,0 +1,101 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from blob_store import BlobStore
+
+mongomock = pytest.importorskip('mongomock')
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(str(tmp_path / 'uploads'), mongomock.MongoClient().db.blobs, tmp_dir=str(tmp_path / 'staging'))
+
+
+def refs(store, name):
+    doc = store.refs.find_one({'_id': name})
+    return doc['refs'] if doc else 0
+
+
+def test_put_names_blobs_by_content(store):
+    data = b'hello world'
+    name, created = store.put(io.BytesIO(data), '.TXT')
+    digest = hashlib.sha256(data).hexdigest()
+    assert name == f'{digest[:2]}/{digest[2:4]}/{digest}.txt'
+    assert created
+    assert store.is_blob(name)
+    with open(store.path(name), 'rb') as f:
+        assert f.read() == data
+
+
+def test_identical_content_is_stored_once_and_counted(store, tmp_path):
+    source = tmp_path / 'logo.png'
+    source.write_bytes(b'png bytes')
+    first, created_first = store.put(str(source), 'png')
+    second, created_second = store.put(io.BytesIO(b'png bytes'), 'png')
+    assert first == second
+    assert (created_first, created_second) == (True, False)
+    assert refs(store, first) == 2
+    assert store.stats() == {'blobs': 1, 'references': 2, 'bytes': len(b'png bytes')}
+    # The source path is copied, never moved
+    assert source.exists()
+
+
+def test_last_release_deletes_the_blob_and_its_variants(store):
+    name, _ = store.put(io.BytesIO(b'image'), 'jpg')
+    store.put(io.BytesIO(b'image'), 'jpg')
+    directory, filename = os.path.split(store.path(name))
+    digest = filename.split('.')[0]
+    for sibling in (f'{digest}.w320.webp', f'{digest}.variants.json'):
+        open(os.path.join(directory, sibling), 'w').close()
+    unrelated = os.path.join(directory, 'other.jpg')
+    open(unrelated, 'w').close()
+
+    assert store.release(name) is False
+    assert os.path.exists(store.path(name))
+    assert store.release(name) is True
+    assert os.listdir(directory) == ['other.jpg']
+    assert store.refs.find_one({'_id': name}) is None
+
+
+def test_release_never_goes_below_zero(store):
+    name, _ = store.put(io.BytesIO(b'x'), 'txt')
+    assert store.release(name) is True
+    assert store.release(name) is False
+    assert refs(store, name) == 0
+
+
+def test_release_ignores_names_that_are_not_blobs(store):
+    assert store.release('logo.png') is False
+    assert store.release('../../etc/passwd') is False
+
+
+def test_partial_writes_stay_in_the_staging_directory(store, tmp_path):
+    store.put(io.BytesIO(b'abc'), 'txt')
+    assert os.listdir(tmp_path / 'staging') == []
+    assert not any(entry.startswith('.') for entry in os.listdir(store.root))
+
+
+def test_put_rewrites_a_blob_whose_last_reference_was_just_released(store):
+    name, _ = store.put(io.BytesIO(b'logo'), 'png')
+    # Another worker's release has deleted the document but not the files yet
+    store.refs.delete_one({'_id': name})
+    again, created = store.put(io.BytesIO(b'logo'), 'png')
+    assert (again, created) == (name, True)
+    assert refs(store, name) == 1
+
+
+def test_release_keeps_files_when_another_worker_stored_the_blob_again(store, monkeypatch):
+    name, _ = store.put(io.BytesIO(b'logo'), 'png')
+    delete_one = store.refs.delete_one
+
+    def delete_then_put_elsewhere(*args, **kwargs):
+        result = delete_one(*args, **kwargs)
+        store.refs.insert_one({'_id': name, 'refs': 1})
+        return result
+
+    monkeypatch.setattr(store.refs, 'delete_one', delete_then_put_elsewhere)
+    assert store.release(name) is False
+    assert os.path.exists(store.path(name))
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from certificate_index import CertificateIndex, bson_sort_key
+
+
+def cert(n, **fields):
+    doc = {'_id': f'c{n}', 'name': f'Cert {n}', 'issuer': 'Acme', 'category': 'Cloud', 'status': 'Active'}
+    doc.update(fields)
+    return doc
+
+
+def names(certificates):
+    return [c['_id'] for c in certificates]
+
+
+def test_bson_sort_key_orders_types_like_mongodb():
+    when = datetime(2024, 1, 1)
+    values = [when, True, ObjectId('0' * 24), ['a'], {'a': 1}, 'b', 'a', 2.5, 1, None]
+    assert sorted(values, key=bson_sort_key) == [None, 1, 2.5, 'a', 'b', {'a': 1}, ['a'], ObjectId('0' * 24),
+                                                 True, when]
+
+
+def test_bson_sort_key_compares_aware_and_naive_dates_in_utc():
+    naive = datetime(2024, 1, 1, 12)
+    aware = datetime(2024, 1, 1, 13, tzinfo=timezone(timedelta(hours=2)))  # 11:00 UTC
+    assert sorted([naive, aware], key=bson_sort_key) == [aware, naive]
+
+
+def test_sort_by_mixed_type_field_matches_mongodb_order():
+    index = CertificateIndex()
+    index.rebuild([
+        cert(1, expiryDate=datetime(2025, 1, 1)),
+        cert(2, expiryDate=None),
+        cert(3, expiryDate='2024-06-01'),
+        cert(4),
+        cert(5, expiryDate=datetime(2023, 1, 1))
+    ])
+    ascending, _ = index.query(sort_by='expiryDate', descending=False)
+    assert names(ascending) == ['c2', 'c4', 'c3', 'c5', 'c1']
+    descending, _ = index.query(sort_by='expiryDate', descending=True)
+    assert names(descending) == ['c1', 'c5', 'c3', 'c4', 'c2']
+
+
+def test_sorting_a_small_and_a_large_selection_agree():
+    index = CertificateIndex()
+    index.rebuild([cert(n, priority='High' if n < 2 else 'Low', issueDate=datetime(2024, 1, 1) - timedelta(days=n))
+                   for n in range(20)])
+    few, _ = index.query({'priority': 'High'}, sort_by='issueDate', descending=False)
+    many, _ = index.query(sort_by='issueDate', descending=False)
+    assert names(few) == ['c1', 'c0']
+    assert names(many) == [f'c{n}' for n in reversed(range(20))]
+
+
+def test_substring_search_is_case_insensitive_and_covers_skills():
+    index = CertificateIndex()
+    index.rebuild([
+        cert(1, name='AWS Solutions Architect'),
+        cert(2, description='Kubernetes administration'),
+        cert(3, skills=['Terraform', 'Go'])
+    ])
+    assert names(index.query(search='ARCHITECT')[0]) == ['c1']
+    assert names(index.query(search='bernet')[0]) == ['c2']
+    assert names(index.query(search='terra')[0]) == ['c3']
+    assert names(index.query(search='go')[0]) == ['c3']
+    assert index.query(search='architect acme')[0] == []
+
+
+def test_facet_counts_ignore_their_own_filter():
+    index = CertificateIndex()
+    index.rebuild([
+        cert(1, category='Cloud', status='Active'),
+        cert(2, category='Cloud', status='Expired'),
+        cert(3, category='Security', status='Active')
+    ])
+    certificates, facets = index.query({'category': 'Cloud'}, with_facets=True)
+    assert sorted(names(certificates)) == ['c1', 'c2']
+    assert facets['category'] == {'Cloud': 2, 'Security': 1}
+    assert facets['status'] == {'Active': 1, 'Expired': 1}
+
+
+def test_add_replaces_and_remove_tombstones():
+    index = CertificateIndex()
+    index.rebuild([cert(1), cert(2)])
+    index.add(cert(1, name='Renamed', category='Security'))
+    assert names(index.query(search='renamed')[0]) == ['c1']
+    assert names(index.query({'category': 'Cloud'})[0]) == ['c2']
+    index.remove('c2')
+    assert names(index.query()[0]) == ['c1']
+    assert index.stats()['certificates'] == 1
+
+
+@pytest.mark.parametrize('built_from, seen, stale', [(1, 1, False), (1, 2, True), (1, None, False)])
+def test_staleness_follows_the_data_version(built_from, seen, stale):
+    index = CertificateIndex()
+    index.rebuild([cert(1)], version=built_from)
+    assert index.is_stale(seen) is stale
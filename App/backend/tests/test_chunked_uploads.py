@@ -0,0 +1,134 @@
+import hashlib
+import io
+import os
+import threading
+
+import pytest
+
+from chunked_uploads import ChunkedUploadStore, UploadError
+
+DATA = bytes(range(256)) * 40  # 10 KiB
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ChunkedUploadStore(str(tmp_path / 'incoming'), max_file_bytes=len(DATA), max_chunk_bytes=4096)
+
+
+def send(store, session, start, end, **kwargs):
+    return store.write_chunk(session['id'], start, io.BytesIO(DATA[start:end]), **kwargs)
+
+
+def upload_error(fn, *args, **kwargs):
+    with pytest.raises(UploadError) as info:
+        fn(*args, **kwargs)
+    return info.value
+
+
+def test_chunks_in_order_assemble_the_file(store, tmp_path):
+    session = store.create('a.bin', len(DATA), checksum=hashlib.sha256(DATA).hexdigest())
+    for start in range(0, len(DATA), 4096):
+        session = send(store, session, start, start + 4096)
+    destination = str(tmp_path / 'out' / 'a.bin')
+    done = store.finalize(session['id'], destination)
+    assert done['sha256'] == hashlib.sha256(DATA).hexdigest()
+    with open(destination, 'rb') as f:
+        assert f.read() == DATA
+    assert os.listdir(store.root) == []
+
+
+def test_out_of_order_chunk_is_rejected_with_the_committed_offset(store):
+    session = store.create('a.bin', len(DATA))
+    send(store, session, 0, 1000)
+    error = upload_error(send, store, session, 2000, 3000)
+    assert error.status == 409
+    assert error.extra == {'offset': 1000}
+    assert store.get(session['id'])['offset'] == 1000
+
+
+def test_duplicate_chunk_is_rejected_and_leaves_the_file_intact(store, tmp_path):
+    session = store.create('a.bin', len(DATA))
+    send(store, session, 0, 4096)
+    error = upload_error(send, store, session, 0, 4096)
+    assert (error.status, error.extra) == (409, {'offset': 4096})
+    send(store, session, 4096, 8192)
+    send(store, session, 8192, len(DATA))
+    destination = str(tmp_path / 'a.bin')
+    store.finalize(session['id'], destination)
+    with open(destination, 'rb') as f:
+        assert f.read() == DATA
+
+
+@pytest.mark.parametrize('size, status', [(0, 400), (len(DATA) + 1, 413)])
+def test_declared_size_limits(store, size, status):
+    assert upload_error(store.create, 'a.bin', size).status == status
+
+
+def test_oversized_chunk_is_rejected_and_truncated(store):
+    session = store.create('a.bin', len(DATA))
+    assert upload_error(send, store, session, 0, 5000).status == 413
+    part_path = os.path.join(store.root, session['id'] + '.part')
+    assert os.path.getsize(part_path) == 0
+    assert send(store, session, 0, 4096)['offset'] == 4096
+
+
+def test_chunk_past_the_declared_size_is_rejected(store):
+    session = store.create('a.bin', 100)
+    error = upload_error(store.write_chunk, session['id'], 0, io.BytesIO(DATA[:101]))
+    assert error.status == 413
+    assert store.get(session['id'])['offset'] == 0
+
+
+def test_chunk_checksum_mismatch_keeps_the_previous_offset(store):
+    session = store.create('a.bin', len(DATA))
+    error = upload_error(send, store, session, 0, 1000, chunk_checksum='0' * 64)
+    assert (error.status, error.extra) == (422, {'offset': 0})
+    good = hashlib.sha256(DATA[:1000]).hexdigest()
+    assert send(store, session, 0, 1000, chunk_checksum=good)['offset'] == 1000
+
+
+def test_finalize_checks_completeness_and_checksum(store, tmp_path):
+    session = store.create('a.bin', 2000, checksum='f' * 64)
+    send(store, session, 0, 1000)
+    destination = str(tmp_path / 'a.bin')
+    assert upload_error(store.finalize, session['id'], destination).status == 409
+    send(store, session, 1000, 2000)
+    assert upload_error(store.finalize, session['id'], destination).status == 422
+    assert not os.path.exists(destination)
+
+
+def test_another_process_can_resume_a_session(store, tmp_path):
+    session = store.create('a.bin', len(DATA), checksum=hashlib.sha256(DATA).hexdigest())
+    send(store, session, 0, 4096)
+    # A second store has no running hash and rebuilds it from the part file
+    other = ChunkedUploadStore(store.root, max_file_bytes=len(DATA), max_chunk_bytes=8192)
+    send(other, session, 4096, len(DATA))
+    assert other.finalize(session['id'], str(tmp_path / 'a.bin'))['sha256'] == hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.mark.parametrize('upload_id', ['', '../etc/passwd', 'ABC', 'f' * 32])
+def test_unknown_or_malformed_ids_are_not_found(store, upload_id):
+    assert upload_error(store.get, upload_id).status == 404
+
+
+def test_expired_sessions_are_purged(store):
+    session = store.create('a.bin', 10)
+    store.ttl = -1
+    store.purge_expired()
+    assert upload_error(store.get, session['id']).status == 404
+    assert os.listdir(store.root) == []
+
+
+def test_chunks_wait_for_a_session_locked_by_another_process(store):
+    fcntl = pytest.importorskip('fcntl')
+    session = store.create('a.bin', len(DATA))
+    done = threading.Event()
+    # A separate open file stands in for another worker holding the session
+    with open(os.path.join(store.root, session['id'] + '.part'), 'rb') as other:
+        fcntl.flock(other, fcntl.LOCK_EX)
+        writer = threading.Thread(target=lambda: (send(store, session, 0, 4096), done.set()))
+        writer.start()
+        assert not done.wait(0.2)
+    writer.join(5)
+    assert done.is_set()
+    assert store.get(session['id'])['offset'] == 4096
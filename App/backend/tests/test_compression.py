@@ -0,0 +1,102 @@
+import gzip
+
+import pytest
+from flask import Flask, Response, request
+from werkzeug.http import parse_accept_header
+
+from compression import ResponseCompressor
+
+
+@pytest.fixture
+def compressor():
+    compressor = ResponseCompressor(min_size=100)
+    # Negotiation only looks at names, so do not depend on which codecs are installed
+    compressor.encodings = ['gzip', 'br', 'zstd']
+    return compressor
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip', 'gzip'),
+    ('gzip, deflate, br', 'br'),
+    ('gzip, zstd', 'zstd'),
+    ('br;q=0.5, gzip', 'gzip'),
+    ('*', 'br'),
+    ('br;q=0, *;q=0.1', 'zstd'),
+    ('identity', None),
+    ('gzip;q=0', None),
+    ('', None)
+])
+def test_negotiate_honours_quality_then_server_preference(compressor, header, expected):
+    assert compressor.negotiate(parse_accept_header(header)) == expected
+
+
+def test_negotiate_skips_encodings_that_are_not_installed(compressor):
+    compressor.encodings = ['gzip']
+    assert compressor.negotiate(parse_accept_header('br, zstd, gzip;q=0.1')) == 'gzip'
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+def run(app, compressor, response, accept='gzip'):
+    with app.test_request_context('/', headers={'Accept-Encoding': accept}):
+        return compressor.after_request(response, request)
+
+
+def gzip_only():
+    compressor = ResponseCompressor(min_size=100)
+    compressor.encodings = ['gzip']
+    return compressor
+
+
+def test_large_json_is_compressed_with_a_weak_etag(app):
+    body = b'{"items": [' + b'"value", ' * 100 + b'"end"]}'
+    response = Response(body, mimetype='application/json')
+    response.set_etag('abc')
+    response = run(app, gzip_only(), response)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    assert response.get_etag() == ('abc', True)
+    assert gzip.decompress(response.get_data()) == body
+
+
+@pytest.mark.parametrize('response', [
+    Response(b'x' * 50, mimetype='application/json'),
+    Response(b'x' * 500, mimetype='image/png'),
+    Response(b'x' * 500, status=206, mimetype='text/plain')
+])
+def test_small_binary_and_partial_responses_are_left_alone(app, response):
+    assert 'Content-Encoding' not in run(app, gzip_only(), response).headers
+
+
+def test_clients_without_a_shared_encoding_get_identity_but_vary(app):
+    response = run(app, gzip_only(), Response(b'x' * 500, mimetype='text/plain'), accept='identity')
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.vary
+
+
+def test_cached_copies_are_reused_and_new_ones_handed_back(app):
+    compressor = gzip_only()
+    attached = []
+    response = Response(b'x' * 500, mimetype='text/plain')
+    response.encoded_variants = {}
+    response.attach_encoding = lambda encoding, body: attached.append((encoding, body))
+    run(app, compressor, response)
+    assert [encoding for encoding, _ in attached] == ['gzip']
+    # The compressor never writes into the cache entry's dict itself
+    assert response.encoded_variants == {}
+
+    cached = Response(b'x' * 500, mimetype='text/plain')
+    cached.encoded_variants = {'gzip': b'precompressed'}
+    assert run(app, compressor, cached).get_data() == b'precompressed'
+    assert compressor.stats()['reused'] == 1
+
+
+def test_streamed_responses_are_compressed_chunk_by_chunk(app):
+    response = Response(iter([b'a' * 300, b'b' * 300]), mimetype='text/plain')
+    response = run(app, gzip_only(), response)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert gzip.decompress(b''.join(response.response)) == b'a' * 300 + b'b' * 300
@@ -0,0 +1,64 @@
+import pytest
+
+from fieldsets import InvalidFields, parse_fields, parse_include, projection_for, select_fields
+
+
+@pytest.mark.parametrize('value', [None, '', '  '])
+def test_missing_fields_keep_the_default_shape(value):
+    assert parse_fields(value, 'projects') is None
+
+
+def test_fields_always_start_with_id_and_drop_blanks_and_duplicates():
+    assert parse_fields(' title, ,link,title,_id ', 'projects') == ['_id', 'title', 'link']
+
+
+def test_unknown_fields_are_all_reported():
+    with pytest.raises(InvalidFields) as info:
+        parse_fields('title,password,created_by', 'projects')
+    assert str(info.value) == 'Unknown field(s) for projects: password, created_by'
+
+
+def test_fields_are_checked_per_collection():
+    assert parse_fields('slug', 'blog') == ['_id', 'slug']
+    with pytest.raises(InvalidFields):
+        parse_fields('slug', 'projects')
+
+
+def test_include_defaults_to_every_section_and_keeps_request_order():
+    available = ['skills', 'projects', 'blog']
+    assert parse_include(None, available) == available
+    assert parse_include('blog, skills,blog', available) == ['blog', 'skills']
+    with pytest.raises(InvalidFields):
+        parse_include('skills,users', available)
+
+
+def test_projection_covers_computed_fields_and_extras():
+    fields = parse_fields('imageSrcset,daysUntilExpiry', 'certificates')
+    assert projection_for('certificates', fields, extra=('issueDate',)) == {
+        '_id': 1, 'imageUrl': 1, 'image_url': 1, 'image': 1, 'expiryDate': 1, 'issueDate': 1
+    }
+    assert projection_for('certificates', None, default={'name': 1}) == {'name': 1}
+
+
+def test_response_only_fields_add_nothing_to_the_projection():
+    assert projection_for('blog', parse_fields('score,highlight', 'blog')) == {'_id': 1}
+
+
+def test_select_fields_trims_in_requested_order():
+    doc = {'_id': 1, 'title': 't', 'link': 'l', 'status': 's'}
+    assert list(select_fields(doc, ['_id', 'status', 'title', 'missing'])) == ['_id', 'status', 'title']
+    assert select_fields(doc, None) is doc
+
+
+def test_certificate_list_fills_in_derived_expiry_fields(appmod, client):
+    from datetime import datetime, timedelta
+
+    appmod.collections['certificates'].insert_one({
+        'name': 'CKA',
+        'issuer': 'CNCF',
+        'expiryDate': datetime.now() + timedelta(days=10, hours=1),
+    })
+    response = client.get('/api/public/certificates?fields=name,isExpiringSoon,daysUntilExpiry')
+    assert response.status_code == 200
+    cert = next(cert for cert in response.get_json() if cert['name'] == 'CKA')
+    assert cert == {'_id': cert['_id'], 'name': 'CKA', 'isExpiringSoon': True, 'daysUntilExpiry': 10}
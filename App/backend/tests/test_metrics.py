@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+from metrics import CommandMetrics, Registry
+
+
+def test_counter_exposition():
+    registry = Registry()
+    requests = registry.counter('http_requests_total', 'HTTP requests', ('method', 'status'))
+    requests.inc(method='GET', status=200)
+    requests.inc(2, method='GET', status=200)
+    requests.inc(method='POST', status=201)
+    assert registry.render() == (
+        '# HELP http_requests_total HTTP requests\n'
+        '# TYPE http_requests_total counter\n'
+        'http_requests_total{method="GET",status="200"} 3\n'
+        'http_requests_total{method="POST",status="201"} 1\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    registry = Registry()
+    latency = registry.histogram('latency_seconds', 'Latency', ('endpoint',), buckets=(0.5, 0.1))
+    for value in (0.05, 0.1, 0.3, 2.0):
+        latency.observe(value, endpoint='home')
+    assert registry.render().splitlines() == [
+        '# HELP latency_seconds Latency',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{endpoint="home",le="0.1"} 2',
+        'latency_seconds_bucket{endpoint="home",le="0.5"} 3',
+        'latency_seconds_bucket{endpoint="home",le="+Inf"} 4',
+        'latency_seconds_sum{endpoint="home"} 2.45',
+        'latency_seconds_count{endpoint="home"} 4'
+    ]
+
+
+def test_unlabelled_series_and_label_escaping():
+    registry = Registry()
+    registry.counter('jobs_total', 'Jobs').inc()
+    registry.counter('errors_total', 'Errors', ('message',)).inc(message='bad "quote"\\ and\nnewline')
+    lines = registry.render().splitlines()
+    assert 'jobs_total 1' in lines
+    assert 'errors_total{message="bad \\"quote\\"\\\\ and\\nnewline"} 1' in lines
+
+
+def test_collector_reads_values_at_scrape_time():
+    registry = Registry()
+    sizes = {'blog': 3}
+    registry.collector('collection_documents', 'Documents', 'gauge', ('collection',),
+                       lambda: [({'collection': name}, count) for name, count in sizes.items()])
+    assert 'collection_documents{collection="blog"} 3' in registry.render()
+    sizes['blog'] = 4
+    assert 'collection_documents{collection="blog"} 4' in registry.render()
+
+
+def test_failing_collector_does_not_break_the_scrape():
+    registry = Registry()
+    registry.collector('broken', 'Broken', callback=lambda: 1 / 0)
+    registry.counter('ok_total', 'Ok').inc()
+    text = registry.render()
+    assert '# broken unavailable: division by zero' in text
+    assert 'ok_total 1' in text
+    assert text.endswith('\n')
+
+
+def test_mongodb_commands_are_timed_by_collection():
+    registry = Registry()
+    listener = CommandMetrics(registry)
+
+    def event(request_id, name, command, duration=0):
+        return SimpleNamespace(connection_id=('localhost', 27017), request_id=request_id,
+                               command_name=name, command=command, duration_micros=duration)
+
+    listener.started(event(1, 'find', {'find': 'blog'}))
+    listener.succeeded(event(1, 'find', {}, 2000))
+    listener.started(event(2, 'getMore', {'getMore': 7, 'collection': 'blog'}))
+    listener.failed(event(2, 'getMore', {}, 500))
+    lines = registry.render().splitlines()
+    assert 'mongodb_command_duration_seconds_count{collection="blog",command="find"} 1' in lines
+    assert 'mongodb_command_duration_seconds_sum{collection="blog",command="find"} 0.002' in lines
+    assert 'mongodb_command_failures_total{collection="blog",command="getMore"} 1' in lines
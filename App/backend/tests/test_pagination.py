@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_page
+
+mongomock = pytest.importorskip('mongomock')
+
+
+@pytest.fixture
+def posts():
+    collection = mongomock.MongoClient().db.posts
+    base = datetime(2024, 1, 1)
+    # Pairs of posts share a timestamp, so _id has to break the ties
+    collection.insert_many([
+        {'_id': ObjectId(f'{i:024x}'), 'created_at': base + timedelta(days=i // 2), 'n': i}
+        for i in range(11)
+    ])
+    return collection
+
+
+def walk(collection, sort_field, direction, limit):
+    pages, cursor = [], None
+    while True:
+        docs, cursor, _ = keyset_page(collection, {}, sort_field, direction, limit, cursor)
+        pages.append([doc['n'] for doc in docs])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    doc_id = ObjectId()
+    value = datetime(2024, 5, 6, 7, 8, 9)
+    assert decode_cursor(encode_cursor(value, doc_id, 'prev')) == (value, doc_id, 'prev')
+
+
+@pytest.mark.parametrize('token', ['', 'not base64!', encode_cursor(1, 2, 'sideways')])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token)
+
+
+def test_pages_cover_every_document_once_with_ties_broken_by_id(posts):
+    pages = walk(posts, 'created_at', -1, 3)
+    assert pages == [[10, 9, 8], [7, 6, 5], [4, 3, 2], [1, 0]]
+
+
+def test_ascending_order_on_id(posts):
+    assert walk(posts, '_id', 1, 4) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10]]
+
+
+def test_prev_cursor_returns_the_previous_page_in_display_order(posts):
+    first, next_cursor, prev_cursor = keyset_page(posts, {}, 'created_at', -1, 3)
+    assert prev_cursor is None
+    second, _, prev_cursor = keyset_page(posts, {}, 'created_at', -1, 3, next_cursor)
+    assert [doc['n'] for doc in second] == [7, 6, 5]
+    back, next_again, prev_again = keyset_page(posts, {}, 'created_at', -1, 3, prev_cursor)
+    assert [doc['n'] for doc in back] == [doc['n'] for doc in first]
+    assert prev_again is None
+    assert next_again is not None
+
+
+def test_query_is_combined_with_the_cursor(posts):
+    docs, cursor, _ = keyset_page(posts, {'n': {'$in': [0, 2, 4, 6, 8, 10]}}, 'created_at', -1, 2)
+    assert [doc['n'] for doc in docs] == [10, 8]
+    docs, _, _ = keyset_page(posts, {'n': {'$in': [0, 2, 4, 6, 8, 10]}}, 'created_at', -1, 2, cursor)
+    assert [doc['n'] for doc in docs] == [6, 4]
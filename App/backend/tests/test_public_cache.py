@@ -0,0 +1,51 @@
+def bump_elsewhere(appmod, name):
+    """What another worker's write leaves behind: only the shared version moves"""
+    appmod.db.collection_versions.update_one({'_id': name}, {'$inc': {'version': 1}}, upsert=True)
+
+
+def test_cached_body_is_reused_until_the_data_changes(appmod, client, monkeypatch):
+    monkeypatch.setattr(appmod.collection_versions, 'check_interval', 0)
+    skills = appmod.collections['skills']
+    skills.insert_one({'name': 'Python', 'category': 'Technical', 'level': 'Expert'})
+    first = client.get('/api/public/skills').get_json()
+
+    # Written behind the app's back: the cached body is still served
+    skills.insert_one({'name': 'Go', 'category': 'Technical', 'level': 'Beginner'})
+    assert client.get('/api/public/skills').get_json() == first
+
+    bump_elsewhere(appmod, 'skills')
+    names = {skill['name'] for skill in client.get('/api/public/skills').get_json()}
+    assert {'Python', 'Go'} <= names
+
+
+def test_other_collections_keep_their_cached_bodies(appmod, client, monkeypatch):
+    monkeypatch.setattr(appmod.collection_versions, 'check_interval', 0)
+    client.get('/api/public/skills')
+    hits = appmod.response_cache.stats()['hits']
+    bump_elsewhere(appmod, 'projects')
+    client.get('/api/public/skills')
+    assert appmod.response_cache.stats()['hits'] == hits + 1
+
+
+def test_workers_agree_on_last_modified(appmod, client, monkeypatch):
+    from datetime import timedelta
+
+    from http_cache import CollectionVersions
+
+    monkeypatch.setattr(appmod.collection_versions, 'check_interval', 0)
+    # A worker booted an hour later, sharing the same database
+    other = CollectionVersions(appmod.db.collection_versions, check_interval=0)
+    other.started_at += timedelta(hours=1)
+    other._stamps['skills'] = other.started_at
+
+    other.bump('skills')
+    response = client.get('/api/public/skills')
+    assert response.last_modified == other.shared_last_modified('skills')
+    assert response.last_modified > appmod.collection_versions.last_modified('skills')
+
+
+def test_profiled_requests_share_the_cached_body(appmod, client):
+    client.get('/api/public/skills')
+    hits = appmod.response_cache.stats()['hits']
+    client.get('/api/public/skills?__profile=1')
+    assert appmod.response_cache.stats()['hits'] == hits + 1
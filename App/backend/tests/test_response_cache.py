@@ -0,0 +1,104 @@
+from response_cache import ResponseCache
+
+
+def test_get_returns_stored_entry_and_counts_hits():
+    cache = ResponseCache()
+    cache.set('a', '{"x": 1}', tags=('skills',), etag='abc')
+    entry = cache.get('a')
+    assert entry.body == b'{"x": 1}'
+    assert entry.etag == 'abc'
+    assert cache.get('missing') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = ResponseCache(max_bytes=30)
+    cache.set('a', b'a' * 10)
+    cache.set('b', b'b' * 10)
+    cache.set('c', b'c' * 10)
+    cache.get('a')
+    cache.set('d', b'd' * 10)
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_byte_budget_is_never_exceeded():
+    cache = ResponseCache(max_bytes=100)
+    for i in range(20):
+        cache.set(str(i), b'x' * (7 * (i % 4) + 1))
+        assert cache.current_bytes <= 100
+    assert cache.current_bytes == sum(len(e.body) for e in cache._entries.values())
+
+
+def test_oversized_body_is_not_cached_and_evicts_nothing():
+    cache = ResponseCache(max_bytes=10)
+    cache.set('small', b'12345')
+    assert cache.set('big', b'x' * 11) is None
+    assert cache.get('small') is not None
+    assert cache.current_bytes == 5
+
+
+def test_replacing_a_key_releases_its_old_size():
+    cache = ResponseCache()
+    cache.set('a', b'x' * 50)
+    cache.set('a', b'x' * 20)
+    assert cache.current_bytes == 20
+
+
+def test_invalidate_drops_only_entries_with_the_tag():
+    cache = ResponseCache()
+    cache.set('skills', b'1', tags=('skills',))
+    cache.set('portfolio', b'2', tags=('skills', 'projects'))
+    cache.set('projects', b'3', tags=('projects',))
+    assert cache.invalidate('skills') == 2
+    assert cache.get('skills') is None
+    assert cache.get('portfolio') is None
+    assert cache.get('projects') is not None
+    assert cache.current_bytes == 1
+    assert cache.invalidate('skills') == 0
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('response_cache.time.time', lambda: now[0])
+    cache = ResponseCache(ttl=10)
+    cache.set('a', b'x')
+    now[0] += 9
+    assert cache.get('a') is not None
+    now[0] += 2
+    assert cache.get('a') is None
+    assert cache.current_bytes == 0
+
+
+def test_per_entry_ttl_overrides_the_default(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('response_cache.time.time', lambda: now[0])
+    cache = ResponseCache(ttl=600)
+    cache.set('partial', b'x', ttl=5, cache_control='public, max-age=5')
+    now[0] += 6
+    assert cache.get('partial') is None
+
+
+def test_attach_encoding_is_charged_to_the_budget():
+    cache = ResponseCache(max_bytes=100)
+    entry = cache.set('a', b'x' * 40)
+    cache.set('b', b'y' * 40)
+    assert cache.attach_encoding('a', 'gzip', b'z' * 15, entry=entry)
+    assert entry.size == 55
+    # 95 bytes would fit; another 10 pushes the cache over and evicts b, the oldest
+    assert cache.attach_encoding('a', 'br', b'w' * 10, entry=entry)
+    assert cache.get('b') is None
+    assert cache.current_bytes == 65
+    assert cache.get('a').encoded == {'gzip': b'z' * 15, 'br': b'w' * 10}
+
+
+def test_attach_encoding_ignores_replaced_entries():
+    cache = ResponseCache()
+    old = cache.set('a', b'old body')
+    cache.set('a', b'new body')
+    assert not cache.attach_encoding('a', 'gzip', b'zz', entry=old)
+    assert cache.get('a').encoded == {}
+    assert cache.current_bytes == len(b'new body')
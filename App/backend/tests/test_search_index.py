@@ -0,0 +1,76 @@
+import pytest
+
+from search_index import SearchIndex, stem, tokenize
+
+POSTS = [
+    {'_id': 'a', 'title': 'Caching strategies', 'content': 'How we cache responses in Flask.',
+     'categories': ['technology'], 'featured': True},
+    {'_id': 'b', 'title': 'Deploying with Docker', 'content': 'Deployment notes and a word on caching.',
+     'categories': ['devops'], 'featured': False},
+    {'_id': 'c', 'title': 'Design systems', 'content': '<p>Colour, <b>type</b> and spacing.</p>',
+     'categories': ['design'], 'featured': False}
+]
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.rebuild(POSTS)
+    return index
+
+
+def ids(results):
+    return [doc_id for doc_id, _ in results]
+
+
+def test_stemming_folds_inflections():
+    assert stem('caching') == stem('cached') == stem('caches') == stem('cache')
+    assert stem('deployment') == stem('deploying')
+    assert tokenize('The cache and the caches') == ['cach', 'cach']
+
+
+def test_title_matches_rank_above_body_matches(index):
+    assert ids(index.search('caching ')) == ['a', 'b']
+
+
+def test_filters(index):
+    assert ids(index.search('caching ', category='devops')) == ['b']
+    assert ids(index.search('caching ', featured=True)) == ['a']
+
+
+def test_markup_is_not_indexed(index):
+    assert index.search('p ') == []
+    assert ids(index.search('spacing')) == ['c']
+
+
+@pytest.mark.parametrize('partial', ['cach', 'cachi', 'cachin', 'deploy', 'deployi', 'dep'])
+def test_partial_last_word_matches_as_prefix(index, partial):
+    assert index.search(partial)
+
+
+def test_complete_last_word_is_not_expanded(index):
+    assert index.search('des ') == []
+    assert ids(index.search('des')) == ['c']
+
+
+def test_add_replaces_and_remove_forgets(index):
+    index.add({'_id': 'c', 'title': 'Caching again', 'content': ''})
+    assert set(ids(index.search('caching '))) == {'a', 'b', 'c'}
+    assert index.search('spacing ') == []
+    index.remove('a')
+    assert 'a' not in ids(index.search('caching '))
+    assert index.stats()['documents'] == 2
+
+
+def test_snippet_highlights_matches_and_escapes(index):
+    index.add({'_id': 'd', 'title': 't', 'content': 'if a < b & c then caching here'})
+    assert index.snippet('d', 'caching') == 'if a &lt; b &amp; c then <mark>caching</mark> here'
+
+
+def test_staleness_follows_the_data_version():
+    index = SearchIndex(max_age=None)
+    assert index.is_stale()
+    index.rebuild(POSTS, version=3)
+    assert not index.is_stale(3)
+    assert index.is_stale(4)
+    assert not index.is_stale()
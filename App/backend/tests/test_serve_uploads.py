@@ -0,0 +1,34 @@
+import json
+import os
+
+import pytest
+
+
+@pytest.fixture
+def photo(appmod):
+    """An upload with a smaller WebP variant listed in its manifest"""
+    directory = os.path.join(appmod.UPLOAD_FOLDER, 'ab', 'cd')
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'photo.jpg'), 'wb') as f:
+        f.write(b'j' * 2000)
+    with open(os.path.join(directory, 'photo.w640.webp'), 'wb') as f:
+        f.write(b'w' * 500)
+    with open(os.path.join(directory, 'photo.variants.json'), 'w') as f:
+        json.dump({'bytes': 2000, 'variants': [{'file': 'photo.w640.webp', 'format': 'webp', 'width': 640, 'bytes': 500}]}, f)
+    return '/uploads/ab/cd/photo.jpg'
+
+
+@pytest.mark.parametrize('accept, size', [('image/webp,*/*', 500), ('image/png,*/*', 2000)])
+def test_every_representation_varies_on_accept(client, photo, accept, size):
+    response = client.get(photo, headers={'Accept': accept})
+    assert response.status_code == 200
+    assert len(response.data) == size
+    assert 'Accept' in response.vary
+
+
+def test_uploads_without_variants_do_not_vary_on_accept(appmod, client):
+    with open(os.path.join(appmod.UPLOAD_FOLDER, 'notes.txt'), 'w') as f:
+        f.write('plain')
+    response = client.get('/uploads/notes.txt')
+    assert response.status_code == 200
+    assert 'Accept' not in response.vary
@@ -0,0 +1,316 @@
+"""Load-test sweep: throughput and latency per endpoint across data sizes and concurrency levels.
+
+For every data size the database is re-seeded (tools/seed.py) and a fresh
+server is started on it, so no in-process cache or search index carries over
+between sizes. Every endpoint is then driven at each concurrency level for
+--duration seconds. Results go to results.json and results.csv, plus one
+throughput/latency chart per endpoint when matplotlib is installed.
+
+The load generator is a Python thread pool with keep-alive connections; it
+tops out at a few thousand requests per second, so compare curves between
+runs on the same machine rather than reading the absolute ceiling.
+
+Run from App/backend, with a local mongod:
+    python tools/loadtest.py --sizes 1000,10000,100000 --concurrency 1,4,16,64
+    python tools/loadtest.py --server-cmd "gunicorn -w 4 -b 127.0.0.1:{port} app:app" --sizes 100000
+    python tools/loadtest.py --base-url http://127.0.0.1:5000 --endpoints blog_list,blog_search
+"""
+import argparse
+import csv
+import http.client
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from pymongo import MongoClient
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.dataset import DEFAULT_COUNTS  # noqa: E402
+from tools.seed import check_database_name, seed_database  # noqa: E402
+
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+except ImportError:  # Results are still written as JSON and CSV
+    plt = None
+
+
+# name -> (path, needs the admin token); {slug} is filled from the seeded data
+ENDPOINTS = {
+    'public_skills': ('/api/public/skills', False),
+    'public_projects': ('/api/public/projects', False),
+    'public_certificates': ('/api/public/certificates', False),
+    'public_portfolio': ('/api/public/portfolio', False),
+    'blog_list': ('/api/blog/posts?per_page=20', False),
+    'blog_category': ('/api/blog/posts?per_page=20&category=devops', False),
+    'blog_search': ('/api/blog/posts?per_page=20&search=cache', False),
+    'blog_deep_page': ('/api/blog/posts?per_page=20&page=200', False),
+    'blog_by_slug': ('/api/blog/posts/slug/{slug}', False),
+    'admin_certificates': ('/api/certificates?sort=name&order=asc', True),
+    'admin_messages': ('/api/messages?per_page=50', True),
+    'admin_messages_deep_page': ('/api/messages?per_page=50&page=500', True),
+    'admin_blog': ('/api/admin/blog/posts', True)
+}
+
+
+def counts_for(size):
+    """Document counts for one data size: `size` blog posts, ten messages per post, a certificate per 30"""
+    counts = dict(DEFAULT_COUNTS)
+    counts.update({'blog': size, 'messages': size * 10, 'certificates': max(50, size // 30)})
+    return counts
+
+
+class Server:
+    """The app in a child process, pointed at the load-test database"""
+
+    def __init__(self, command, port, mongo_uri, database, log_path):
+        self.command = command
+        self.port = port
+        self.env = {**os.environ, 'MONGO_URI': mongo_uri, 'MONGO_DB': database}
+        self.log_path = log_path
+        self.process = None
+
+    def __enter__(self):
+        if self.command:
+            args = shlex.split(self.command.format(port=self.port))
+        else:
+            args = [sys.executable, '-m', 'flask', '--app', 'app', 'run',
+                    '--host', '127.0.0.1', '--port', str(self.port), '--with-threads']
+        self.log = open(self.log_path, 'a')
+        self.process = subprocess.Popen(args, cwd=BACKEND_DIR, env=self.env, stdout=self.log, stderr=subprocess.STDOUT)
+        try:
+            wait_until_ready(f'http://127.0.0.1:{self.port}', self.process)
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        return f'http://127.0.0.1:{self.port}'
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
+
+
+def wait_until_ready(base_url, process=None, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit(f'Server exited with code {process.returncode}; see the server log')
+        try:
+            if request(base_url, 'GET', '/api/public/contact-info')[0] == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f'Server at {base_url} did not become ready in {timeout}s')
+
+
+def request(base_url, method, path, body=None, headers=None):
+    url = urlsplit(base_url)
+    connection = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+    try:
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        all_headers = {'Content-Type': 'application/json', **(headers or {})}
+        connection.request(method, path, body=payload, headers=all_headers)
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def login(base_url, email, password):
+    status, body = request(base_url, 'POST', '/api/login', {'email': email, 'password': password})
+    if status != 200:
+        raise SystemExit(f'Login failed ({status}): {body[:200]!r}')
+    return json.loads(body)['token']
+
+
+def percentile(ordered, share):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * share))], 3)
+
+
+def drive(base_url, path, headers, concurrency, duration, warmup):
+    """Hammer one path from `concurrency` keep-alive connections; latencies in ms after the warm-up"""
+    url = urlsplit(base_url)
+    start = time.monotonic()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+
+    def worker(slot):
+        connection = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+        while True:
+            began = time.monotonic()
+            if began >= stop_at:
+                break
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                failed = response.status >= 400
+                if response.will_close:
+                    connection.close()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                failed = True
+            if began >= measure_from:
+                latencies[slot].append((time.monotonic() - began) * 1000)
+                errors[slot] += failed
+        connection.close()
+
+    threads = [threading.Thread(target=worker, args=(slot,), daemon=True) for slot in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ordered = sorted(latency for slot in latencies for latency in slot)
+    return {
+        'requests': len(ordered),
+        'errors': sum(errors),
+        'throughput_rps': round(len(ordered) / duration, 2),
+        'mean_ms': round(sum(ordered) / len(ordered), 3) if ordered else None,
+        'p50_ms': percentile(ordered, 0.50),
+        'p95_ms': percentile(ordered, 0.95),
+        'p99_ms': percentile(ordered, 0.99)
+    }
+
+
+def sweep(base_url, size, endpoints, levels, args, token, slug):
+    rows = []
+    headers = {'Connection': 'keep-alive'}
+    for name in endpoints:
+        template, needs_token = ENDPOINTS[name]
+        path = template.format(slug=slug)
+        request_headers = {**headers, 'Authorization': f'Bearer {token}'} if needs_token else headers
+        for concurrency in levels:
+            result = drive(base_url, path, request_headers, concurrency, args.duration, args.warmup)
+            rows.append({'size': size, 'endpoint': name, 'concurrency': concurrency, **result})
+            p95 = f"{result['p95_ms']:.1f}" if result['p95_ms'] is not None else '-'
+            print(f"  {name:<26} c={concurrency:<4} {result['throughput_rps']:>9.1f} req/s  "
+                  f"p95 {p95:>8} ms  errors {result['errors']}")
+    return rows
+
+
+def write_results(rows, directory, meta):
+    with open(os.path.join(directory, 'results.json'), 'w') as f:
+        json.dump({**meta, 'results': rows}, f, indent=2)
+    with open(os.path.join(directory, 'results.csv'), 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def plot(rows, directory):
+    """One PNG per endpoint: throughput and p95 latency against concurrency, a line per data size"""
+    if plt is None:
+        print('matplotlib is not installed; skipping charts (pip install matplotlib)')
+        return
+    for endpoint in sorted({row['endpoint'] for row in rows}):
+        figure, (throughput, latency) = plt.subplots(1, 2, figsize=(11, 4))
+        for size in sorted({row['size'] for row in rows}):
+            points = sorted((row for row in rows if row['endpoint'] == endpoint and row['size'] == size),
+                            key=lambda row: row['concurrency'])
+            levels = [row['concurrency'] for row in points]
+            label = f'{size:,} posts' if isinstance(size, int) else str(size)
+            throughput.plot(levels, [row['throughput_rps'] for row in points], marker='o', label=label)
+            latency.plot(levels, [row['p95_ms'] for row in points], marker='o', label=label)
+        for axis, title in ((throughput, 'Throughput (req/s)'), (latency, 'p95 latency (ms)')):
+            axis.set_xscale('log', base=2)
+            axis.set_xlabel('Concurrent connections')
+            axis.set_title(title)
+            axis.grid(True, alpha=0.3)
+            axis.legend()
+        figure.suptitle(endpoint)
+        figure.tight_layout()
+        figure.savefig(os.path.join(directory, f'{endpoint}.png'), dpi=120)
+        plt.close(figure)
+
+
+def parse_list(value, cast=int):
+    return [cast(item) for item in value.split(',') if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mongo-uri', default=os.environ.get('MONGO_URI', 'mongodb://localhost:27017/'))
+    parser.add_argument('--db', default='vibecanvas_load')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='blog post counts, comma-separated')
+    parser.add_argument('--concurrency', default='1,4,16,64')
+    parser.add_argument('--duration', type=float, default=10, help='measured seconds per point')
+    parser.add_argument('--warmup', type=float, default=2, help='unmeasured seconds before each point')
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS))
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--server-cmd', help='command starting the app, with {port}; default: flask run --with-threads')
+    parser.add_argument('--base-url', help='drive an already running server instead (no seeding, one pass)')
+    parser.add_argument('--email', default='admin@vibecanvas.com')
+    parser.add_argument('--password', default='Admin@1234')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--skip-seed', action='store_true', help='reuse the data already in --db (single size)')
+    parser.add_argument('--force', action='store_true', help='seed a database whatever its name')
+    parser.add_argument('--output-dir', default=None)
+    args = parser.parse_args()
+
+    endpoints = parse_list(args.endpoints, str)
+    unknown = [name for name in endpoints if name not in ENDPOINTS]
+    if unknown:
+        raise SystemExit(f"Unknown endpoint(s): {', '.join(unknown)}. Available: {', '.join(ENDPOINTS)}")
+    levels = parse_list(args.concurrency)
+    directory = args.output_dir or os.path.join(BACKEND_DIR, 'loadtest-results', datetime.now().strftime('%Y%m%d-%H%M%S'))
+    os.makedirs(directory, exist_ok=True)
+    db = MongoClient(args.mongo_uri)[args.db]
+
+    rows = []
+    if args.base_url or args.skip_seed:
+        # One pass over whatever data the server already has
+        passes = [None]
+    else:
+        check_database_name(args.db, args.force)
+        passes = parse_list(args.sizes)
+
+    for size in passes:
+        if size is not None:
+            print(f'\n== {size:,} blog posts ==')
+            seed_database(db, counts_for(size), seed=args.seed)
+        label = size if size is not None else db.blog.estimated_document_count()
+        post = db.blog.find_one({'status': 'published'}, {'slug': 1})
+        slug = post['slug'] if post else 'missing'
+
+        if args.base_url:
+            wait_until_ready(args.base_url)
+            token = login(args.base_url, args.email, args.password)
+            rows.extend(sweep(args.base_url, label, endpoints, levels, args, token, slug))
+            continue
+        with Server(args.server_cmd, args.port, args.mongo_uri, args.db, os.path.join(directory, 'server.log')) as base_url:
+            token = login(base_url, args.email, args.password)
+            rows.extend(sweep(base_url, label, endpoints, levels, args, token, slug))
+
+    meta = {
+        'recorded_at': datetime.now().isoformat(),
+        'database': args.db,
+        'server': args.base_url or args.server_cmd or 'flask run --with-threads',
+        'duration_s': args.duration,
+        'warmup_s': args.warmup
+    }
+    write_results(rows, directory, meta)
+    plot(rows, directory)
+    print(f'\nResults in {directory}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Fill a MongoDB database with synthetic portfolio data, at any scale.
+
+Documents come from benchmarks/dataset.py, so they have exactly the shapes
+the routes write (blog slugs and categories, certificates with string and
+datetime expiry dates, messages with read flags) and the same seed always
+gives the same data. Seeded collections are dropped first, and the app's
+indexes are created once the data is in. Restart any running server
+afterwards: its in-process caches and search indexes do not see the reseed.
+
+Run from App/backend:
+    python tools/seed.py --db vibecanvas_load --blog 100000 --messages 1000000 --certificates 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+from pymongo import MongoClient
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.dataset import DEFAULT_COUNTS, seed_collections  # noqa: E402
+from indexes import INDEXES, ensure_indexes  # noqa: E402
+
+
+SAFE_SUFFIXES = ('_load', '_bench')
+
+
+def check_database_name(name, force=False):
+    """Seeding drops collections, so only databases named for it are accepted without --force"""
+    if not force and not name.endswith(SAFE_SUFFIXES):
+        raise SystemExit(f"Refusing to seed '{name}': use a name ending in {' or '.join(SAFE_SUFFIXES)}, or --force")
+
+
+def print_progress(name, done, total):
+    print(f'\r  {name:<13} {done:>10,} / {total:,}', end='' if done < total else '\n', flush=True)
+
+
+def seed_database(db, counts, seed=1234, batch_size=5000, progress=print_progress):
+    """Seed db with `counts` documents per collection and build its indexes. Returns {collection: inserted}"""
+    collections = {name: db[name] for name in INDEXES}
+    admin = collections['users'].find_one({'role': 'admin'})
+    started = time.perf_counter()
+    inserted = seed_collections(collections, counts, seed=seed, admin=admin,
+                                batch_size=batch_size, progress=progress)
+    # Building indexes once after the bulk insert is much cheaper than maintaining them during it
+    _, errors = ensure_indexes(collections)
+    for error in errors:
+        print(f'Index creation failed: {error}')
+    print(f'Seeded {sum(inserted.values()):,} documents in {time.perf_counter() - started:.1f}s')
+    return inserted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mongo-uri', default=os.environ.get('MONGO_URI', 'mongodb://localhost:27017/'))
+    parser.add_argument('--db', default=os.environ.get('MONGO_DB', 'vibecanvas_load'))
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--force', action='store_true', help='seed a database whatever its name')
+    for name, count in DEFAULT_COUNTS.items():
+        parser.add_argument(f'--{name}', type=int, default=count, metavar='N', help=f'documents (default {count})')
+    args = parser.parse_args()
+
+    check_database_name(args.db, args.force)
+    counts = {name: getattr(args, name) for name in DEFAULT_COUNTS}
+    client = MongoClient(args.mongo_uri)
+    print(f'Seeding {args.db}: ' + ', '.join(f'{name}={count:,}' for name, count in counts.items()))
+    seed_database(client[args.db], counts, args.seed, args.batch_size)
+
+
+if __name__ == '__main__':
+    main()
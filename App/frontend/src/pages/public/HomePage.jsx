@@ -188,7 +188,7 @@ const HomePage = () => {
   useEffect(() => {
     const loadProjects = async () => {
       try {
-        const response = await axios.get('http://localhost:5000/api/public/projects');
+        const response = await axios.get('http://localhost:5000/api/public/projects?fields=title,description,technologies,image_url');
         const data = response.data;
         if (!Array.isArray(data)) {
           throw new Error('Expected an array of projects');
@@ -44,21 +44,17 @@ const PortfolioPage = () => {
           timeout: 10000,
         });
 
-        const requests = [
-          api.get('/public/skills'),
-          api.get('/public/projects'),
-          api.get('/public/experience'),
-          api.get('/public/education'),
-          api.get('/public/certificates'),
-        ];
-
-        const [
-          { data: skills },
-          { data: projects },
-          { data: experience },
-          { data: education },
-          { data: certificates },
-        ] = await Promise.all(requests);
+        // One round trip for all five sections
+        const { data: batch } = await api.post('/public/batch', {
+          requests: ['skills', 'projects', 'experience', 'education', 'certificates'].map((id) => ({
+            id,
+            path: `/api/public/${id}`,
+          })),
+        });
+        const parts = Object.fromEntries(
+          batch.responses.map((part) => [part.id, part.status === 200 ? part.body : []])
+        );
+        const { skills, projects, experience, education, certificates } = parts;
 
         setData({
           skills: Array.isArray(skills) ? skills : skills?.data || [],